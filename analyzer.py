@@ -1,67 +1,432 @@
 """Orquesta el análisis: matcher, heurísticas, normalización y HTML."""
-from spacy_utils import load_spacy_model, add_entity_ruler
-from matcher_utils import setup_causal_matcher
-from heuristics import extract_cause_effect_basic
-from pdf_utils import extract_text_from_pdf, extract_text_from_scanned_pdf
-from spacy_utils import load_spacy_model
+from spacy_utils import get_matcher, pipeline_spec, load_pipeline_spec
+from matcher_utils import CAUSAL_FALLBACK_REGEX
+from heuristics import extract_cause_effect_basic, get_engine
+from prefilter import candidate_regions
+from profiling import get_profiler
+import result_cache
+from doc_cache import doc_key, load_docs, store_docs
+from concurrent.futures import ProcessPoolExecutor
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+# Tamaño máximo (en caracteres) de cada trozo que se envía a `nlp.pipe`.
+DEFAULT_CHUNK_CHARS = 100_000
+
+# Con `workers > 1` se busca que haya varios trozos por proceso, sin bajar de este tamaño.
+MIN_PARALLEL_CHUNK_CHARS = 10_000
+
+# Caracteres del final de un trozo que se repiten al principio del siguiente en `analyze_mapped`.
+DEFAULT_OVERLAP_CHARS = 500
+
+# Inicio de oración (tras fin de oración o salto de línea) donde puede empezar el solape.
+_SENTENCE_START = re.compile(r"(?<=[.!?])\s+|\n\s*")
+
+# Cortes preferidos para trocear: párrafo, salto de línea (página) y fin de oración.
+_CHUNK_BOUNDARIES = [
+    re.compile(r"\n\s*\n"),
+    re.compile(r"\n"),
+    re.compile(r"(?<=[.!?])\s+"),
+    re.compile(r"\s+"),
+]
+
 
 def normalize_and_merge_spans(text, spans):
-    normalized = []
-    for s in spans:
-        if isinstance(s, dict):
-            normalized.append((s.get('role'), s.get('start'), s.get('end')))
-        else:
-            normalized.append(s)
-    if not normalized:
-        return []
-    normalized.sort(key=lambda x: (x[1], -(x[2] - x[1])))
-    merged = []
-    for role, start, end in normalized:
-        if not merged:
-            merged.append([role, start, end])
-            continue
-        last_role, last_s, last_e = merged[-1]
-        if start <= last_e:
-            priority = {'cause': 2, 'effect': 2, 'causal_sentence': 1}
-            if priority.get(role, 0) > priority.get(last_role, 0):
-                merged[-1] = [role, start, max(end, last_e)]
-            else:
-                merged[-1][2] = max(last_e, end)
-        else:
-            merged.append([role, start, end])
-    return [{'role': r, 'start': a, 'end': b, 'text': text[a:b]} for r, a, b in merged]
+    """Ordena y fusiona los spans solapados; devuelve un `IntervalIndex` (secuencia de dicts de sólo lectura).
+
+    Acepta tuplas `(role, start, end)` o dicts con esas claves. Ver `IntervalIndex.merged`.
+    """
+    from span_store import SpanStore
+    return SpanStore.from_spans(text, spans).merged()
+
+
+def _sentence_highlights(sent, extract=extract_cause_effect_basic):
+    ce = extract(sent)
+    if ce:
+        return list(ce)
+    return [('causal_sentence', sent.start_char, sent.end_char)]
 
 
-def analyze_text(text: str, nlp):
-    matcher = setup_causal_matcher(nlp)
-    doc = nlp(text)
+def _matched_highlights(doc, matcher, extract=extract_cause_effect_basic):
+    """Highlights de las oraciones donde el matcher encontró un marcador causal."""
+    profiler = get_profiler()
+    with profiler.stage('match') as stage:
+        matches = matcher(doc)
+        stage.count(matches=len(matches))
     highlights = []
-    matches = matcher(doc)
     matched_sent_starts = set()
-    for match_id, start, end in matches:
-        span = doc[start:end]
-        sent = span.sent
-        if sent.start in matched_sent_starts:
-            continue
-        ce = extract_cause_effect_basic(sent)
-        if ce:
-            for role, a, b in ce:
-                highlights.append({'role': role, 'start': a, 'end': b, 'text': text[a:b]})
-        else:
-            highlights.append({'role': 'causal_sentence', 'start': sent.start_char, 'end': sent.end_char, 'text': sent.text})
-        matched_sent_starts.add(sent.start)
-    if not highlights:
-        causal_markers = ["because", "due to", "as a result", "leads to", "lead to", "if", "then"]
+    with profiler.stage('heuristics') as stage:
+        for match_id, start, end in matches:
+            sent = doc[start:end].sent
+            if sent.start in matched_sent_starts:
+                continue
+            highlights.extend(_sentence_highlights(sent, extract))
+            matched_sent_starts.add(sent.start)
+        stage.count(sentences=len(matched_sent_starts), spans=len(highlights))
+    return highlights
+
+
+def _fallback_highlights(doc, extract=extract_cause_effect_basic):
+    """Búsqueda textual de marcadores (palabras completas) cuando el matcher no encuentra nada."""
+    highlights = []
+    with get_profiler().stage('fallback') as stage:
         for sent in doc.sents:
-            if any(m in sent.text.lower() for m in causal_markers):
-                ce = extract_cause_effect_basic(sent)
-                if ce:
-                    for role, a, b in ce:
-                        highlights.append({'role': role, 'start': a, 'end': b, 'text': text[a:b]})
-                else:
-                    highlights.append({'role': 'causal_sentence', 'start': sent.start_char, 'end': sent.end_char, 'text': sent.text})
-    return normalize_and_merge_spans(text, highlights)
+            if CAUSAL_FALLBACK_REGEX.search(sent.text):
+                highlights.extend(_sentence_highlights(sent, extract))
+        stage.count(spans=len(highlights))
+    return highlights
+
+
+def iter_text_chunks(text: str, max_chars: int = DEFAULT_CHUNK_CHARS):
+    """Divide `text` en trozos de como mucho `max_chars` caracteres.
+
+    Corta preferentemente entre párrafos, luego en saltos de línea (páginas) y
+    luego tras un fin de oración, de modo que ninguna oración quede partida
+    salvo que no exista otro corte posible. El espacio en blanco del corte pasa
+    al trozo siguiente, igual que lo agrupa spaCy al segmentar oraciones. La
+    concatenación de los trozos es exactamente `text`.
+    """
+    if max_chars <= 0:
+        raise ValueError("max_chars debe ser positivo")
+    pos = 0
+    n = len(text)
+    while n - pos > max_chars:
+        limit = pos + max_chars
+        cut = None
+        for boundary in _CHUNK_BOUNDARIES:
+            for m in boundary.finditer(text, pos, limit):
+                cut = m.start()
+            if cut is not None and cut > pos:
+                break
+            cut = None
+        if cut is None:
+            cut = limit
+        yield text[pos:cut]
+        pos = cut
+    if pos < n:
+        yield text[pos:]
+
+
+def _with_offsets(chunks, max_chars):
+    offset = 0
+    for chunk in chunks:
+        pieces = iter_text_chunks(chunk, max_chars) if len(chunk) > max_chars else (chunk,)
+        for piece in pieces:
+            yield piece, offset
+            offset += len(piece)
+
+
+def analyze_stream(chunks, nlp, chunk_chars: int = DEFAULT_CHUNK_CHARS, batch_size: int = 4, on_chunk=None,
+                   engine: str = 'basic'):
+    """Analiza un documento por trozos y va devolviendo highlights a medida que termina cada trozo.
+
+    `chunks` puede ser el texto completo (se trocea con `iter_text_chunks`) o un
+    iterable de trozos contiguos (p. ej. páginas) cuya concatenación es el
+    documento. Los trozos pasan por `nlp.pipe` en lotes de `batch_size`, así que
+    nunca existe un único `Doc` con todo el libro. Cada highlight lleva offsets
+    absolutos respecto al documento completo, y los que se tocan en el corte
+    entre dos trozos se fusionan como en `analyze_text`.
+
+    Como en `analyze_text`, el fallback por marcadores textuales sólo se usa si
+    ningún trozo tuvo coincidencias: se guarda mientras no haya ninguna y se
+    emite al final.
+
+    Si se da `on_chunk`, se llama como `on_chunk(fin, oraciones)` tras entregar
+    los highlights de cada trozo, con el offset absoluto donde termina el trozo
+    y su número de oraciones (para mostrar progreso).
+    """
+    max_chars = min(chunk_chars, nlp.max_length)
+    if isinstance(chunks, str):
+        chunks = (chunks,)
+    items = ((piece, (offset, 0)) for piece, offset in _with_offsets(chunks, max_chars))
+    yield from _stitch(_chunked_spans(items, nlp, batch_size, on_chunk, engine))
+
+
+def iter_overlapping_chunks(text, max_chars: int = DEFAULT_CHUNK_CHARS,
+                            overlap_chars: int = DEFAULT_OVERLAP_CHARS):
+    """Genera `(trozo, offset, solape)` recorriendo `text` sin copiarlo entero.
+
+    `text` puede ser una cadena o un `mapped_text.MappedText`: sólo se recorta
+    una ventana de `max_chars` cada vez. Los cortes son los de
+    `iter_text_chunks`; además, cada trozo empieza con las últimas oraciones
+    completas del anterior (como mucho `overlap_chars` caracteres, `solape`)
+    para que el parser tenga contexto. `offset` es la posición global del
+    primer carácter del trozo, solape incluido.
+    """
+    pos = 0
+    n = len(text)
+    while pos < n:
+        window = text[pos:pos + max_chars + 1]
+        piece = next(iter_text_chunks(window, max_chars))
+        head = text[max(0, pos - overlap_chars):pos] if overlap_chars else ""
+        m = _SENTENCE_START.search(head)
+        overlap = len(head) - m.end() if m else 0
+        yield head[len(head) - overlap:] + piece, pos - overlap, overlap
+        pos += len(piece)
+
+
+def analyze_mapped(text, nlp, chunk_chars: int = DEFAULT_CHUNK_CHARS, overlap_chars: int = DEFAULT_OVERLAP_CHARS,
+                   batch_size: int = 4, on_chunk=None, engine: str = 'basic'):
+    """Como `analyze_stream`, pero sobre trozos solapados de `iter_overlapping_chunks`.
+
+    Pensado para `.txt` enormes abiertos con `mapped_text.MappedText`: en
+    memoria sólo están los trozos del lote en curso. Los highlights que acaban
+    dentro del solape ya los dio el trozo anterior y se descartan; los que
+    empiezan en él y siguen después se fusionan con el último del trozo
+    anterior, así que los offsets son globales y no se repiten. El fallback se
+    decide para el archivo entero, igual que en `analyze_stream`.
+    """
+    max_chars = max(1, min(chunk_chars, nlp.max_length - overlap_chars))
+    items = ((chunk, (offset, overlap))
+             for chunk, offset, overlap in iter_overlapping_chunks(text, max_chars, overlap_chars))
+    yield from _stitch(_chunked_spans(items, nlp, batch_size, on_chunk, engine))
+
+
+def _chunked_spans(items, nlp, batch_size, on_chunk, engine):
+    """Highlights de cada trozo `(texto, (offset, solape))` con offsets globales, fusionados dentro del trozo.
+
+    El fallback textual se guarda mientras ningún trozo tenga coincidencias y se emite al final.
+    """
+    matcher = get_matcher(nlp)
+    extract = get_engine(engine)
+    fallback, any_matched = [], False
+    for doc, (offset, overlap) in nlp.pipe(items, as_tuples=True, batch_size=batch_size):
+        matched = _matched_highlights(doc, matcher, extract)
+        if matched:
+            any_matched = True
+            fallback = []
+            yield from _mapped_spans(doc.text, matched, offset, overlap)
+        elif not any_matched:
+            fallback.extend(_mapped_spans(doc.text, _fallback_highlights(doc, extract), offset, overlap))
+        if on_chunk is not None:
+            on_chunk(offset + len(doc.text), sum(1 for sent in doc.sents if sent.start_char >= overlap))
+    yield from fallback
+
+
+def _stitch(spans):
+    """Fusiona los highlights de trozos consecutivos que se tocan en el corte.
+
+    Cada trozo llega ya fusionado, así que sólo el último span de un trozo
+    puede encadenarse con los primeros del siguiente. Se retiene abierto y se
+    une con las mismas reglas que `IntervalIndex.merged` (rol e inicio del de
+    mayor prioridad, el primero si empatan), de modo que el resultado es el de
+    `analyze_text`.
+    """
+    from span_store import ROLE_PRIORITY
+    pending = None
+    for span in spans:
+        if pending is None:
+            pending = span
+        elif span['start'] > pending['end']:
+            yield pending
+            pending = span
+        elif ROLE_PRIORITY.get(span['role'], 0) > ROLE_PRIORITY.get(pending['role'], 0):
+            tail = pending['text'][span['end'] - pending['start']:] if pending['end'] > span['end'] else ""
+            pending = dict(span, end=max(span['end'], pending['end']), text=span['text'] + tail)
+        elif span['end'] > pending['end']:
+            tail = span['text'][pending['end'] - span['start']:]
+            pending = dict(pending, end=span['end'], text=pending['text'] + tail)
+    if pending is not None:
+        yield pending
+
+
+def _mapped_spans(chunk, highlights, offset, overlap):
+    """Highlights fusionados de un trozo, sin los que acaban dentro del solape, con offsets globales."""
+    for role, start, end in normalize_and_merge_spans(chunk, highlights).iter_tuples():
+        if end > overlap:
+            yield {'role': role, 'start': start + offset, 'end': end + offset, 'text': chunk[start:end]}
+
+
+# Estado de cada proceso del pool: el modelo se carga una sola vez por proceso.
+_worker_nlp = None
+_worker_matcher = None
+_worker_extract = None
+
+
+def _init_worker(spec, engine='basic'):
+    global _worker_nlp, _worker_matcher, _worker_extract
+    _worker_nlp = load_pipeline_spec(spec)
+    _worker_matcher = get_matcher(_worker_nlp)
+    _worker_extract = get_engine(engine)
+
+
+def _shift(highlights, offset):
+    return [(role, a + offset, b + offset) for role, a, b in highlights]
+
+
+def _chunk_highlights(doc, matcher, offset, extract=extract_cause_effect_basic):
+    """Devuelve (matched, fallback) de un trozo con offsets absolutos.
+
+    El fallback sólo se calcula si el trozo no tuvo coincidencias: se usa
+    únicamente si ningún trozo las tuvo, igual que en `analyze_text` en serie.
+    """
+    matched = _matched_highlights(doc, matcher, extract)
+    fallback = [] if matched else _fallback_highlights(doc, extract)
+    return _shift(matched, offset), _shift(fallback, offset)
+
+
+def _analyze_chunk(item):
+    chunk, offset = item
+    return _chunk_highlights(_worker_nlp(chunk), _worker_matcher, offset, _worker_extract)
+
+
+def _combine(results):
+    """Une los `(matched, fallback)` de cada trozo: el fallback sólo si ningún trozo tuvo coincidencias."""
+    matched, fallback = [], []
+    for m, f in results:
+        matched.extend(m)
+        fallback.extend(f)
+    return matched or fallback
+
+
+def _items_highlights(items, nlp, workers=1, engine='basic'):
+    """Analiza trozos `(texto, offset)` del documento en serie o en un pool de procesos."""
+
+    if workers > 1 and len(items) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(items)),
+                                 initializer=_init_worker,
+                                 initargs=(pipeline_spec(nlp), engine)) as pool:
+            return _combine(pool.map(_analyze_chunk, items))
+    matcher = get_matcher(nlp)
+    extract = get_engine(engine)
+    # `nlp.pipe` es perezoso: 'parse' incluye las etapas de cada trozo (ver `self_seconds`).
+    with get_profiler().stage('parse') as stage:
+        results = []
+        for doc, offset in nlp.pipe(items, as_tuples=True):
+            results.append(_chunk_highlights(doc, matcher, offset, extract))
+            if stage.active:
+                stage.count(sentences=sum(1 for _ in doc.sents))
+        stage.count(chunks=len(items), chars=sum(len(chunk) for chunk, _ in items))
+    return _combine(results)
+
+
+def _parsed_docs(text, nlp, doc_cache, max_chars, workers=1):
+    """`(doc, offset)` de cada trozo de `text`: de `doc_cache` o, si no están, parseados y guardados."""
+    profiler = get_profiler()
+    key = doc_key(text, nlp, max_chars)
+    with profiler.stage('load_docs') as stage:
+        docs = load_docs(doc_cache, key, nlp)
+        stage.count(docs=len(docs or ()))
+    if docs is not None:
+        logger.info("Documentos parseados recuperados de la caché (%s).", key[:12])
+        return docs
+    items = list(_with_offsets((text,), max_chars))
+    with profiler.stage('parse') as stage:
+        docs = list(nlp.pipe(items, as_tuples=True, n_process=max(1, min(workers, len(items)))))
+        stage.count(chunks=len(items), chars=len(text))
+    store_docs(doc_cache, key, docs)
+    return docs
+
+
+def _region_items(text, regions, max_chars):
+    items = []
+    for start, end in regions:
+        for piece, offset in _with_offsets((text[start:end],), max_chars):
+            items.append((piece, start + offset))
+    return items
+
+
+def analyze_text(text: str, nlp, workers: int = 1, chunk_chars: int = None, prefilter: bool = False,
+                 cache=None, doc_cache=None, engine: str = 'basic'):
+    """Analiza `text` y devuelve los highlights fusionados.
+
+    El texto se trocea con `iter_text_chunks` (como mucho `chunk_chars`, por
+    defecto `DEFAULT_CHUNK_CHARS`, y nunca más de `nlp.max_length`) y los trozos
+    pasan por `nlp.pipe`, así que ningún `Doc` contiene el documento entero. El
+    fallback textual sólo se usa si ningún trozo tuvo coincidencias.
+
+    Con `workers > 1` cada trozo se parsea, se pasa por el matcher y por las
+    heurísticas en un pool de procesos (cada uno carga el modelo una vez). Los
+    offsets se reubican para que el resultado sea el mismo que en serie.
+
+    Con `prefilter=True` sólo se parsean las regiones que `prefilter` marca
+    como candidatas (ver `compare_prefilter` para medir la diferencia).
+
+    Si se pasa `cache` (ver `result_cache.open_result_cache`) el resultado se
+    busca y se guarda allí, con el tamaño efectivo de trozo en la clave (los
+    cortes cambian la segmentación en oraciones; `workers` sólo influye a
+    través de él). Con `doc_cache` (ver `doc_cache.open_doc_cache`)
+    los `Doc` parseados se guardan aparte, por trozos de `chunk_chars`, y al
+    cambiar las reglas sólo se repiten matcher, heurísticas y fusión (no se
+    combina con `prefilter`, cuyas regiones dependen de las reglas).
+
+    `engine` elige las heurísticas de causa/efecto (`heuristics.ENGINES`); el
+    pipeline debe traer lo que pide ese motor (ver `pipeline_planner`).
+    """
+    if chunk_chars is None:
+        chunk_chars = DEFAULT_CHUNK_CHARS
+        if workers > 1 and not prefilter and doc_cache is None:
+            chunk_chars = max(MIN_PARALLEL_CHUNK_CHARS, len(text) // (workers * 4) + 1)
+    max_chars = min(chunk_chars, nlp.max_length)
+    if cache is not None:
+        # Los cortes entre trozos cambian la segmentación en oraciones: el tamaño efectivo va en la clave.
+        key = result_cache.cache_key(text, nlp, prefilter=prefilter, engine=engine, chunk_chars=max_chars)
+        highlights = result_cache.load_highlights(cache, key, text)
+        if highlights is None:
+            highlights = analyze_text(text, nlp, workers, max_chars, prefilter, doc_cache=doc_cache, engine=engine)
+            result_cache.store_highlights(cache, key, highlights)
+        else:
+            logger.info("Resultado recuperado de la caché (%s).", key[:12])
+        return highlights
+    profiler = get_profiler()
+    extract = get_engine(engine)
+    if prefilter:
+        with profiler.stage('prefilter') as stage:
+            regions = candidate_regions(text)
+            stage.count(regions=len(regions))
+        highlights = _items_highlights(_region_items(text, regions, max_chars), nlp, workers, engine)
+    elif doc_cache is not None:
+        docs = _parsed_docs(text, nlp, doc_cache, max_chars, workers)
+        matcher = get_matcher(nlp)
+        highlights = _combine(_chunk_highlights(doc, matcher, offset, extract) for doc, offset in docs)
+    else:
+        items = list(_with_offsets((text,), max_chars))
+        highlights = _items_highlights(items, nlp, workers, engine)
+    with profiler.stage('merge') as stage:
+        merged = normalize_and_merge_spans(text, highlights)
+        stage.count(spans=len(merged))
+    return merged
+
+
+def analyze_batch(texts, nlp, batch_size: int = 16, engine: str = 'basic'):
+    """Analiza varios textos independientes con un solo `nlp.pipe`; una lista de highlights por texto.
+
+    Cada resultado es el mismo que daría `analyze_text(text, nlp, engine=engine)`. Los textos
+    que superan `DEFAULT_CHUNK_CHARS` se analizan aparte con `analyze_text`.
+    """
+    results = [None] * len(texts)
+    short = []
+    for i, text in enumerate(texts):
+        if len(text) > min(DEFAULT_CHUNK_CHARS, nlp.max_length):
+            results[i] = analyze_text(text, nlp, engine=engine)
+        else:
+            short.append((text, i))
+    matcher = get_matcher(nlp)
+    extract = get_engine(engine)
+    for doc, i in nlp.pipe(short, as_tuples=True, batch_size=batch_size):
+        highlights = _matched_highlights(doc, matcher, extract) or _fallback_highlights(doc, extract)
+        results[i] = normalize_and_merge_spans(texts[i], highlights)
+    return results
+
+
+def compare_prefilter(text: str, nlp):
+    """Compara el modo `prefilter=True` con el parseo completo del mismo texto.
+
+    Devuelve los highlights que faltan o sobran en el modo prefiltro y la
+    fracción del texto que realmente se parseó.
+    """
+    def key(h):
+        return (h['role'], h['start'], h['end'])
+
+    full = {key(h) for h in analyze_text(text, nlp)}
+    fast = {key(h) for h in analyze_text(text, nlp, prefilter=True)}
+    parsed = sum(b - a for a, b in candidate_regions(text))
+    return {
+        'full': len(full),
+        'prefiltered': len(fast),
+        'missing': sorted(full - fast, key=lambda k: k[1]),
+        'extra': sorted(fast - full, key=lambda k: k[1]),
+        'parsed_share': parsed / len(text) if text else 0.0,
+    }
@@ -0,0 +1,154 @@
+"""Modo lote: procesa un corpus con un pool de procesos que comparte un modelo caliente por proceso."""
+import glob
+import json
+import contextlib
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from analyzer import analyze_text
+from cache_utils import sha256_hex
+from doc_cache import open_doc_cache
+from export_utils import open_sinks
+from html_utils import generate_html_report
+from pdf_utils import open_page_cache, read_document_pages
+from result_cache import open_result_cache
+from snapshot_utils import load_pipeline
+from spacy_utils import DEFAULT_MODEL
+
+logger = logging.getLogger(__name__)
+
+INPUT_EXTENSIONS = ('.pdf', '.txt')
+MANIFEST_NAME = 'run_manifest.json'
+STAGES = ('extract', 'analyze', 'html')
+
+# Estado de cada proceso: modelo y cachés se abren una vez al arrancar.
+_batch_state = {}
+
+
+def expand_inputs(inputs, extensions=INPUT_EXTENSIONS):
+    """Expande directorios (recursivamente), globs y rutas sueltas a una lista ordenada de archivos."""
+    found = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                found.extend(os.path.join(root, f) for f in files if f.lower().endswith(extensions))
+        elif os.path.isfile(item):
+            found.append(item)
+        else:
+            found.extend(p for p in glob.glob(item, recursive=True)
+                         if os.path.isfile(p) and p.lower().endswith(extensions))
+    seen = set()
+    return [p for p in sorted(found) if not (p in seen or seen.add(p))]
+
+
+def report_names(paths):
+    """Nombre de informe por archivo: `<nombre>.html`, con un hash si el nombre se repite."""
+    stems = {}
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        stems[stem] = stems.get(stem, 0) + 1
+    names = []
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if stems[stem] > 1:
+            stem = "{}-{}".format(stem, sha256_hex(os.path.abspath(path))[:8])
+        names.append(stem + '.html')
+    return names
+
+
+def _init_batch_worker(model, use_cache, export=(), engine='basic', snapshot_dir=None, doc_cache=False):
+    _batch_state['nlp'] = load_pipeline(model, snapshot_dir=snapshot_dir, engine=engine)
+    _batch_state['engine'] = engine
+    _batch_state['export'] = tuple(export)
+    _batch_state['page_cache'] = open_page_cache() if use_cache else None
+    _batch_state['result_cache'] = open_result_cache() if use_cache else None
+    _batch_state['doc_cache'] = open_doc_cache() if use_cache and doc_cache else None
+
+
+def _process_one(item):
+    path, out_path = item
+    record = {'path': path, 'report': out_path, 'ok': False, 'error': None,
+              'chars': 0, 'highlights': 0, 'stages': {}}
+    stages = record['stages']
+    try:
+        t0 = time.perf_counter()
+        text, page_offsets = read_document_pages(path, cache=_batch_state['page_cache'])
+        stages['extract'] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        highlights = analyze_text(text, _batch_state['nlp'], cache=_batch_state['result_cache'],
+                                  doc_cache=_batch_state['doc_cache'], engine=_batch_state['engine'])
+        stages['analyze'] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            sinks = [stack.enter_context(sink)
+                     for sink in open_sinks(out_path, _batch_state.get('export', ()), page_offsets)]
+            generate_html_report(text, highlights, out_path, sinks)
+        stages['html'] = time.perf_counter() - t0
+
+        record.update(ok=True, chars=len(text), highlights=len(highlights))
+    except Exception as e:
+        logger.exception("Error procesando %s", path)
+        record['error'] = "{}: {}".format(type(e).__name__, e)
+    return record
+
+
+def run_batch(inputs, out_dir: str, workers: int = None, use_cache: bool = True,
+              model: str = DEFAULT_MODEL, export=(), engine: str = 'basic', snapshot_dir: str = None,
+              doc_cache: bool = False) -> dict:
+    """Procesa todos los archivos de `inputs` y escribe un informe por archivo en `out_dir`.
+
+    Cada proceso del pool carga el modelo una sola vez (la instantánea de
+    `snapshot_dir` si es válida; si no, el pipeline planificado para `engine`).
+    Junto a los informes se escribe `run_manifest.json` con el resultado de
+    cada archivo y el resumen: documentos por segundo, fallos y totales por
+    etapa. `export` añade por archivo los formatos de `export_utils.open_sinks`
+    y `doc_cache` guarda los `Doc` parseados como en `main.select_file_and_process`.
+    """
+    paths = expand_inputs(inputs)
+    os.makedirs(out_dir, exist_ok=True)
+    items = [(p, os.path.join(out_dir, name)) for p, name in zip(paths, report_names(paths))]
+    workers = workers or os.cpu_count() or 1
+
+    t0 = time.perf_counter()
+    initargs = (model, use_cache, tuple(export), engine, snapshot_dir, doc_cache)
+    if workers <= 1 or len(items) < 2:
+        _init_batch_worker(*initargs)
+        records = [_process_one(item) for item in items]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(items)),
+                                 initializer=_init_batch_worker,
+                                 initargs=initargs) as pool:
+            records = list(pool.map(_process_one, items))
+    elapsed = time.perf_counter() - t0
+
+    failures = [r for r in records if not r['ok']]
+    summary = {
+        'documents': len(records),
+        'succeeded': len(records) - len(failures),
+        'failed': len(failures),
+        'seconds': elapsed,
+        'docs_per_second': len(records) / elapsed if elapsed else 0.0,
+        'stage_seconds': {s: sum(r['stages'].get(s, 0.0) for r in records) for s in STAGES},
+        'workers': workers,
+    }
+    manifest = {'summary': summary, 'files': records}
+    with open(os.path.join(out_dir, MANIFEST_NAME), 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, ensure_ascii=False, indent=2)
+    logger.info("Lote terminado: %d documentos (%d fallidos) en %.1f s (%.2f docs/s).",
+                summary['documents'], summary['failed'], elapsed, summary['docs_per_second'])
+    return manifest
+
+
+def format_summary(summary: dict) -> str:
+    lines = [
+        "Documentos: {documents} ({succeeded} correctos, {failed} fallidos)".format(**summary),
+        "Tiempo: {:.2f} s  ({:.2f} docs/s, {} procesos)".format(
+            summary['seconds'], summary['docs_per_second'], summary['workers']),
+        "Totales por etapa: " + ", ".join(
+            "{} {:.2f} s".format(s, t) for s, t in summary['stage_seconds'].items()),
+    ]
+    return "\n".join(lines)
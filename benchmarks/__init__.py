@@ -0,0 +1 @@
+"""Benchmarks por etapa y generador de corpus sintéticos."""
@@ -0,0 +1,237 @@
+"""Benchmark de `heuristics.extract_cause_effect_dep` frente al motor anterior de `main.py`.
+
+Parsea una vez un corpus sintético (`corpus_gen`) con el pipeline
+planificado y aplica ambas implementaciones a las mismas oraciones. Mide el
+coste por oración y clasifica las diferencias: la versión anterior devolvía
+offsets relativos a la oración en la regla de verbos causales (por `as_doc`)
+y buscaba los marcadores como subcadenas ('so' dentro de 'also').
+
+Sin un modelo con `parser` la regla de verbos causales (sujeto y objeto por
+`left_edge`/`right_edge`) nunca se ejecuta; en ese caso se usa un corpus con
+el análisis ya anotado (`heads`, `deps`, `lemmas`), como en los tests.
+
+    python benchmarks/bench_dep_heuristics.py [--size 1MB] [--density dense] [--seed S]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus_gen import DENSITIES, SUBJECTS, VERBS, generate_corpus, parse_size  # noqa: E402
+from heuristics import extract_cause_effect_dep  # noqa: E402
+from pipeline_planner import load_planned_pipeline  # noqa: E402
+
+
+def legacy_extract_cause_effect(sent):
+    """Implementación previa de `main.extract_cause_effect` (copia literal) usada como referencia."""
+    sent_doc = sent.as_doc()
+    lower_text = sent.text.lower()
+    spans = []
+
+    # Marcadores comunes y su tratamiento
+    markers = ["because", "due to", "caused by", "causes", "cause", "leads to", "lead to", "led to", "if", "then", "therefore", "so that", "as a result"]
+
+    # Buscar tokens que sean marcadores
+    marker_token = None
+    marker_text = None
+    for tok in sent_doc:
+        for m in markers:
+            if tok.text.lower() == m.split()[0] and m in lower_text:
+                marker_token = tok
+                marker_text = m  # noqa: F841  (copia literal del código original)
+                break
+        if marker_token:
+            break
+
+    def add_span_by_chars(role, abs_start, abs_end):
+        spans.append((role, abs_start, abs_end))
+
+    if re.search(r"\bif\b", lower_text):
+        m = re.search(r"\bif\s+([^,]+),\s*(.+)$", sent.text, flags=re.I)
+        if m:
+            cause_str = m.group(1).strip()
+            effect_str = m.group(2).strip()
+            s1 = sent.start_char + sent.text.find(cause_str)
+            e1 = s1 + len(cause_str)
+            s2 = sent.start_char + sent.text.find(effect_str, sent.text.find(cause_str) + len(cause_str))
+            e2 = s2 + len(effect_str)
+            add_span_by_chars('cause', s1, e1)
+            add_span_by_chars('effect', s2, e2)
+            return spans
+        m2 = re.search(r"\bif\s+(.+)\bthen\b\s+(.+)$", lower_text)
+        if m2:
+            parts = re.split(r"\bthen\b", sent.text, flags=re.I)
+            if len(parts) >= 2:
+                cause_str = parts[0].replace('If', '').strip()
+                effect_str = parts[1].strip()
+                s1 = sent.start_char + sent.text.find(cause_str)
+                e1 = s1 + len(cause_str)
+                s2 = sent.start_char + sent.text.find(effect_str)
+                e2 = s2 + len(effect_str)
+                add_span_by_chars('cause', s1, e1)
+                add_span_by_chars('effect', s2, e2)
+                return spans
+
+    for marker in [" because ", " due to ", " caused by ", " caused ", " as a result of "]:
+        if marker in lower_text:
+            idx = lower_text.find(marker)
+            left = sent.text[:idx].strip()
+            right = sent.text[idx + len(marker):].strip()
+            if left:
+                s_left = sent.start_char + sent.text.find(left)
+                add_span_by_chars('effect', s_left, s_left + len(left))
+            if right:
+                s_right = sent.start_char + sent.text.find(right, idx + len(marker))
+                add_span_by_chars('cause', s_right, s_right + len(right))
+            return spans
+
+    causal_verbs = ['lead', 'lead to', 'cause', 'result', 'produce', 'trigger']
+    for tok in sent_doc:
+        if tok.lemma_.lower() in causal_verbs:
+            subj = None
+            dobj = None
+            for child in tok.children:
+                if child.dep_ in ('nsubj', 'nsubjpass'):
+                    subj = list(child.subtree)
+                if child.dep_ in ('dobj', 'pobj', 'attr', 'oprd'):
+                    dobj = list(child.subtree)
+
+            if subj:
+                s = min([t.idx for t in subj])
+                e = max([t.idx + len(t.text) for t in subj])
+                add_span_by_chars('cause', s, e)
+            if dobj:
+                s = min([t.idx for t in dobj])
+                e = max([t.idx + len(t.text) for t in dobj])
+                add_span_by_chars('effect', s, e)
+            if subj or dobj:
+                return spans
+
+    concl_markers = ['therefore', 'thus', 'so', 'hence', 'as a result']
+    for m in concl_markers:
+        if m in lower_text:
+            idx = lower_text.find(m)
+            left = sent.text[:idx].strip()
+            right = sent.text[idx + len(m):].strip()
+            if left:
+                s_rel = sent.text.find(left)
+                if s_rel != -1:
+                    s_abs = sent.start_char + s_rel
+                    add_span_by_chars('cause', s_abs, s_abs + len(left))
+            if right:
+                s_rel = sent.text.find(right, idx + len(m))
+                if s_rel != -1:
+                    s_abs = sent.start_char + s_rel
+                    add_span_by_chars('effect', s_abs, s_abs + len(right))
+            return spans
+
+    return []
+
+
+_CAUSAL_VERBS = [("causes", "cause"), ("produces", "produce"), ("triggers", "trigger")]
+
+
+def _noun_phrase(phrase, dep, head, offset):
+    """Palabras, heads, deps y lemmas de un sintagma ('the engine' -> det + núcleo)."""
+    words = phrase.split()
+    root = offset + len(words) - 1
+    heads = [root] * (len(words) - 1) + [head]
+    deps = ["det"] * (len(words) - 1) + [dep]
+    return words, heads, deps, [w.lower() for w in words]
+
+
+def _annotated_sentence(rng, causal, offset):
+    """Oración con el análisis de dependencias escrito a mano, empezando en el token `offset`."""
+    subject = rng.choice(SUBJECTS)
+    verb_at = offset + len(subject.split())
+    words, heads, deps, lemmas = _noun_phrase(subject, "nsubj", verb_at, offset)
+    words[0] = words[0].capitalize()
+    if causal:
+        verb, lemma = rng.choice(_CAUSAL_VERBS)
+        obj = _noun_phrase(rng.choice(SUBJECTS), "dobj", verb_at, verb_at + 1)
+    else:
+        verb = lemma = rng.choice(VERBS)
+        obj = ([], [], [], [])
+    words += [verb] + obj[0] + ["."]
+    heads += [verb_at] + obj[1] + [verb_at]
+    deps += ["ROOT"] + obj[2] + ["punct"]
+    lemmas += [lemma] + obj[3] + ["."]
+    return words, heads, deps, lemmas
+
+
+def annotated_corpus(vocab, size, density: str = 'dense', seed: int = 0, sents_per_doc: int = 200):
+    """`Doc`s con heads/deps/lemmas anotados (sin parser) hasta unos `size` caracteres."""
+    from spacy.tokens import Doc
+
+    ratio = DENSITIES.get(density, density)
+    rng = random.Random(seed)
+    docs, produced = [], 0
+    while produced < parse_size(size):
+        words, heads, deps, lemmas = [], [], [], []
+        for _ in range(sents_per_doc):
+            w, h, d, lem = _annotated_sentence(rng, rng.random() < ratio, len(words))
+            words += w
+            heads += h
+            deps += d
+            lemmas += lem
+        spaces = [i + 1 < len(words) and words[i + 1] != "." for i in range(len(words))]
+        doc = Doc(vocab, words=words, spaces=spaces, heads=heads, deps=deps, lemmas=lemmas)
+        produced += len(doc.text)
+        docs.append(doc)
+    return docs
+
+
+def _time(fn, sents, repeat):
+    best, out = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = [fn(s) for s in sents]
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out
+
+
+def _relative_offsets(sent, legacy, new):
+    """True si sólo difieren en que la versión anterior dio offsets relativos a la oración."""
+    shifted = [(role, a + sent.start_char, b + sent.start_char) for role, a, b in legacy]
+    return shifted == new
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', default='1MB')
+    parser.add_argument('--density', choices=sorted(DENSITIES), default='dense')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    nlp, _ = load_planned_pipeline(engine='dependency')
+    if 'parser' in nlp.pipe_names:
+        text = generate_corpus(args.size, args.density, args.seed)
+        docs = nlp.pipe([text[i:i + 100_000] for i in range(0, len(text), 100_000)])
+        corpus = "corpus_gen parseado"
+    else:
+        docs = annotated_corpus(nlp.vocab, args.size, args.density, args.seed)
+        corpus = "anotado a mano (no hay ningún modelo con parser instalado)"
+    sents = [sent for doc in docs for sent in doc.sents]
+    legacy_s, legacy = _time(legacy_extract_cause_effect, sents, args.repeat)
+    new_s, new = _time(extract_cause_effect_dep, sents, args.repeat)
+    same = sum(a == b for a, b in zip(legacy, new))
+    relative = sum(a != b and _relative_offsets(s, a, b) for s, a, b in zip(sents, legacy, new))
+    n = len(sents)
+    print("pipeline:   {}".format(", ".join(nlp.pipe_names)))
+    print("corpus:     {}".format(corpus))
+    print("oraciones:  {}".format(n))
+    print("legacy:     {:8.3f} s  ({:.2f} us/oración)".format(legacy_s, legacy_s / n * 1e6))
+    print("arrays:     {:8.3f} s  ({:.2f} us/oración)".format(new_s, new_s / n * 1e6))
+    print("speedup:    {:8.2f}x".format(legacy_s / new_s if new_s else float('inf')))
+    print("idénticos: {}  offsets relativos corregidos: {}  otros: {}".format(
+        same, relative, n - same - relative))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark de `heuristics.extract_cause_effect_basic` frente a la versión anterior.
+
+Genera oraciones sintéticas (por defecto un millón), mide el coste por oración
+de ambas implementaciones y cuenta en cuántas coinciden los resultados.
+
+    python benchmarks/bench_heuristics.py [--sentences N] [--seed S]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from collections import namedtuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from heuristics import extract_cause_effect_basic  # noqa: E402
+
+Sent = namedtuple('Sent', 'text start_char')
+
+SUBJECTS = ["the engine", "prices", "the storm", "our team", "the river", "demand", "the server"]
+VERBS = ["failed", "rose", "collapsed", "improved", "flooded", "slowed", "crashed"]
+TEMPLATES = [
+    "{S} {V} because {s} {v}.",
+    "If {s} {v}, then {S} {V}.",
+    "If {s} {v}, {S} {V}.",
+    "{S} leads to {s} that {v}.",
+    "{S} {V} on Tuesday and {s} {v} later.",
+    "{S} {V}.",
+    "{S} {V} because {S} {V}.",
+]
+
+
+def legacy_extract_cause_effect_basic(sent):
+    """Implementación previa (copia literal) usada como referencia."""
+    text = sent.text
+    lower = text.lower()
+    base = sent.start_char
+    if 'because' in lower:
+        idx = lower.find('because')
+        left = text[:idx].strip()
+        right = text[idx + len('because'):].strip(' ,.')
+        spans = []
+        if left:
+            s = base + text.find(left)
+            spans.append(('effect', s, s + len(left)))
+        if right:
+            s2 = base + text.find(right)
+            spans.append(('cause', s2, s2 + len(right)))
+        return spans
+    m = re.search(r"\bif\b\s*(.+?),\s*(then\s*)?(.+)", lower)
+    if m:
+        cause = m.group(1).strip()
+        effect = m.group(3).strip()
+        if cause and effect:
+            s1 = base + text.lower().find(cause)
+            s2 = base + text.lower().find(effect)
+            return [('cause', s1, s1 + len(cause)), ('effect', s2, s2 + len(effect))]
+    m2 = re.search(r"(.+?)\s+lead[s]?\s+to\s+(.+)", lower)
+    if m2:
+        left = m2.group(1).strip()
+        right = m2.group(2).strip()
+        s1 = base + text.lower().find(left)
+        s2 = base + text.lower().find(right)
+        return [('cause', s1, s1 + len(left)), ('effect', s2, s2 + len(right))]
+    return []
+
+
+def synthetic_sentences(n, seed=0):
+    rng = random.Random(seed)
+    offset = 0
+    sents = []
+    for _ in range(n):
+        text = rng.choice(TEMPLATES).format(
+            S=rng.choice(SUBJECTS).capitalize(), V=rng.choice(VERBS),
+            s=rng.choice(SUBJECTS), v=rng.choice(VERBS))
+        sents.append(Sent(text, offset))
+        offset += len(text) + 1
+    return sents
+
+
+def _time(fn, sents):
+    t0 = time.perf_counter()
+    out = [fn(s) for s in sents]
+    return time.perf_counter() - t0, out
+
+
+def _pieces(sent, spans):
+    return [(role, sent.text[a - sent.start_char:b - sent.start_char].lower()) for role, a, b in spans]
+
+
+def _overlaps(spans):
+    ordered = sorted(spans, key=lambda s: s[1])
+    return any(b[1] < a[2] for a, b in zip(ordered, ordered[1:]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sentences', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sents = synthetic_sentences(args.sentences, args.seed)
+    legacy_s, legacy = _time(legacy_extract_cause_effect_basic, sents)
+    compiled_s, compiled = _time(extract_cause_effect_basic, sents)
+    same = sum(a == b for a, b in zip(legacy, compiled))
+    # Misma subcadena pero en otra posición: la versión anterior usaba `find` y
+    # tomaba la primera aparición, solapando causa y efecto.
+    diff_ok = sum(a != b and _pieces(s, a) == _pieces(s, b) and _overlaps(a) and not _overlaps(b)
+                  for s, a, b in zip(sents, legacy, compiled))
+    n = len(sents)
+    print("oraciones:            {}".format(n))
+    print("legacy:   {:8.3f} s  ({:.2f} us/oración)".format(legacy_s, legacy_s / n * 1e6))
+    print("compiled: {:8.3f} s  ({:.2f} us/oración)".format(compiled_s, compiled_s / n * 1e6))
+    print("speedup:  {:8.2f}x".format(legacy_s / compiled_s if compiled_s else float('inf')))
+    print("idénticos: {}  distintos con offsets corregidos: {}  otros: {}".format(
+        same, diff_ok, n - same - diff_ok))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Generador de corpus sintéticos para los benchmarks.
+
+Construye texto en inglés con una proporción configurable de oraciones
+causales ("dense" ≈ 60 %, "sparse" ≈ 3 %), agrupado en párrafos, desde unos KB
+hasta decenas de MB. También escribe PDFs mínimos con capa de texto.
+
+    python benchmarks/corpus_gen.py --size 5MB --density dense -o corpus.txt
+"""
+import argparse
+import random
+
+DENSITIES = {'dense': 0.6, 'sparse': 0.03}
+
+SUBJECTS = ["the engine", "prices", "the storm", "the committee", "the river", "demand",
+            "the server", "the harvest", "our team", "the bridge", "inflation", "the vaccine"]
+VERBS = ["failed", "rose", "collapsed", "improved", "flooded", "slowed", "crashed", "recovered",
+         "expanded", "closed"]
+ADVERBS = ["quickly", "on Tuesday", "without warning", "after the meeting", "last year", "again"]
+CAUSAL = [
+    "{S} {V} because {s} {v}.",
+    "If {s} {v}, then {s2} {v2}.",
+    "If {s} {v}, {s2} {v2} {a}.",
+    "{S} leads to {s} that {v}.",
+    "{S} {V} due to {s}.",
+    "{S} {V} as a result of {s}.",
+    "{S} caused {s} to fail {a}.",
+]
+NEUTRAL = [
+    "{S} {V} {a}.",
+    "{S} and {s} {v} {a}.",
+    "Everyone agreed that {s} {v}.",
+    "{S} was mentioned in the report.",
+    "Nobody expected {s} to be discussed {a}.",
+]
+
+_SIZE_UNITS = {'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'B': 1}
+
+
+def parse_size(value) -> int:
+    """'10KB', '50MB', '1024' -> bytes."""
+    value = str(value).strip().upper()
+    for unit, factor in _SIZE_UNITS.items():
+        if value.endswith(unit):
+            return int(float(value[:-len(unit)]) * factor)
+    return int(value)
+
+
+def _sentence(rng, causal):
+    template = rng.choice(CAUSAL if causal else NEUTRAL)
+    return template.format(
+        S=rng.choice(SUBJECTS).capitalize(), V=rng.choice(VERBS),
+        s=rng.choice(SUBJECTS), v=rng.choice(VERBS),
+        s2=rng.choice(SUBJECTS), v2=rng.choice(VERBS), a=rng.choice(ADVERBS))
+
+
+def iter_paragraphs(size: int, density: str = 'dense', seed: int = 0):
+    """Genera párrafos (terminados en línea en blanco) hasta sumar `size` caracteres."""
+    ratio = DENSITIES.get(density, density)
+    rng = random.Random(seed)
+    produced = 0
+    while produced < size:
+        sents = [_sentence(rng, rng.random() < ratio) for _ in range(rng.randint(3, 6))]
+        paragraph = " ".join(sents) + "\n\n"
+        if produced + len(paragraph) > size:
+            paragraph = paragraph[:size - produced]
+        produced += len(paragraph)
+        yield paragraph
+
+
+def generate_corpus(size, density: str = 'dense', seed: int = 0) -> str:
+    return "".join(iter_paragraphs(parse_size(size), density, seed))
+
+
+def write_corpus(path: str, size, density: str = 'dense', seed: int = 0) -> str:
+    """Escribe el corpus en `path` párrafo a párrafo (sin tenerlo entero en memoria)."""
+    with open(path, 'w', encoding='utf-8') as fh:
+        for paragraph in iter_paragraphs(parse_size(size), density, seed):
+            fh.write(paragraph)
+    return path
+
+
+def paginate(text: str, lines_per_page: int = 45, line_chars: int = 90):
+    """Parte `text` en páginas de líneas cortas para `write_text_pdf`."""
+    lines = []
+    for paragraph in text.split("\n"):
+        while len(paragraph) > line_chars:
+            cut = paragraph.rfind(" ", 0, line_chars)
+            cut = cut if cut > 0 else line_chars
+            lines.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip()
+        lines.append(paragraph)
+    return ["\n".join(lines[i:i + lines_per_page]) for i in range(0, len(lines), lines_per_page)]
+
+
+def write_text_pdf(path, pages):
+    """Escribe un PDF mínimo con Helvetica; cada página es una cadena (líneas con '\\n', '' = sin texto)."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        ops = []
+        for line in text.split("\n") if text else []:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            ops.append("({}) Tj".format(escaped))
+        stream = "BT /F1 10 Tf 12 TL 72 740 Td {} ET".format(" T* ".join(ops)).encode("latin-1", "replace") \
+            if ops else b""
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                        "/Resources << /Font << /F1 3 0 R >> >> /Contents {} 0 R >>"
+                        .format(content_id)).encode())
+        kids.append("{} 0 R".format(len(objects)))
+    objects[1] = "<< /Type /Pages /Kids [{}] /Count {} >>".format(" ".join(kids), len(kids)).encode()
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as fh:
+        fh.write(bytes(out))
+    return str(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un corpus sintético causal.")
+    parser.add_argument('--size', default='1MB', help="tamaño objetivo (10KB, 50MB, ...)")
+    parser.add_argument('--density', default='dense', choices=sorted(DENSITIES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--pdf', action='store_true', help="escribir un PDF en lugar de texto")
+    parser.add_argument('-o', '--output', required=True)
+    args = parser.parse_args(argv)
+    if args.pdf:
+        write_text_pdf(args.output, paginate(generate_corpus(args.size, args.density, args.seed)))
+    else:
+        write_corpus(args.output, args.size, args.density, args.seed)
+
+
+if __name__ == '__main__':
+    main()
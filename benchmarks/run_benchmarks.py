@@ -0,0 +1,201 @@
+"""Benchmarks por etapa y de extremo a extremo.
+
+Mide, sobre corpus sintéticos causal-dense y causal-sparse de los tamaños
+pedidos: extracción de PDF, parseo spaCy, matching con
+`setup_causal_matcher`, `extract_cause_effect_basic`,
+`normalize_and_merge_spans`, `generate_html_report` y el análisis completo.
+Los resultados se guardan en JSON; con `--compare` se contrastan con una
+ejecución anterior y se marcan las regresiones.
+
+    python benchmarks/run_benchmarks.py --sizes 10KB,1MB -o bench.json
+    python benchmarks/run_benchmarks.py --sizes 10KB,1MB --compare bench.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import spacy  # noqa: E402
+
+from analyzer import analyze_text, iter_text_chunks, normalize_and_merge_spans  # noqa: E402
+from benchmarks.corpus_gen import generate_corpus, paginate, parse_size, write_text_pdf  # noqa: E402
+from heuristics import extract_cause_effect_basic  # noqa: E402
+from html_utils import generate_html_report  # noqa: E402
+from matcher_utils import setup_causal_matcher  # noqa: E402
+from pdf_utils import extract_pages_from_pdf  # noqa: E402
+from pipeline_planner import load_planned_pipeline  # noqa: E402
+from spacy_utils import DEFAULT_MODEL  # noqa: E402
+
+STAGES = ['pdf_extract', 'parse', 'match', 'heuristics', 'merge', 'html', 'end_to_end']
+
+# Diferencias por debajo de este tiempo se consideran ruido al comparar.
+NOISE_FLOOR_SECONDS = 0.005
+
+
+def _timed(fn, repeat):
+    """Ejecuta `fn` `repeat` veces; devuelve (mejor tiempo, último resultado)."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_corpus(text, nlp, stages, repeat, workdir):
+    """Mide cada etapa sobre `text`; devuelve {etapa: (segundos, elementos)}."""
+    out = {}
+    if 'pdf_extract' in stages:
+        pdf_path = write_text_pdf(os.path.join(workdir, 'corpus.pdf'), paginate(text))
+        seconds, pages = _timed(lambda: extract_pages_from_pdf(pdf_path), repeat)
+        out['pdf_extract'] = (seconds, len(pages))
+
+    chunks = list(iter_text_chunks(text, min(100_000, nlp.max_length)))
+    seconds, docs = _timed(lambda: list(nlp.pipe(chunks)), repeat)
+    if 'parse' in stages:
+        out['parse'] = (seconds, sum(1 for d in docs for _ in d.sents))
+
+    matcher = setup_causal_matcher(nlp)
+    seconds, matches = _timed(lambda: [matcher(d) for d in docs], repeat)
+    if 'match' in stages:
+        out['match'] = (seconds, sum(len(m) for m in matches))
+
+    sentences = [d[start:end].sent for d, ms in zip(docs, matches) for _, start, end in ms]
+    seconds, raw = _timed(lambda: [s for sent in sentences for s in extract_cause_effect_basic(sent)], repeat)
+    if 'heuristics' in stages:
+        out['heuristics'] = (seconds, len(sentences))
+
+    # Offsets relativos a cada trozo: se desplazan para el merge global.
+    offsets, pos = [], 0
+    for c in chunks:
+        offsets.append(pos)
+        pos += len(c)
+    doc_offset = {id(d): o for d, o in zip(docs, offsets)}
+    spans = [(role, a + doc_offset[id(sent.doc)], b + doc_offset[id(sent.doc)])
+             for sent in sentences for role, a, b in extract_cause_effect_basic(sent)]
+    seconds, merged = _timed(lambda: normalize_and_merge_spans(text, spans), repeat)
+    if 'merge' in stages:
+        out['merge'] = (seconds, len(merged))
+
+    html_path = os.path.join(workdir, 'report.html')
+    if 'html' in stages:
+        seconds, _ = _timed(lambda: generate_html_report(text, merged, html_path), repeat)
+        out['html'] = (seconds, len(merged))
+
+    if 'end_to_end' in stages:
+        def end_to_end():
+            highlights = analyze_text(text, nlp)
+            generate_html_report(text, highlights, html_path)
+            return highlights
+        seconds, highlights = _timed(end_to_end, repeat)
+        out['end_to_end'] = (seconds, len(highlights))
+    return out
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(sizes, densities, stages, repeat, model, seed=0):
+    nlp, plan = load_planned_pipeline(model)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for density in densities:
+            for size in sizes:
+                text = generate_corpus(size, density, seed)
+                for stage, (seconds, items) in run_corpus(text, nlp, stages, repeat, workdir).items():
+                    results.append({
+                        'stage': stage,
+                        'corpus': "{}-{}".format(density, size),
+                        'chars': len(text),
+                        'seconds': seconds,
+                        'chars_per_second': len(text) / seconds if seconds else None,
+                        'items': items,
+                    })
+    return {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'git': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'spacy': spacy.__version__,
+            'model': plan.get('model'),
+            'pipeline': plan.get('active'),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Lista de regresiones: etapas al menos un `threshold` (fracción) más lentas que en `baseline`."""
+    before = {(r['stage'], r['corpus']): r for r in baseline['results']}
+    regressions = []
+    for r in current['results']:
+        old = before.get((r['stage'], r['corpus']))
+        if not old:
+            continue
+        delta = r['seconds'] - old['seconds']
+        if delta > NOISE_FLOOR_SECONDS and r['seconds'] > old['seconds'] * (1 + threshold):
+            regressions.append({'stage': r['stage'], 'corpus': r['corpus'], 'before': old['seconds'],
+                                'after': r['seconds'], 'ratio': r['seconds'] / old['seconds']})
+    return regressions
+
+
+def format_results(report):
+    lines = ["{:<12} {:<16} {:>10} {:>12} {:>10}".format('etapa', 'corpus', 'segundos', 'chars/s', 'elementos')]
+    for r in report['results']:
+        lines.append("{:<12} {:<16} {:>10.4f} {:>12.0f} {:>10}".format(
+            r['stage'], r['corpus'], r['seconds'], r['chars_per_second'] or 0, r['items']))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10KB,100KB,1MB', help="tamaños de corpus (10KB..50MB)")
+    parser.add_argument('--densities', default='dense,sparse')
+    parser.add_argument('--stages', default=','.join(STAGES))
+    parser.add_argument('--repeat', type=int, default=3, help="repeticiones por etapa (se guarda la mejor)")
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help="JSON de una ejecución anterior")
+    parser.add_argument('--threshold', type=float, default=0.2, help="fracción de empeoramiento tolerada")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip() for s in args.sizes.split(',') if s.strip()]
+    for s in sizes:
+        parse_size(s)
+    report = run(sizes, args.densities.split(','), set(args.stages.split(',')), args.repeat, args.model, args.seed)
+    with open(args.output, 'w', encoding='utf-8') as fh:
+        json.dump(report, fh, indent=2)
+    print(format_results(report))
+    print("Resultados guardados en {}".format(args.output))
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as fh:
+            baseline = json.load(fh)
+        regressions = compare(report, baseline, args.threshold)
+        for r in regressions:
+            print("REGRESIÓN {stage} [{corpus}]: {before:.4f} s -> {after:.4f} s ({ratio:.2f}x)".format(**r))
+        if regressions:
+            return 1
+        print("Sin regresiones respecto a {}".format(args.compare))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""Caché opcional de documentos ya parseados, como fragmentos `DocBin`.
+
+La clave sólo depende del texto, del modelo (ver `result_cache.model_fingerprint`)
+y del troceo, no de las reglas: al cambiar marcadores o heurísticas la caché de
+resultados falla pero los `Doc` se leen de aquí y sólo se repiten el matcher,
+las heurísticas y la fusión.
+
+Cada documento ocupa una entrada de manifiesto (offsets de los trozos y
+número de fragmentos) y un `DocBin` por cada `SHARD_DOCS` trozos. Si el
+desalojo LRU se lleva algún fragmento, la entrada entera cuenta como fallo.
+"""
+import json
+import os
+
+from cache_utils import SQLiteCache, default_cache_dir, sha256_hex
+from result_cache import model_fingerprint
+
+# Súbase cuando cambie la forma de lo guardado.
+DOC_CACHE_FORMAT = "1"
+
+# Trozos (`Doc`) por fragmento `DocBin`.
+SHARD_DOCS = 8
+
+# Los `Doc` serializados ocupan bastante más que el texto: límite propio, mayor que el de resultados.
+DEFAULT_DOC_CACHE_BYTES = 2 * 1024 * 1024 * 1024
+
+
+def open_doc_cache(path: str = None, max_bytes: int = DEFAULT_DOC_CACHE_BYTES) -> SQLiteCache:
+    return SQLiteCache(path or os.path.join(default_cache_dir(), 'docs.sqlite'), max_bytes)
+
+
+def doc_key(text: str, nlp, max_chars: int) -> str:
+    """Clave de los `Doc` de `text` parseado por `nlp` en trozos de `max_chars`."""
+    return sha256_hex(DOC_CACHE_FORMAT, sha256_hex(text), model_fingerprint(nlp), str(max_chars))
+
+
+def load_docs(cache, key: str, nlp):
+    """Lista de `(doc, offset)` guardada para `key`, con el vocabulario de `nlp` (None si falta)."""
+    from spacy.tokens import DocBin
+
+    manifest = cache.get(key)
+    if manifest is None:
+        return None
+    manifest = json.loads(manifest.decode('utf-8'))
+    docs = []
+    for i in range(manifest['shards']):
+        data = cache.get("{}/{}".format(key, i))
+        if data is None:
+            return None
+        docs.extend(DocBin().from_bytes(data).get_docs(nlp.vocab))
+    if len(docs) != len(manifest['offsets']):
+        return None
+    return list(zip(docs, manifest['offsets']))
+
+
+def store_docs(cache, key: str, items):
+    """Guarda `(doc, offset)` en fragmentos `DocBin`; el manifiesto se escribe el último."""
+    from spacy.tokens import DocBin
+
+    offsets = [offset for _, offset in items]
+    shards = 0
+    for i in range(0, len(items), SHARD_DOCS):
+        shard = DocBin(docs=[doc for doc, _ in items[i:i + SHARD_DOCS]])
+        cache.put("{}/{}".format(key, shards), shard.to_bytes())
+        shards += 1
+    cache.put(key, json.dumps({'shards': shards, 'offsets': offsets}).encode('utf-8'))
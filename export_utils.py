@@ -0,0 +1,234 @@
+"""Exportación de los highlights a formatos legibles por máquina.
+
+Los exportadores son *sinks* que `html_utils.write_html_report` alimenta en el
+mismo recorrido que genera el informe HTML, así que cada formato extra sólo
+cuesta su propia escritura:
+
+- `JSONLSink`: un objeto JSON por línea (`role`, `start`, `end`, `page`, `text`)
+  y, opcionalmente, un índice binario (`SpanIndex`) con la posición de cada
+  línea, para consultar rangos de caracteres o de páginas sin leer el JSONL.
+- `ParquetSink`: el mismo contenido en columnas Parquet (requiere `pyarrow`).
+
+Las páginas se numeran desde 1; sin tabla de offsets todo cae en la página 1.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+from array import array
+
+from pdf_utils import page_at
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('jsonl', 'parquet')
+
+INDEX_MAGIC = b"RSPX"
+INDEX_VERSION = 1
+# magic, versión, nº de spans, bytes de la tabla de roles (JSON), relleno hasta 8.
+_INDEX_HEADER = struct.Struct("<4sHQI2x")
+
+# Filas acumuladas por cada row group de Parquet.
+PARQUET_ROW_GROUP = 64 * 1024
+
+
+class _Sink:
+    """Base de los exportadores: resuelve la página de cada span y hace de context manager."""
+
+    def __init__(self, page_offsets=None):
+        self.page_offsets = page_offsets or [0]
+
+    def page(self, start):
+        return page_at(self.page_offsets, start) + 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JSONLSink(_Sink):
+    """Escribe un highlight por línea en `path` y, si se da `index_path`, su índice binario."""
+
+    def __init__(self, path: str, index_path: str = None, page_offsets=None):
+        super().__init__(page_offsets)
+        self.path = path
+        self.index_path = index_path
+        self._fh = open(path, 'wb', buffering=1024 * 1024)
+        self._pos = 0
+        self._roles = {}
+        self._cols = {'starts': array('q'), 'ends': array('q'), 'offsets': array('Q'),
+                      'pages': array('i'), 'roles': array('B')}
+
+    def write(self, role, start, end, text):
+        page = self.page(start)
+        line = json.dumps({'role': role, 'start': start, 'end': end, 'page': page, 'text': text[start:end]},
+                          ensure_ascii=False).encode('utf-8') + b"\n"
+        if self.index_path:
+            cols = self._cols
+            cols['starts'].append(start)
+            cols['ends'].append(end)
+            cols['offsets'].append(self._pos)
+            cols['pages'].append(page)
+            cols['roles'].append(self._roles.setdefault(role, len(self._roles)))
+        self._fh.write(line)
+        self._pos += len(line)
+
+    def close(self):
+        if self._fh.closed:
+            return
+        self._fh.close()
+        if self.index_path:
+            write_span_index(self.index_path, self._cols, list(self._roles))
+        logger.info("Highlights exportados a %s", self.path)
+
+
+class ParquetSink(_Sink):
+    """Escribe los highlights en Parquet por row groups de `PARQUET_ROW_GROUP` filas."""
+
+    def __init__(self, path: str, page_offsets=None):
+        super().__init__(page_offsets)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("La exportación a Parquet requiere 'pyarrow'.")
+        self._pa = pa
+        self.path = path
+        self.schema = pa.schema([('role', pa.string()), ('start', pa.int64()), ('end', pa.int64()),
+                                 ('page', pa.int32()), ('text', pa.string())])
+        self._writer = pq.ParquetWriter(path, self.schema)
+        self._rows = {name: [] for name in self.schema.names}
+
+    def write(self, role, start, end, text):
+        rows = self._rows
+        rows['role'].append(role)
+        rows['start'].append(start)
+        rows['end'].append(end)
+        rows['page'].append(self.page(start))
+        rows['text'].append(text[start:end])
+        if len(rows['role']) >= PARQUET_ROW_GROUP:
+            self._flush()
+
+    def _flush(self):
+        if self._rows['role']:
+            self._writer.write_table(self._pa.table(self._rows, schema=self.schema))
+            self._rows = {name: [] for name in self.schema.names}
+
+    def close(self):
+        if self._writer is None:
+            return
+        self._flush()
+        self._writer.close()
+        self._writer = None
+        logger.info("Highlights exportados a %s", self.path)
+
+
+def open_sinks(base_path: str, formats, page_offsets=None):
+    """Crea los sinks de `formats` junto a `base_path` (`.jsonl` + `.spanidx`, `.parquet`).
+
+    Los formatos cuya dependencia opcional no está instalada se omiten con un aviso.
+    """
+    stem = os.path.splitext(base_path)[0]
+    sinks = []
+    for fmt in formats:
+        if fmt == 'jsonl':
+            sinks.append(JSONLSink(stem + '.jsonl', stem + '.spanidx', page_offsets))
+        elif fmt == 'parquet':
+            try:
+                sinks.append(ParquetSink(stem + '.parquet', page_offsets))
+            except ImportError as e:
+                logger.warning("%s Se omite %s.parquet.", e, stem)
+        else:
+            raise ValueError("Formato de exportación desconocido: {}".format(fmt))
+    return sinks
+
+
+def write_span_index(path: str, columns, role_names):
+    """Escribe el índice binario: cabecera, roles y columnas alineadas a 8 bytes.
+
+    Columnas (little-endian, `n` elementos cada una): `starts` int64, `ends`
+    int64, `max_ends` int64 (máximo acumulado de `ends`), `offsets` uint64
+    (byte de inicio de la línea en el JSONL), `pages` int32 y `roles` uint8.
+    """
+    import numpy as np
+    n = len(columns['starts'])
+    roles_json = json.dumps(role_names).encode('utf-8')
+    ends = np.asarray(columns['ends'], dtype='<i8')
+    max_ends = np.maximum.accumulate(ends) if n else ends
+    with open(path, 'wb') as fh:
+        fh.write(_INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, n, len(roles_json)))
+        fh.write(roles_json + b"\0" * (-len(roles_json) % 8))
+        for values, dtype in ((columns['starts'], '<i8'), (ends, '<i8'), (max_ends, '<i8'),
+                              (columns['offsets'], '<u8'), (columns['pages'], '<i4'), (columns['roles'], 'u1')):
+            data = np.asarray(values, dtype=dtype).tobytes()
+            fh.write(data + b"\0" * (-len(data) % 8))
+
+
+class SpanIndex:
+    """Índice binario de un export JSONL, abierto con `mmap` (no se carga en memoria).
+
+    Los highlights exportados están ordenados por inicio, así que las consultas
+    por rango son búsquedas binarias sobre las columnas mapeadas.
+    """
+
+    def __init__(self, path: str, jsonl_path: str = None):
+        import numpy as np
+        from interval_index import IntervalIndex
+        self.path = path
+        self.jsonl_path = jsonl_path or os.path.splitext(path)[0] + '.jsonl'
+        with open(path, 'rb') as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n, roles_len = _INDEX_HEADER.unpack_from(self._mm, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError("{} no es un índice de spans compatible".format(path))
+        pos = _INDEX_HEADER.size
+        self.role_names = json.loads(self._mm[pos:pos + roles_len].decode('utf-8'))
+        pos += roles_len + (-roles_len % 8)
+        cols = {}
+        for name, dtype in (('starts', '<i8'), ('ends', '<i8'), ('max_ends', '<i8'),
+                            ('offsets', '<u8'), ('pages', '<i4'), ('roles', 'u1')):
+            cols[name] = np.frombuffer(self._mm, dtype=dtype, count=n, offset=pos)
+            pos += cols[name].nbytes + (-cols[name].nbytes % 8)
+        self.starts, self.ends, self.max_ends = cols['starts'], cols['ends'], cols['max_ends']
+        self.offsets, self.pages, self.roles = cols['offsets'], cols['pages'], cols['roles']
+        # Las columnas mapeadas ya tienen el orden y los `max_ends` de un `IntervalIndex`.
+        self.index = IntervalIndex(None, self.starts, self.ends, self.roles, self.role_names,
+                                   max_ends=self.max_ends)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _filter_role(self, idx, role):
+        if role is None:
+            return idx
+        if role not in self.role_names:
+            return idx[:0]
+        return idx[self.roles[idx] == self.role_names.index(role)]
+
+    def overlapping(self, start: int, end: int, role: str = None):
+        """Índices de los spans que se solapan con `[start, end)`."""
+        return self.index.overlapping(start, end, role)
+
+    def in_pages(self, first: int, last: int = None, role: str = None):
+        """Índices de los spans que empiezan entre las páginas `first` y `last` (incluidas, desde 1)."""
+        import numpy as np
+        last = first if last is None else last
+        lo = int(np.searchsorted(self.pages, first, side='left'))
+        hi = int(np.searchsorted(self.pages, last, side='right'))
+        return self._filter_role(np.arange(lo, hi), role)
+
+    def records(self, indices):
+        """Lee del JSONL sólo las líneas de `indices`."""
+        out = []
+        with open(self.jsonl_path, 'rb') as fh:
+            for i in indices:
+                fh.seek(int(self.offsets[i]))
+                out.append(json.loads(fh.readline().decode('utf-8')))
+        return out
+
+    def close(self):
+        self.starts = self.ends = self.max_ends = self.offsets = self.pages = self.roles = self.index = None
+        self._mm.close()
@@ -1,44 +1,175 @@
-"""Pequeña GUI opcional basada en tkinter."""
+"""Pequeña GUI opcional basada en tkinter.
+
+El modelo se carga y los documentos se analizan en un hilo de fondo; la
+ventana sólo consulta periódicamente (`root.after`) la cola de mensajes del
+hilo, así que nunca se bloquea y el análisis se puede cancelar.
+"""
 import logging
-from analyzer import analyze_text
-from spacy_utils import load_spacy_model
-from pdf_utils import extract_text_from_pdf, extract_text_from_scanned_pdf
+import os
+import queue
+import threading
+
+from analyzer import analyze_stream
 from html_utils import generate_html_report
+from pdf_utils import extract_pages_hybrid, join_pages, page_at, read_document
 
 logger = logging.getLogger(__name__)
 
+REPORT_PATH = "highlighted_report.html"
+
+# Cada cuánto (ms) la ventana recoge los mensajes del hilo de fondo.
+POLL_MS = 100
+
+
+class Cancelled(Exception):
+    pass
+
+
+def analyze_document(path: str, nlp, out_path: str = REPORT_PATH, cancel=None, progress=None, on_partial=None):
+    """Extrae, analiza por trozos (`analyze_stream`) y escribe el informe de `path`.
+
+    `progress(mensaje, fracción)` recibe el avance por páginas y oraciones.
+    Tras el primer trozo se escribe un informe parcial y se llama a
+    `on_partial(out_path)`. Si `cancel` (un `threading.Event`) se activa, se
+    deja de analizar y el informe se queda con la parte ya analizada.
+    Devuelve un resumen `{status, chars, analyzed_chars, highlights, sentences}`.
+    """
+    progress = progress or (lambda message, fraction: None)
+    if os.path.splitext(path)[1].lower() == '.pdf':
+        progress("Extrayendo texto del PDF...", 0.0)
+        pages = extract_pages_hybrid(path)
+    else:
+        pages = [read_document(path)]
+    text, page_offsets = join_pages(pages)
+    state = {'done': 0, 'sentences': 0, 'partial': False}
+    highlights = []
+
+    def on_chunk(end, sentences):
+        state['done'] = end
+        state['sentences'] += sentences
+        progress("Página {} de {} · {} oraciones".format(
+            page_at(page_offsets, max(end - 1, 0)) + 1, len(pages), state['sentences']),
+            end / len(text) if text else 1.0)
+        if not state['partial']:
+            state['partial'] = True
+            generate_html_report(text[:end], highlights, out_path)
+            if on_partial is not None:
+                on_partial(out_path)
+        if cancel is not None and cancel.is_set():
+            raise Cancelled()
+
+    status = 'done'
+    try:
+        for h in analyze_stream(text, nlp, on_chunk=on_chunk):
+            highlights.append(h)
+    except Cancelled:
+        status = 'cancelled'
+    if status == 'done':
+        state['done'] = len(text)
+    # Los highlights del trozo en curso al cancelar no llegan a `highlights`.
+    generate_html_report(text[:state['done']], highlights, out_path)
+    return {'status': status, 'chars': len(text), 'analyzed_chars': state['done'],
+            'highlights': len(highlights), 'sentences': state['sentences']}
+
 
-def run_gui():
+def _worker(jobs, messages, cancel, snapshot_dir=None):
+    """Hilo de fondo: carga el modelo (de `snapshot_dir` si se da) y atiende los trabajos de `jobs` de uno en uno."""
+    try:
+        from snapshot_utils import load_pipeline
+        nlp = load_pipeline(snapshot_dir=snapshot_dir)
+    except Exception as e:
+        logger.exception("No se pudo cargar el modelo.")
+        messages.put(('error', str(e)))
+        return
+    messages.put(('ready', None))
+    while True:
+        path = jobs.get()
+        if path is None:
+            return
+        cancel.clear()
+        try:
+            summary = analyze_document(
+                path, nlp, cancel=cancel,
+                progress=lambda message, fraction: messages.put(('progress', (message, fraction))),
+                on_partial=lambda out: messages.put(('partial', out)))
+            messages.put(('done', summary))
+        except Exception as e:
+            logger.exception("Error analizando %s.", path)
+            messages.put(('error', str(e)))
+
+
+def run_gui(snapshot_dir: str = None):
     try:
         import tkinter as tk
-        from tkinter import filedialog, messagebox
+        from tkinter import filedialog, messagebox, ttk
     except Exception:
         logger.exception("tkinter no disponible; GUI deshabilitada.")
         return
-
-    nlp = load_spacy_model()
+    import webbrowser
 
     root = tk.Tk()
     root.title("Causa-Efecto Highlighter")
 
+    jobs = queue.Queue()
+    messages = queue.Queue()
+    cancel = threading.Event()
+    threading.Thread(target=_worker, args=(jobs, messages, cancel, snapshot_dir), daemon=True).start()
+
+    status = tk.StringVar(value="Cargando modelo...")
+    progress = ttk.Progressbar(root, length=320, maximum=1.0)
+
     def pick_and_run():
         p = filedialog.askopenfilename()
         if p:
-            try:
-                ext = p.split('.')[-1].lower()
-                if ext == 'pdf':
-                    text = extract_text_from_pdf(p)
-                    if not text.strip():
-                        text = extract_text_from_scanned_pdf(p)
-                else:
-                    with open(p, 'r', encoding='utf-8') as fh:
-                        text = fh.read()
-                highlights = analyze_text(text, nlp)
-                generate_html_report(text, highlights)
-                messagebox.showinfo("Listo", "Reporte generado: highlighted_report.html")
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
-
-    btn = tk.Button(root, text="Seleccionar archivo y analizar", command=pick_and_run)
-    btn.pack(padx=20, pady=20)
+            btn.config(state='disabled')
+            cancel_btn.config(state='normal')
+            progress['value'] = 0
+            status.set("Analizando {}...".format(os.path.basename(p)))
+            jobs.put(p)
+
+    def finish():
+        btn.config(state='normal')
+        cancel_btn.config(state='disabled')
+
+    def poll():
+        try:
+            while True:
+                kind, payload = messages.get_nowait()
+                if kind == 'ready':
+                    status.set("Modelo listo.")
+                    btn.config(state='normal')
+                elif kind == 'progress':
+                    status.set(payload[0])
+                    progress['value'] = payload[1]
+                elif kind == 'partial':
+                    webbrowser.open('file://' + os.path.abspath(payload))
+                elif kind == 'done':
+                    finish()
+                    if payload['status'] == 'cancelled':
+                        status.set("Cancelado: informe parcial con {} highlights.".format(payload['highlights']))
+                    else:
+                        progress['value'] = 1.0
+                        status.set("Listo: {} highlights.".format(payload['highlights']))
+                        messagebox.showinfo("Listo", "Reporte generado: " + REPORT_PATH)
+                elif kind == 'error':
+                    finish()
+                    status.set("Error.")
+                    messagebox.showerror("Error", payload)
+        except queue.Empty:
+            pass
+        root.after(POLL_MS, poll)
+
+    def on_close():
+        cancel.set()
+        jobs.put(None)
+        root.destroy()
+
+    btn = tk.Button(root, text="Seleccionar archivo y analizar", command=pick_and_run, state='disabled')
+    btn.pack(padx=20, pady=(20, 5))
+    cancel_btn = tk.Button(root, text="Cancelar", command=cancel.set, state='disabled')
+    cancel_btn.pack(pady=5)
+    progress.pack(padx=20, pady=5)
+    tk.Label(root, textvariable=status).pack(padx=20, pady=(5, 20))
+    root.protocol("WM_DELETE_WINDOW", on_close)
+    root.after(POLL_MS, poll)
     root.mainloop()
@@ -1,36 +1,229 @@
-"""Heurísticas para identificar spans de causa y efecto en oraciones."""
+"""Heurísticas para identificar spans de causa y efecto en oraciones.
+
+Los patrones se compilan una sola vez al importar el módulo. Cada oración se
+recorre una vez con la expresión de marcadores y sólo se evalúa la regla del
+marcador encontrado; los offsets salen directamente de los grupos del match.
+
+`extract_cause_effect_dep` es el motor más completo (antes en `main.py`):
+busca los marcadores por token sobre los arrays de atributos de la oración
+(hashes LOWER/LEMMA) y usa el árbol de dependencias para los verbos causales,
+trabajando siempre sobre la vista `Span` sin copiar la oración a otro `Doc`.
+NumPy y spaCy se importan al usar ese motor, no al importar el módulo. Sus
+marcadores vienen del paquete de reglas (`dependency_markers`); los de
+`extract_cause_effect_basic` siguen aquí porque cada uno va ligado a la
+gramática de su regla ('X because Y', 'if X, Y', 'X leads to Y').
+"""
+import functools
 import re
 
+from rule_packs import load_rule_pack
+
+# Un único recorrido encuentra los tres tipos de marcador (en orden de prioridad: because > if > lead to).
+_MARKERS = re.compile(r"(?P<because>because)|(?P<if>\bif\b)|(?P<lead>\s+lead[s]?\s+to\s+)", re.IGNORECASE)
+# 'if X, (then) Y' anclado en la posición del 'if'.
+_IF_RULE = re.compile(r"if\b\s*(.+?),\s*(then\s*)?(.+)", re.IGNORECASE)
+# 'X leads to Y'.
+_LEAD_RULE = re.compile(r"(.+?)\s+lead[s]?\s+to\s+(.+)", re.IGNORECASE)
+
+_BECAUSE_LEN = len('because')
+
+
+def _strip(text, start, end, chars=None):
+    """Offsets de `text[start:end].strip(chars)` sin copiar la subcadena."""
+    if chars is None:
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+    else:
+        while start < end and text[start] in chars:
+            start += 1
+        while end > start and text[end - 1] in chars:
+            end -= 1
+    return start, end
+
+
+def extract_spans(text: str, base: int = 0):
+    """Aplica las heurísticas a `text` y devuelve `(role, start, end)` desplazados por `base`."""
+    if_positions = []
+    lead = False
+    for m in _MARKERS.finditer(text):
+        kind = m.lastgroup
+        if kind == 'because':
+            idx = m.start()
+            spans = []
+            a, b = _strip(text, 0, idx)
+            if a < b:
+                spans.append(('effect', base + a, base + b))
+            a, b = _strip(text, idx + _BECAUSE_LEN, len(text), ' ,.')
+            if a < b:
+                spans.append(('cause', base + a, base + b))
+            return spans
+        if kind == 'if':
+            if_positions.append(m.start())
+        else:
+            lead = True
+
+    for pos in if_positions:
+        m = _IF_RULE.match(text, pos)
+        if m:
+            c = _strip(text, *m.span(1))
+            e = _strip(text, *m.span(3))
+            if c[0] < c[1] and e[0] < e[1]:
+                return [('cause', base + c[0], base + c[1]), ('effect', base + e[0], base + e[1])]
+            break
+
+    if lead:
+        m = _LEAD_RULE.search(text)
+        if m:
+            c = _strip(text, *m.span(1))
+            e = _strip(text, *m.span(2))
+            return [('cause', base + c[0], base + c[1]), ('effect', base + e[0], base + e[1])]
+    return []
+
 
 def extract_cause_effect_basic(sent):
+    return extract_spans(sent.text, sent.start_char)
+
+
+# --- Motor con dependencias -------------------------------------------------
+
+_DEP_MARKERS = load_rule_pack()['dependency_markers']
+# Marcadores 'X because Y' (X = efecto, Y = causa), por orden de prioridad.
+_EFFECT_FIRST_MARKERS = tuple(_DEP_MARKERS.get('effect_first', ()))
+# Verbos causales por lema: sujeto = causa, objeto = efecto.
+_CAUSAL_LEMMAS = tuple(_DEP_MARKERS.get('causal_lemmas', ()))
+# Marcadores de conclusión: lo anterior es la causa y lo posterior el efecto.
+_CONCLUSION_MARKERS = tuple(_DEP_MARKERS.get('conclusion', ()))
+_SUBJECT_DEPS = ("nsubj", "nsubjpass")
+_OBJECT_DEPS = ("dobj", "pobj", "attr", "oprd")
+
+_IF_COMMA = re.compile(r"\bif\s+([^,]+),\s*(.+)$", re.IGNORECASE)
+_IF_THEN = re.compile(r"\bif\s+(.+)\bthen\b\s+(.+)$", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=None)
+def _hashes():
+    """IDs de cadena de los marcadores (hash o símbolo de spaCy; iguales en cualquier vocabulario)."""
+    import numpy as np
+    from spacy.attrs import LEMMA, LOWER
+    from spacy.strings import get_string_id
+
+    def seqs(markers):
+        return [tuple(get_string_id(w) for w in m.split()) for m in markers]
+
+    return {
+        'attrs': [LOWER, LEMMA],
+        'if': get_string_id("if"),
+        'effect_first': seqs(_EFFECT_FIRST_MARKERS),
+        'conclusion': seqs(_CONCLUSION_MARKERS),
+        'lemmas': np.array(sorted({get_string_id(v) for w in _CAUSAL_LEMMAS
+                                   for v in (w, w.capitalize(), w.upper())}), dtype=np.uint64),
+        'subject': frozenset(get_string_id(d) for d in _SUBJECT_DEPS),
+        'object': frozenset(get_string_id(d) for d in _OBJECT_DEPS),
+    }
+
+
+def _find_sequence(values, seq):
+    """Índice del primer token donde empieza la secuencia de hashes `seq`, o -1."""
+    import numpy as np
+    rest = list(seq[1:])
+    for i in np.flatnonzero(values == seq[0]).tolist():
+        if values[i + 1:i + 1 + len(rest)].tolist() == rest:
+            return i
+    return -1
+
+
+def _split_at(sent, text, first, last, before, after):
+    """Roles del texto a cada lado de los tokens `first..last` de `sent`."""
+    base = sent.start_char
+    a = sent[first].idx - base
+    end = sent[last]
+    b = end.idx + len(end) - base
+    spans = []
+    left = _strip(text, 0, a)
+    if left[0] < left[1]:
+        spans.append((before, base + left[0], base + left[1]))
+    right = _strip(text, b, len(text))
+    if right[0] < right[1]:
+        spans.append((after, base + right[0], base + right[1]))
+    return spans
+
+
+def _subtree_bounds(token):
+    right = token.right_edge
+    return token.left_edge.idx, right.idx + len(right)
+
+
+def _condition_spans(text, base):
+    for rule in (_IF_COMMA, _IF_THEN):
+        m = rule.search(text)
+        if m:
+            c = _strip(text, *m.span(1))
+            e = _strip(text, *m.span(2))
+            return [('cause', base + c[0], base + c[1]), ('effect', base + e[0], base + e[1])]
+    return None
+
+
+def extract_cause_effect_dep(sent):
+    """Spans `(role, start, end)` de causa y efecto en la oración `sent` (un `Span`).
+
+    Reglas, en orden: 'if X, Y' / 'if X then Y'; 'Y because/due to/caused by
+    X'; sujeto y objeto de un verbo causal (lead, cause, result, ...); y 'X
+    therefore/thus/so/hence Y'. Los marcadores se buscan como tokens (no como
+    subcadenas, así que 'also' no cuenta como 'so') y los límites de cada
+    subárbol salen de `left_edge`/`right_edge`. Todos los offsets son
+    absolutos en el documento.
+    """
+    import numpy as np
+    h = _hashes()
+    attrs = sent.to_array(h['attrs'])
+    lower, lemma = attrs[:, 0], attrs[:, 1]
     text = sent.text
-    lower = text.lower()
     base = sent.start_char
-    if 'because' in lower:
-        idx = lower.find('because')
-        left = text[:idx].strip()
-        right = text[idx + len('because'):].strip(' ,.')
+
+    if (lower == h['if']).any():
+        spans = _condition_spans(text, base)
+        if spans:
+            return spans
+
+    for seq in h['effect_first']:
+        i = _find_sequence(lower, seq)
+        if i >= 0:
+            return _split_at(sent, text, i, i + len(seq) - 1, 'effect', 'cause')
+
+    for i in np.flatnonzero(np.isin(lemma, h['lemmas'])).tolist():
+        subj = obj = None
+        for child in sent[i].children:
+            if child.dep in h['subject']:
+                subj = child
+            if child.dep in h['object']:
+                obj = child
         spans = []
-        if left:
-            s = base + text.find(left)
-            spans.append(('effect', s, s + len(left)))
-        if right:
-            s2 = base + text.find(right)
-            spans.append(('cause', s2, s2 + len(right)))
-        return spans
-    m = re.search(r"\bif\b\s*(.+?),\s*(then\s*)?(.+)", lower)
-    if m:
-        cause = m.group(1).strip()
-        effect = m.group(3).strip()
-        if cause and effect:
-            s1 = base + text.lower().find(cause)
-            s2 = base + text.lower().find(effect)
-            return [('cause', s1, s1 + len(cause)), ('effect', s2, s2 + len(effect))]
-    m2 = re.search(r"(.+?)\s+lead[s]?\s+to\s+(.+)", lower)
-    if m2:
-        left = m2.group(1).strip()
-        right = m2.group(2).strip()
-        s1 = base + text.lower().find(left)
-        s2 = base + text.lower().find(right)
-        return [('cause', s1, s1 + len(left)), ('effect', s2, s2 + len(right))]
+        if subj is not None:
+            spans.append(('cause',) + _subtree_bounds(subj))
+        if obj is not None:
+            spans.append(('effect',) + _subtree_bounds(obj))
+        if spans:
+            return spans
+
+    for seq in h['conclusion']:
+        i = _find_sequence(lower, seq)
+        if i >= 0:
+            return _split_at(sent, text, i, i + len(seq) - 1, 'cause', 'effect')
     return []
+
+
+# Motores de heurísticas por nombre (ver `pipeline_planner.ENGINE_REQUIREMENTS`).
+ENGINES = {
+    'basic': extract_cause_effect_basic,
+    'dependency': extract_cause_effect_dep,
+}
+
+
+def get_engine(name: str):
+    """Función `sent -> [(role, start, end)]` del motor `name`."""
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError("Motor de heurísticas desconocido: {}".format(name)) from None
@@ -1,11 +1,11 @@
 """Generación de HTML para los highlights detectados."""
+import html
 import logging
 
-logger = logging.getLogger(__name__)
 
+logger = logging.getLogger(__name__)
 
-def generate_html_report(text: str, highlights, out_path: str = "highlighted_report.html"):
-    css = """
+CSS = """
     body { font-family: sans-serif; line-height: 1.6; padding: 20px; }
     .causal_sentence { background-color: #fff8c4; padding: 3px; border-radius: 4px; }
     .cause { background-color: #ffd6d6; padding: 2px; border-radius: 3px; }
@@ -13,31 +13,59 @@ def generate_html_report(text: str, highlights, out_path: str = "highlighted_rep
     .legend span { display:inline-block; margin-right:10px; padding:4px; border-radius:4px; }
     """
 
-    pieces = []
-    last = 0
-    hs = sorted(highlights, key=lambda h: h['start']) if highlights else []
-    for h in hs:
-        if h['start'] > last:
-            pieces.append(text[last:h['start']])
-        seg = text[h['start']:h['end']]
-        pieces.append("<span class='{}'>{}</span>".format(h['role'], seg))
-        last = h['end']
-    if last < len(text):
-        pieces.append(text[last:])
-
-    html = """
+HTML_HEAD = """
     <html>
     <head><meta charset='utf-8'><style>{}</style></head>
     <body>
     <h1>Causal Analysis Report</h1>
     <div class='legend'><span class='cause'>Cause</span> <span class='effect'>Effect</span> <span class='causal_sentence'>Causal sentence</span></div>
     <div class='content'>
-    {}
+    """.format(CSS)
+
+HTML_TAIL = """
     </div>
     </body>
     </html>
-    """.format(css, ''.join(pieces))
+    """
+
+# Caracteres de texto que se escapan y escriben de una vez.
+WRITE_CHUNK_CHARS = 64 * 1024
+
+
+def _write_text(fh, text, start, end):
+    for a in range(start, end, WRITE_CHUNK_CHARS):
+        fh.write(html.escape(text[a:min(a + WRITE_CHUNK_CHARS, end)], quote=False))
+
+
+def write_html_report(text: str, highlights, fh, sinks=()):
+    """Escribe el informe en `fh` a medida que recorre el texto y el índice de highlights.
+
+    El texto se escapa y se escribe por trozos de `WRITE_CHUNK_CHARS`, así que
+    no se construye nunca una copia del documento completo. Cada highlight se
+    pasa también a los `sinks` (ver `export_utils`) en el mismo recorrido.
+    """
+    from interval_index import IntervalIndex
+    fh.write(HTML_HEAD)
+    last = 0
+    for role, start, end in IntervalIndex.build(highlights or (), text).iter_tuples():
+        for sink in sinks:
+            sink.write(role, start, end, text)
+        # Con spans sin fusionar, la parte ya escrita de un span solapado no se repite.
+        start = max(start, last)
+        if end <= start:
+            continue
+        if start > last:
+            _write_text(fh, text, last, start)
+        fh.write("<span class='{}'>".format(html.escape(role)))
+        _write_text(fh, text, start, end)
+        fh.write("</span>")
+        last = end
+    if last < len(text):
+        _write_text(fh, text, last, len(text))
+    fh.write(HTML_TAIL)
+
 
-    with open(out_path, 'w', encoding='utf-8') as fh:
-        fh.write(html)
+def generate_html_report(text: str, highlights, out_path: str = "highlighted_report.html", sinks=()):
+    with open(out_path, 'w', encoding='utf-8', buffering=1024 * 1024) as fh:
+        write_html_report(text, highlights, fh, sinks)
     logger.info("HTML report escrito en %s", out_path)
@@ -0,0 +1,151 @@
+"""Índice de intervalos sobre highlights: arrays ordenados con el máximo `end` acumulado.
+
+`IntervalIndex` es un `SpanStore` cuyos spans están ordenados por inicio (y,
+a igual inicio, el más largo primero) y que guarda además `max_ends`, el mayor
+`end` visto hasta cada posición. Con eso, todas las consultas por rango son
+dos búsquedas binarias más el recorrido de los candidatos:
+
+- `overlapping(a, b)`: spans que se solapan con `[a, b)`.
+- `within(a, b)`: spans contenidos por completo en `[a, b)`.
+- `containing(a, b)`: spans que contienen `[a, b)` entero.
+- `in_pages(first, last)`: lo mismo por rango de páginas (con `page_offsets`).
+
+Todas aceptan `role`; cada rol tiene su propio subíndice (se construye la
+primera vez que se pide), así que filtrar por rol no recorre los demás. La
+fusión (`merged`) usa el mismo orden y `max_ends`, y `html_utils` recorre el
+índice ya ordenado.
+"""
+import bisect
+
+import numpy as np
+
+from span_store import ROLES, SpanStore
+
+
+class IntervalIndex(SpanStore):
+    """`SpanStore` ordenado por `(start, -longitud)` con `max_ends` acumulado; ver `build`."""
+
+    def __init__(self, text, starts=(), ends=(), roles=(), role_names=ROLES, page_offsets=None, max_ends=None):
+        super().__init__(text, starts, ends, roles, role_names)
+        if max_ends is None:
+            max_ends = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+        self.max_ends = np.asarray(max_ends, dtype=np.int64)
+        self.page_offsets = page_offsets
+        self._by_role = {}
+
+    @classmethod
+    def build(cls, spans, text=None, page_offsets=None):
+        """Índice de un `SpanStore` o de tuplas/dicts `(role, start, end)`; ordena sólo si hace falta."""
+        if isinstance(spans, IntervalIndex) and (page_offsets is None or page_offsets == spans.page_offsets):
+            return spans
+        store = spans if isinstance(spans, SpanStore) else SpanStore.from_spans(text, spans)
+        starts, ends, roles = store.starts, store.ends, store.roles
+        step = np.diff(starts)
+        if not (np.all(step >= 0) and np.all(np.diff(starts - ends)[step == 0] >= 0)):
+            # lexsort es estable: los empates conservan el orden de entrada.
+            order = np.lexsort((starts - ends, starts))
+            starts, ends, roles = starts[order], ends[order], roles[order]
+        return cls(store.text if text is None else text, starts, ends, roles, store.role_names, page_offsets)
+
+    @classmethod
+    def from_columns(cls, text, columns):
+        return cls.build(SpanStore.from_columns(text, columns))
+
+    def take(self, indices):
+        """Sub-índice con los spans de `indices` (en orden creciente)."""
+        idx = np.asarray(indices, dtype=np.intp)
+        return IntervalIndex(self.text, self.starts[idx], self.ends[idx], self.roles[idx], self.role_names,
+                             self.page_offsets)
+
+    def _role_index(self, role):
+        """(subíndice, posiciones en `self`) de los spans con ese rol."""
+        entry = self._by_role.get(role)
+        if entry is None:
+            if role in self.role_names:
+                ids = np.flatnonzero(self.roles == self.role_names.index(role))
+            else:
+                ids = np.empty(0, dtype=np.intp)
+            entry = self._by_role[role] = (self.take(ids), ids)
+        return entry
+
+    def _query(self, role, fn, a, b):
+        if role is None:
+            return fn(self, a, b)
+        sub, ids = self._role_index(role)
+        return ids[fn(sub, a, b)]
+
+    def _overlapping(self, a, b):
+        lo = int(np.searchsorted(self.max_ends, a, side='right'))
+        hi = max(lo, int(np.searchsorted(self.starts, b, side='left')))
+        return lo + np.flatnonzero(self.ends[lo:hi] > a)
+
+    def _within(self, a, b):
+        lo = int(np.searchsorted(self.starts, a, side='left'))
+        hi = max(lo, int(np.searchsorted(self.starts, b, side='left')))
+        return lo + np.flatnonzero(self.ends[lo:hi] <= b)
+
+    def _containing(self, a, b):
+        lo = int(np.searchsorted(self.max_ends, b, side='left'))
+        hi = max(lo, int(np.searchsorted(self.starts, a, side='right')))
+        return lo + np.flatnonzero(self.ends[lo:hi] >= b)
+
+    def overlapping(self, start: int, end: int, role: str = None):
+        """Posiciones de los spans que se solapan con `[start, end)`."""
+        return self._query(role, IntervalIndex._overlapping, start, end)
+
+    def within(self, start: int, end: int, role: str = None):
+        """Posiciones de los spans contenidos en `[start, end)`."""
+        return self._query(role, IntervalIndex._within, start, end)
+
+    def containing(self, start: int, end: int, role: str = None):
+        """Posiciones de los spans que contienen `[start, end)` entero."""
+        return self._query(role, IntervalIndex._containing, start, end)
+
+    def page_range(self, first: int, last: int = None):
+        """Rango de caracteres `[a, b)` de las páginas `first`..`last` (desde 1, incluidas)."""
+        if self.page_offsets is None:
+            raise ValueError("el índice no tiene offsets de página")
+        last = first if last is None else last
+        a = self.page_offsets[first - 1] if first >= 1 else 0
+        if last < len(self.page_offsets):
+            b = self.page_offsets[last]
+        else:
+            b = len(self.text) if self.text is not None else int(self.max_ends[-1]) if len(self) else a
+        return a, b
+
+    def in_pages(self, first: int, last: int = None, role: str = None, contained: bool = False):
+        """Spans que tocan las páginas `first`..`last` (con `contained=True`, sólo los que caben enteros)."""
+        a, b = self.page_range(first, last)
+        return self.within(a, b, role) if contained else self.overlapping(a, b, role)
+
+    def page_of(self, i) -> int:
+        """Página (desde 1) donde empieza el span `i`."""
+        return bisect.bisect_right(self.page_offsets, int(self.starts[i]))
+
+    def merged(self):
+        """Fusiona los spans que se solapan o tocan; devuelve otro `IntervalIndex`.
+
+        Cada grupo de spans encadenados (el inicio de uno no pasa del
+        `max_ends` anterior) termina en el mayor `end` del grupo y toma el rol
+        y el inicio del primer span con la prioridad más alta del grupo.
+        """
+        n = len(self.starts)
+        if n == 0:
+            return IntervalIndex(self.text, role_names=self.role_names, page_offsets=self.page_offsets)
+        prio = self.priorities()
+        first = np.empty(n, dtype=bool)
+        first[0] = True
+        first[1:] = self.starts[1:] > self.max_ends[:-1]
+        heads = np.flatnonzero(first)
+        group = np.cumsum(first) - 1
+        best = np.maximum.reduceat(prio, heads)
+        candidates = np.flatnonzero(prio == best[group])
+        _, pick = np.unique(group[candidates], return_index=True)
+        winners = candidates[pick]
+        ends = np.maximum.reduceat(self.ends, heads)
+        # Los grupos no se solapan: el máximo acumulado es el propio `end`.
+        return IntervalIndex(self.text, self.starts[winners], ends, self.roles[winners], self.role_names,
+                             self.page_offsets, max_ends=ends)
+
+    def __repr__(self):
+        return "IntervalIndex({} spans)".format(len(self))
@@ -0,0 +1,97 @@
+"""Texto UTF-8 de un archivo grande leído con `mmap`, sin cargarlo entero en memoria.
+
+`MappedText` se comporta como una cadena de sólo lectura para lo que usan el
+análisis y los informes: `len(text)` y recortes `text[a:b]` con offsets de
+carácter globales. Al abrirlo se decodifica el archivo una vez por bloques
+(decodificador incremental, así que un carácter multibyte partido entre dos
+bloques no es un problema) y se guarda un punto de control carácter → byte
+por bloque; cada recorte decodifica sólo los bloques que toca.
+
+A diferencia de `open(..., 'r')`, no se traducen los saltos de línea: los
+offsets son posiciones en el archivo tal cual (`byte_offset` da la posición
+en bytes de cualquier carácter).
+"""
+import bisect
+import codecs
+import mmap
+import os
+from array import array
+
+# Bytes por bloque: separación entre puntos de control y tamaño de lectura.
+BLOCK_BYTES = 64 * 1024
+
+# Los `.txt` a partir de este tamaño se leen con `MappedText` en lugar de `fh.read()`.
+MAPPED_TEXT_MIN_BYTES = 64 * 1024 * 1024
+
+
+def should_map(path: str, min_bytes: int = MAPPED_TEXT_MIN_BYTES) -> bool:
+    """True si `path` es un archivo de texto (no PDF) de al menos `min_bytes`."""
+    if os.path.splitext(path)[1].lower() == '.pdf':
+        return False
+    try:
+        return os.path.getsize(path) >= min_bytes
+    except OSError:
+        return False
+
+
+class MappedText:
+    """Vista de sólo lectura del texto UTF-8 de `path` sobre un `mmap`."""
+
+    def __init__(self, path: str, block_bytes: int = BLOCK_BYTES):
+        self.path = path
+        self._fh = open(path, 'rb')
+        size = os.fstat(self._fh.fileno()).st_size
+        # mmap no admite archivos vacíos.
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self._chars = array('q', [0])
+        self._bytes = array('q', [0])
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        n_chars = 0
+        for pos in range(0, size, block_bytes):
+            end = min(pos + block_bytes, size)
+            n_chars += len(decoder.decode(self._mm[pos:end], final=end == size))
+            pending = len(decoder.getstate()[0])
+            self._chars.append(n_chars)
+            self._bytes.append(end - pending)
+        self._len = n_chars
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            if key < 0:
+                key += self._len
+            if not 0 <= key < self._len:
+                raise IndexError("índice de texto fuera de rango")
+            return self._slice(key, key + 1)
+        start, stop, step = key.indices(self._len)
+        if step != 1:
+            raise ValueError("MappedText sólo admite recortes contiguos")
+        return self._slice(start, stop) if start < stop else ""
+
+    def _slice(self, start, stop):
+        i = bisect.bisect_right(self._chars, start) - 1
+        j = min(bisect.bisect_left(self._chars, stop), len(self._chars) - 1)
+        decoded = str(self._mm[self._bytes[i]:self._bytes[j]], 'utf-8')
+        base = self._chars[i]
+        return decoded[start - base:stop - base]
+
+    def byte_offset(self, char_offset: int) -> int:
+        """Posición en bytes, dentro del archivo, del carácter `char_offset`."""
+        i = bisect.bisect_right(self._chars, char_offset) - 1
+        return self._bytes[i] + len(self._slice(self._chars[i], char_offset).encode('utf-8'))
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return "MappedText({!r}, {} chars)".format(self.path, self._len)
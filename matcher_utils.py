@@ -1,15 +1,33 @@
-"""Configuración del Matcher para detectar marcadores causales."""
-from spacy.matcher import Matcher
-
-
-def setup_causal_matcher(nlp):
-    matcher = Matcher(nlp.vocab)
-    patterns = [
-        [{"LOWER": "because"}],
-        [{"LOWER": "due"}, {"LOWER": "to"}],
-        [{"LEMMA": "cause"}],
-        [{"LEMMA": "lead"}, {"LOWER": "to"}],
-        [{"LOWER": "as"}, {"LOWER": "a"}, {"LOWER": "result"}, {"LOWER": "of"}],
-    ]
-    matcher.add("CAUSAL_MARKER", patterns)
-    return matcher
+"""Configuración del Matcher para detectar marcadores causales.
+
+Los marcadores viven en los paquetes de reglas de `rules/` (ver `rule_packs`);
+aquí se exponen los del paquete por defecto con los nombres de siempre.
+"""
+import re
+
+from rule_packs import DEFAULT_PACK, all_patterns, build_matcher, load_rule_pack, marker_regex_source
+
+_PACK = load_rule_pack()
+
+# Frases y patrones del paquete por defecto como patrones de tokens.
+CAUSAL_PATTERNS = all_patterns(_PACK)
+
+# Marcadores que `analyzer` busca como texto cuando el Matcher no encuentra nada.
+CAUSAL_FALLBACK_MARKERS = _PACK['fallback_markers']
+
+# Los mismos marcadores con límites de palabra, como los busca el prefiltro ('if' no cuenta en 'different').
+CAUSAL_FALLBACK_REGEX = re.compile(marker_regex_source(_PACK, patterns=[]), re.IGNORECASE)
+
+
+def pattern_attrs(patterns=None):
+    """Atributos de token que usan los patrones (p. ej. {'LOWER', 'LEMMA'})."""
+    attrs = set()
+    for pattern in CAUSAL_PATTERNS if patterns is None else patterns:
+        for token in pattern:
+            attrs.update(k for k in token if k.isupper())
+    return attrs
+
+
+def setup_causal_matcher(nlp, pack: str = DEFAULT_PACK):
+    """Matcher causal del paquete `pack`; se llama como un `Matcher` (`matcher(doc)`)."""
+    return build_matcher(nlp, pack)
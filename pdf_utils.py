@@ -1,47 +1,369 @@
 """Utilities para extracción de texto desde PDF o archivos de texto."""
+import bisect
+import importlib.util
 import logging
+import os
+import re
+import sys
+import unicodedata
+
+from cache_utils import SQLiteCache, default_cache_dir, sha256_hex
+from profiling import get_profiler
 
 logger = logging.getLogger(__name__)
 
+# Por debajo de estos caracteres visibles la capa de texto se considera vacía.
+MIN_TEXT_LAYER_CHARS = 8
+
+_CID_GLYPH = re.compile(r"\(cid:\d+\)")
+
+# Memoria máxima aproximada de las imágenes rasterizadas pendientes de OCR.
+DEFAULT_OCR_INFLIGHT_BYTES = 512 * 1024 * 1024
+
+
+def open_page_cache(path: str = None) -> SQLiteCache:
+    """Caché por página del texto extraído y del OCR (ver `cache_utils.SQLiteCache`)."""
+    return SQLiteCache(path or os.path.join(default_cache_dir(), 'pages.sqlite'))
+
+
+def _object_parts(obj, seen):
+    """Partes (str/bytes) de un objeto PDF, resolviendo referencias y streams de forma recursiva.
+
+    `/Parent` no se sigue (llevaría a todo el árbol de páginas) y de las
+    imágenes sólo cuenta el diccionario: el extractor no lee sus datos.
+    """
+    ref = getattr(obj, 'idnum', None)
+    if ref is not None:
+        key = (ref, getattr(obj, 'generation', 0))
+        if key in seen:
+            yield "ref:{}:{}".format(*key)
+            return
+        seen.add(key)
+        obj = obj.get_object()
+    if isinstance(obj, dict):
+        yield "{"
+        for name in sorted(obj):
+            if name != '/Parent':
+                yield str(name)
+                yield from _object_parts(obj[name], seen)
+        yield "}"
+        if hasattr(obj, 'get_data') and obj.get('/Subtype') != '/Image':
+            yield obj.get_data()
+    elif isinstance(obj, (list, tuple)):
+        yield "["
+        for item in obj:
+            yield from _object_parts(item, seen)
+        yield "]"
+    else:
+        yield "{}:{!r}".format(type(obj).__name__, obj)
+
+
+def _inherited_resources(page):
+    """`/Resources` de la página o, si no tiene, del primer antecesor que los defina."""
+    node = page
+    while node is not None:
+        resources = node.get('/Resources')
+        if resources is not None:
+            return resources
+        node = node.get('/Parent')
+        node = node.get_object() if node is not None else None
+    return None
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+
+def _extractor_id(page):
+    """Nombre y versión de la librería cuyo `extract_text` se usa para `page`."""
+    package = type(page).__module__.split('.')[0]
+    return "{}-{}".format(package, getattr(sys.modules.get(package), '__version__', '?'))
+
+
+def _page_fingerprint(page):
+    """Hash de todo lo que lee el extractor de la página (None si no se puede leer).
+
+    Incluye el diccionario de la página con sus content streams, los recursos
+    heredados, las fuentes (con `ToUnicode`/`Encoding`) y los XObjects
+    recursivamente, y el nombre y la versión del extractor.
+    """
+    try:
+        seen = set()
+        parts = list(_object_parts(page, seen))
+        if '/Resources' not in page:
+            parts.extend(_object_parts(_inherited_resources(page), seen))
+        return sha256_hex('text', _extractor_id(page), *parts)
+    except Exception:
+        logger.debug("No se pudo calcular la huella de la página.", exc_info=True)
+        return None
+
+
+def _page_text(page, cache=None):
+    key = _page_fingerprint(page) if cache is not None else None
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached.decode('utf-8')
+    try:
+        text = page.extract_text() or ""
+    except Exception:
+        return ""
+    if key is not None:
+        cache.put(key, text.encode('utf-8'))
+    return text
+
+
+def _log_cache_stats(cache, what):
+    if cache is not None:
+        logger.info("Caché de %s: %d aciertos, %d fallos.", what, cache.hits, cache.misses)
+
+
+def _open_reader(pdf_path):
+    """Abre el PDF con `pypdf` o, si no está disponible o falla, con `PyPDF2`."""
     try:
         from pypdf import PdfReader
-        reader = PdfReader(pdf_path)
-        texts = []
-        for page in getattr(reader, 'pages', []):
-            try:
-                texts.append(page.extract_text() or "")
-            except Exception:
-                texts.append("")
-        return "\n".join(texts)
+        return PdfReader(pdf_path)
+    except Exception:
+        import PyPDF2
+        return PyPDF2.PdfReader(pdf_path)
+
+
+def _extract_page_range(args):
+    """Extrae las páginas [start, stop) en un proceso del pool con su propio lector y caché."""
+    pdf_path, start, stop, cache_path = args
+    cache = SQLiteCache(cache_path) if cache_path else None
+    try:
+        reader = _open_reader(pdf_path)
+        texts = [_page_text(reader.pages[i], cache) for i in range(start, stop)]
     except Exception:
-        try:
-            import PyPDF2
-            reader = PyPDF2.PdfReader(pdf_path)
-            texts = []
-            for page in reader.pages:
-                try:
-                    texts.append(page.extract_text() or "")
-                except Exception:
-                    texts.append("")
-            return "\n".join(texts)
-        except Exception:
-            logger.exception("Error extrayendo texto del PDF. Instale 'pypdf' o 'PyPDF2'.")
-            return ""
-
-
-def extract_text_from_scanned_pdf(pdf_path: str, dpi: int = 200) -> str:
+        logger.exception("Error extrayendo las páginas %d-%d de %s.", start + 1, stop, pdf_path)
+        texts = [""] * (stop - start)
+    finally:
+        if cache is not None:
+            cache.close()
+    return texts, (cache.hits, cache.misses) if cache is not None else (0, 0)
+
+
+def _page_ranges(n_pages, parts):
+    step = max(1, -(-n_pages // parts))
+    return [(a, min(a + step, n_pages)) for a in range(0, n_pages, step)]
+
+
+def extract_pages_from_pdf(pdf_path: str, cache=None, workers: int = 1):
+    """Devuelve el texto de cada página en orden (cadena vacía en las que fallan).
+
+    Con `workers > 1` los rangos de páginas se reparten en un pool de procesos;
+    cada uno abre su propio lector y, si hay `cache`, su propia conexión a ella.
+    """
+    with get_profiler().stage('pdf_text') as stage:
+        texts = _extract_pages(pdf_path, cache, workers)
+        stage.count(pages=len(texts))
+    return texts
+
+
+def _extract_pages(pdf_path, cache, workers):
     try:
-        from pdf2image import convert_from_path
-        import pytesseract
+        reader = _open_reader(pdf_path)
+        n_pages = len(reader.pages)
     except Exception:
-        logger.exception("Dependencias OCR no instaladas ('pdf2image','pytesseract').")
+        logger.exception("Error extrayendo texto del PDF. Instale 'pypdf' o 'PyPDF2'.")
+        return []
+    if workers <= 1 or n_pages < 2:
+        texts = [_page_text(page, cache) for page in reader.pages]
+        _log_cache_stats(cache, 'páginas')
+        return texts
+    from concurrent.futures import ProcessPoolExecutor
+    cache_path = cache.path if cache is not None else None
+    ranges = _page_ranges(n_pages, workers * 4)
+    texts = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+        for part, (hits, misses) in pool.map(_extract_page_range,
+                                            [(pdf_path, a, b, cache_path) for a, b in ranges]):
+            texts.extend(part)
+            if cache is not None:
+                cache.hits += hits
+                cache.misses += misses
+    _log_cache_stats(cache, 'páginas')
+    return texts
+
+
+def join_pages(pages):
+    """Une las páginas con saltos de línea y devuelve `(texto, offsets)`.
+
+    `offsets[i]` es la posición del primer carácter de la página `i` en el texto.
+    """
+    offsets = []
+    pos = 0
+    for page in pages:
+        offsets.append(pos)
+        pos += len(page) + 1
+    return "\n".join(pages), offsets
+
+
+def page_at(page_offsets, char_offset: int) -> int:
+    """Índice (desde 0) de la página que contiene `char_offset`."""
+    return max(bisect.bisect_right(page_offsets, char_offset) - 1, 0)
+
+
+def extract_text_with_page_offsets(pdf_path: str, cache=None, workers: int = 1):
+    """Como `extract_text_from_pdf`, pero devuelve también la tabla de offsets de página."""
+    return join_pages(extract_pages_from_pdf(pdf_path, cache=cache, workers=workers))
+
+
+def extract_text_from_pdf(pdf_path: str, cache=None, workers: int = 1) -> str:
+    """Extrae el texto de todas las páginas; con `cache` sólo extrae las páginas que cambiaron."""
+    return "\n".join(extract_pages_from_pdf(pdf_path, cache=cache, workers=workers))
+
+
+def _ocr_image(img, dpi, cache=None):
+    import pytesseract
+    key = None
+    if cache is not None:
+        key = sha256_hex('ocr', str(dpi), img.mode, "{}x{}".format(*img.size), img.tobytes())
+        cached = cache.get(key)
+        if cached is not None:
+            return cached.decode('utf-8')
+    text = pytesseract.image_to_string(img)
+    if key is not None:
+        cache.put(key, text.encode('utf-8'))
+    return text
+
+
+def _image_bytes(img):
+    width, height = img.size
+    return width * height * len(img.getbands())
+
+
+def _ocr_windows(page_indices, window):
+    """Agrupa índices de página en tramos contiguos de como mucho `window` páginas."""
+    run = []
+    for idx in page_indices:
+        if run and (idx != run[-1] + 1 or len(run) >= window):
+            yield run
+            run = []
+        run.append(idx)
+    if run:
+        yield run
+
+
+def iter_ocr_pages(pdf_path: str, dpi: int = 200, workers: int = None, window: int = 2,
+                   max_inflight_bytes: int = DEFAULT_OCR_INFLIGHT_BYTES, cache=None, pages=None):
+    """OCR en streaming: genera `(índice_de_página, texto)` en orden de página.
+
+    Rasteriza el PDF por ventanas de `window` páginas y envía cada imagen a un
+    pool de `workers` hilos con `pytesseract` (tesseract corre en su propio
+    proceso, así que los hilos ocupan todos los núcleos). Antes de rasterizar
+    la siguiente ventana se espera a que las imágenes pendientes ocupen menos
+    de `max_inflight_bytes`, de modo que la memoria no depende del tamaño del
+    documento. `pages` limita el OCR a esos índices (desde 0).
+    """
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+    from pdf2image import convert_from_path, pdfinfo_from_path
+
+    if pages is None:
+        pages = range(pdfinfo_from_path(pdf_path)['Pages'])
+    workers = workers or os.cpu_count() or 1
+    pending = deque()
+    state = {'inflight': 0, 'per_page': 0}
+
+    def release_head():
+        idx, future, nbytes = pending.popleft()
+        text = future.result()
+        state['inflight'] -= nbytes
+        return idx, text
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for run in _ocr_windows(sorted(pages), window):
+            expected = state['per_page'] * len(run)
+            while pending and state['inflight'] + expected > max_inflight_bytes:
+                yield release_head()
+            images = convert_from_path(pdf_path, dpi=dpi, first_page=run[0] + 1, last_page=run[-1] + 1)
+            for idx, img in zip(run, images):
+                nbytes = _image_bytes(img)
+                state['per_page'] = max(state['per_page'], nbytes)
+                state['inflight'] += nbytes
+                pending.append((idx, pool.submit(_ocr_image, img, dpi, cache), nbytes))
+            img = images = None
+            while pending and pending[0][1].done():
+                yield release_head()
+        while pending:
+            yield release_head()
+    _log_cache_stats(cache, 'OCR')
+
+
+def extract_text_from_scanned_pdf(pdf_path: str, dpi: int = 200, cache=None, workers: int = None,
+                                  max_inflight_bytes: int = DEFAULT_OCR_INFLIGHT_BYTES) -> str:
+    """OCR de un PDF escaneado (ver `iter_ocr_pages`); con `cache` se reutilizan las imágenes ya vistas."""
+    if not all(name in sys.modules or importlib.util.find_spec(name) for name in ('pdf2image', 'pytesseract')):
+        logger.error("Dependencias OCR no instaladas ('pdf2image','pytesseract').")
         return ""
     try:
-        pages = convert_from_path(pdf_path, dpi=dpi)
-        texts = [pytesseract.image_to_string(img) for img in pages]
+        texts = [text for _, text in iter_ocr_pages(pdf_path, dpi=dpi, workers=workers,
+                                                     max_inflight_bytes=max_inflight_bytes, cache=cache)]
         return "\n".join(texts)
     except Exception:
         logger.exception("Error durante OCR del PDF escaneado.")
         return ""
+
+
+def is_garbage_text(text: str, min_chars: int = MIN_TEXT_LAYER_CHARS) -> bool:
+    """True si la capa de texto de una página está vacía o no es texto legible.
+
+    Cuenta como basura: menos de `min_chars` caracteres visibles, glifos sin
+    mapear (`(cid:NN)`, U+FFFD, caracteres de control o privados) en más de un
+    10 % del texto, o menos de la mitad de caracteres alfanuméricos.
+    """
+    visible = "".join(_CID_GLYPH.sub("\ufffd", text).split())
+    if len(visible) < min_chars:
+        return True
+    bad = sum(1 for c in visible if c == "\ufffd" or unicodedata.category(c) in ("Cc", "Co", "Cn"))
+    alnum = sum(1 for c in visible if c.isalnum())
+    return bad > 0.1 * len(visible) or alnum < 0.5 * len(visible)
+
+
+def extract_pages_hybrid(pdf_path: str, cache=None, workers: int = 1, dpi: int = 200):
+    """Texto por página usando la capa de texto y OCR sólo en las páginas vacías o ilegibles.
+
+    Las páginas con texto válido no se rasterizan; el resto pasa por
+    `iter_ocr_pages` y su resultado se coloca en su posición original. Si el
+    lector de PDF no puede abrir el archivo se hace OCR de todo el documento.
+    Si las dependencias de OCR no están instaladas esas páginas se quedan como
+    estaban.
+    """
+    pages = extract_pages_from_pdf(pdf_path, cache=cache, workers=workers)
+    if pages:
+        targets = [i for i, text in enumerate(pages) if is_garbage_text(text)]
+        if not targets:
+            return pages
+        logger.info("OCR en %d de %d páginas sin texto utilizable.", len(targets), len(pages))
+    else:
+        targets = None
+        logger.info("No se pudo leer ninguna página; OCR de todo el documento.")
+    try:
+        with get_profiler().stage('ocr') as stage:
+            for idx, text in iter_ocr_pages(pdf_path, dpi=dpi, workers=workers, cache=cache, pages=targets):
+                stage.count(pages=1)
+                if idx >= len(pages):
+                    pages.extend([""] * (idx + 1 - len(pages)))
+                if text.strip():
+                    pages[idx] = text
+    except ImportError:
+        logger.warning("Dependencias OCR no instaladas ('pdf2image','pytesseract'); se omite el OCR.")
+    except Exception:
+        logger.exception("Error durante OCR de las páginas sin texto.")
+    return pages
+
+
+def extract_text_hybrid(pdf_path: str, cache=None, workers: int = 1, dpi: int = 200) -> str:
+    """Como `extract_pages_hybrid`, unido con saltos de línea igual que `extract_text_from_pdf`."""
+    return "\n".join(extract_pages_hybrid(pdf_path, cache=cache, workers=workers, dpi=dpi))
+
+
+def read_document(path: str, cache=None, workers: int = 1) -> str:
+    """Texto de `path`: los PDF vía `extract_text_hybrid`, el resto como texto UTF-8."""
+    return read_document_pages(path, cache=cache, workers=workers)[0]
+
+
+def read_document_pages(path: str, cache=None, workers: int = 1):
+    """Como `read_document`, pero devuelve `(texto, offsets_de_página)` (ver `join_pages`)."""
+    if os.path.splitext(path)[1].lower() == '.pdf':
+        return join_pages(extract_pages_hybrid(path, cache=cache, workers=workers))
+    with open(path, 'r', encoding='utf-8') as fh:
+        return fh.read(), [0]
@@ -0,0 +1,161 @@
+"""Planificador de componentes spaCy: carga sólo lo que usan las reglas y la heurística activas."""
+import logging
+import time
+
+from matcher_utils import pattern_attrs
+from spacy_utils import DEFAULT_MODEL, get_nlp, load_spacy_model
+
+logger = logging.getLogger(__name__)
+
+# Qué necesita cada motor de heurísticas además de los atributos de los patrones.
+ENGINE_REQUIREMENTS = {
+    'basic': {'SENTS'},                       # heuristics.extract_cause_effect_basic
+    'dependency': {'SENTS', 'DEP', 'LEMMA'},  # heuristics.extract_cause_effect_dep
+}
+
+# Componente que asigna cada atributo de token.
+ATTR_PROVIDERS = {
+    'LEMMA': 'lemmatizer',
+    'POS': 'attribute_ruler',
+    'TAG': 'tagger',
+    'DEP': 'parser',
+    'HEAD': 'parser',
+    'ENT_TYPE': 'ner',
+    'ENT_IOB': 'ner',
+}
+
+# Dependencias entre componentes en los pipelines en_core_web_* (el lemmatizer
+# de reglas necesita POS, que sale del tagger + attribute_ruler).
+COMPONENT_REQUIRES = {
+    'lemmatizer': ['attribute_ruler', 'tagger'],
+    'attribute_ruler': ['tagger'],
+    'tagger': ['tok2vec'],
+    'parser': ['tok2vec'],
+    'ner': ['tok2vec'],
+}
+
+# Sólo se omiten componentes conocidos; cualquier otro se mantiene por prudencia.
+SKIPPABLE = {'tok2vec', 'tagger', 'parser', 'senter', 'attribute_ruler', 'lemmatizer', 'ner'}
+
+# Texto de prueba fijo para medir cuánto ahorran los componentes omitidos (ver `--prepare`).
+PROBE_TEXT = " ".join([
+    "The mission failed because the engine overheated.",
+    "If you heat water, it boils.",
+    "Prices in London rose due to the drought that began in March.",
+    "The committee met on Tuesday and the minutes were taken by the clerk.",
+] * 25)
+
+
+def plan_pipeline(components, engine: str = 'basic', patterns=None):
+    """Decide qué componentes de `components` hacen falta para `engine` y `patterns`.
+
+    Devuelve un dict con `keep` y `skip` (en el orden del pipeline), el
+    componente que segmentará oraciones (`sentences`) y los atributos
+    requeridos (`needs`). Si no hay dependencias sintácticas se prefiere
+    `senter` al parser para obtener las oraciones.
+    """
+    if engine not in ENGINE_REQUIREMENTS:
+        raise ValueError("Motor de heurísticas desconocido: {}".format(engine))
+    components = list(components)
+    needs = pattern_attrs(patterns) | ENGINE_REQUIREMENTS[engine]
+    wanted = {ATTR_PROVIDERS[a] for a in needs if a in ATTR_PROVIDERS}
+    wanted.update(c for c in components if c not in SKIPPABLE)
+
+    sentences = None
+    if 'SENTS' in needs:
+        if 'parser' in wanted or 'sentencizer' in components:
+            sentences = 'parser' if 'parser' in wanted else 'sentencizer'
+        elif 'senter' in components:
+            sentences = 'senter'
+        elif 'parser' in components:
+            sentences = 'parser'
+        else:
+            sentences = 'sentencizer'
+        wanted.add(sentences)
+
+    pending = list(wanted)
+    while pending:
+        for dep in COMPONENT_REQUIRES.get(pending.pop(), ()):
+            if dep in components and dep not in wanted:
+                wanted.add(dep)
+                pending.append(dep)
+
+    return {
+        'engine': engine,
+        'needs': sorted(needs),
+        'keep': [c for c in components if c in wanted],
+        'skip': [c for c in components if c not in wanted],
+        'sentences': sentences,
+    }
+
+
+def model_components(preferred_model: str = DEFAULT_MODEL):
+    """Nombre del paquete que se cargará y sus componentes, leídos del meta sin cargarlo."""
+    import spacy
+    for name in (preferred_model, 'en_core_web_sm'):
+        if spacy.util.is_package(name):
+            meta = spacy.util.get_model_meta(spacy.util.get_package_path(name))
+            return name, list(meta.get('components') or meta.get('pipeline') or [])
+    return None, ['sentencizer']
+
+
+def component_timings(nlp, sample_text: str):
+    """Segundos que tarda cada componente (activo o no) sobre `sample_text`."""
+    timings = {}
+    t0 = time.perf_counter()
+    doc = nlp.make_doc(sample_text)
+    timings['tokenizer'] = time.perf_counter() - t0
+    for name, proc in nlp.components:
+        t0 = time.perf_counter()
+        try:
+            doc = proc(doc)
+        except Exception:
+            logger.debug("No se pudo medir el componente %s.", name)
+            continue
+        timings[name] = time.perf_counter() - t0
+    return timings
+
+
+def load_planned_pipeline(preferred_model: str = DEFAULT_MODEL, engine: str = 'basic',
+                          patterns=None, sample_text: str = None):
+    """Carga (vía el registro) el modelo con sólo los componentes planificados.
+
+    Devuelve `(nlp, report)`. Los componentes omitidos no se cargan. `report`
+    indica los componentes activos y omitidos, el tiempo de carga y, si se da
+    `sample_text`, cuánto tiempo de proceso ahorran los omitidos sobre ese
+    texto (medido con una copia completa del modelo que se carga aparte).
+    """
+    package, components = model_components(preferred_model)
+    plan = plan_pipeline(components, engine, patterns)
+    t0 = time.perf_counter()
+    if package:
+        nlp = get_nlp(preferred_model, enable=plan['keep'])
+    else:
+        nlp = get_nlp(preferred_model)
+    load_seconds = time.perf_counter() - t0
+
+    if 'tok2vec' in nlp.disabled:
+        listeners = getattr(nlp.get_pipe('tok2vec'), 'listening_components', [])
+        if any(c in nlp.pipe_names for c in listeners):
+            nlp.enable_pipe('tok2vec')
+    if plan['sentences'] == 'sentencizer' and 'sentencizer' not in nlp.component_names:
+        nlp.add_pipe('sentencizer', first=True)
+
+    report = {
+        'model': "{}_{}".format(nlp.meta.get('lang'), nlp.meta.get('name')),
+        'engine': engine,
+        'active': list(nlp.pipe_names),
+        'skipped': [c for c in plan['skip'] if c not in nlp.pipe_names],
+        'sentences': plan['sentences'],
+        'load_seconds': load_seconds,
+        'saved_seconds': None,
+    }
+    if sample_text:
+        full = load_spacy_model(preferred_model) if package else nlp
+        timings = component_timings(full, sample_text)
+        saved = sum(timings.get(c, 0.0) for c in report['skipped'])
+        report['saved_seconds'] = saved
+        report['saved_share'] = saved / (sum(timings.values()) or 1.0)
+    logger.info("Pipeline planificado (%s): activos=%s, omitidos=%s, ahorro=%s s",
+                engine, report['active'], report['skipped'], report['saved_seconds'])
+    return nlp, report
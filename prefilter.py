@@ -0,0 +1,59 @@
+"""Prefiltro barato: localiza las oraciones candidatas antes del parseo completo.
+
+Una sola expresión regular con todos los marcadores (las frases, patrones y
+marcadores de fallback del paquete de reglas) recorre el texto crudo; alrededor
+de cada coincidencia se recortan las oraciones vecinas con un segmentador por
+puntuación y sólo esas regiones pasan por el pipeline pesado.
+"""
+import bisect
+import re
+
+import rule_packs
+
+# Formas flexionadas para los patrones LEMMA (el prefiltro no lematiza).
+LEMMA_FORMS = rule_packs.load_rule_pack()['lemma_forms']
+
+# Fin de oración aproximado: puntuación final o párrafo en blanco.
+_SENT_END = re.compile(r"[.!?]+[\"')\]]*\s+|\n\s*\n")
+
+
+def marker_regex(patterns=None, fallback_markers=None, pack: str = rule_packs.DEFAULT_PACK):
+    """Compila todos los marcadores del paquete en una única alternativa con límites de palabra."""
+    if patterns is None and fallback_markers is None:
+        return rule_packs.marker_regex(pack)
+    source = rule_packs.marker_regex_source(rule_packs.load_rule_pack(pack), patterns, fallback_markers)
+    return re.compile(source, re.IGNORECASE)
+
+
+_DEFAULT_MARKERS = marker_regex()
+
+
+def sentence_bounds(text: str):
+    """Posiciones de inicio de oración según el segmentador ligero (incluye 0 y len(text))."""
+    bounds = [0]
+    bounds.extend(m.end() for m in _SENT_END.finditer(text))
+    if bounds[-1] != len(text):
+        bounds.append(len(text))
+    return bounds
+
+
+def candidate_regions(text: str, context: int = 1, markers=None):
+    """Devuelve regiones `(start, end)` con las oraciones que contienen un marcador.
+
+    Cada región incluye `context` oraciones a cada lado; las regiones solapadas o
+    contiguas se fusionan. Los cortes caen en inicios de oración.
+    """
+    markers = _DEFAULT_MARKERS if markers is None else markers
+    bounds = None
+    regions = []
+    for m in markers.finditer(text):
+        if bounds is None:
+            bounds = sentence_bounds(text)
+        i = bisect.bisect_right(bounds, m.start()) - 1
+        start = bounds[max(i - context, 0)]
+        end = bounds[min(i + 1 + context, len(bounds) - 1)]
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], max(end, regions[-1][1]))
+        else:
+            regions.append((start, end))
+    return regions
@@ -0,0 +1,215 @@
+"""Instrumentación por etapa: tiempo de pared, CPU, memoria pico y recuentos.
+
+Las etapas se marcan con `get_profiler().stage(nombre)`; mientras no haya un
+`Profiler` activo (ver `profiling()`), el coste es prácticamente nulo. Las
+etapas del mismo nombre se acumulan y las anidadas cuentan dentro de la que
+las contiene (`self_seconds` descuenta el tiempo de las hijas). Las etapas que
+corren en procesos del pool no se registran.
+"""
+import contextlib
+import cProfile
+import json
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "resaltado"
+
+
+def _max_rss_bytes():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class _NullStage:
+    active = False
+
+    def count(self, **items):
+        pass
+
+
+class _Stage:
+    active = True
+
+    def __init__(self, name):
+        self.name = name
+        self.items = {}
+        self.child_seconds = 0.0
+        self.peak_seen = 0
+
+    def count(self, **items):
+        for key, value in items.items():
+            self.items[key] = self.items.get(key, 0) + value
+
+
+class _NullProfiler:
+    enabled = False
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        yield _NullStage()
+
+
+class Profiler:
+    """Acumula métricas por etapa; ver `report`, `write_json` y `write_prometheus`.
+
+    Con `memory=True` usa `tracemalloc` para el pico de memoria de Python de
+    cada etapa (además del RSS máximo del proceso). Con `cprofile_stage`, esa
+    etapa se ejecuta bajo cProfile y las estadísticas se guardan en
+    `cprofile_path`.
+    """
+    enabled = True
+
+    def __init__(self, memory: bool = True, cprofile_stage: str = None, cprofile_path: str = None):
+        self.memory = memory
+        self.cprofile_stage = cprofile_stage
+        self.cprofile_path = cprofile_path or "{}.prof".format(cprofile_stage)
+        self.stages = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cprofile = None
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        return self
+
+    def stop(self):
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(self.cprofile_path)
+            logger.info("cProfile de la etapa '%s' guardado en %s", self.cprofile_stage, self.cprofile_path)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        stack = self._stack()
+        st = _Stage(name)
+        tracing = self.memory and tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak_seen = max(stack[-1].peak_seen, peak)
+            tracemalloc.reset_peak()
+            start_mem = current
+        profile = None
+        if name == self.cprofile_stage:
+            profile = self._cprofile = self._cprofile or cProfile.Profile()
+            profile.enable()
+        stack.append(st)
+        wall0 = time.perf_counter()
+        cpu0 = time.process_time()
+        try:
+            yield st
+        finally:
+            wall = time.perf_counter() - wall0
+            cpu = time.process_time() - cpu0
+            stack.pop()
+            if profile is not None:
+                profile.disable()
+            peak = None
+            if tracing:
+                peak = max(tracemalloc.get_traced_memory()[1], st.peak_seen) - start_mem
+                if stack:
+                    stack[-1].peak_seen = max(stack[-1].peak_seen, peak + start_mem)
+            if stack:
+                stack[-1].child_seconds += wall
+            self._record(st, wall, cpu, peak)
+
+    def _record(self, st, wall, cpu, peak):
+        with self._lock:
+            rec = self.stages.setdefault(st.name, {
+                'calls': 0, 'wall_seconds': 0.0, 'self_seconds': 0.0, 'cpu_seconds': 0.0,
+                'peak_python_bytes': None, 'max_rss_bytes': None, 'items': {}})
+            rec['calls'] += 1
+            rec['wall_seconds'] += wall
+            rec['self_seconds'] += wall - st.child_seconds
+            rec['cpu_seconds'] += cpu
+            if peak is not None:
+                rec['peak_python_bytes'] = max(rec['peak_python_bytes'] or 0, peak)
+            rec['max_rss_bytes'] = _max_rss_bytes()
+            for key, value in st.items.items():
+                rec['items'][key] = rec['items'].get(key, 0) + value
+
+    def report(self) -> dict:
+        with self._lock:
+            return {'stages': {name: dict(rec, items=dict(rec['items'])) for name, rec in self.stages.items()}}
+
+    def write_json(self, path: str):
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(self.report(), fh, indent=2)
+
+    def write_prometheus(self, path: str):
+        """Escribe el informe en formato textfile de Prometheus (node_exporter)."""
+        metrics = [
+            ('stage_calls', 'calls', 'Veces que se ejecutó la etapa'),
+            ('stage_wall_seconds', 'wall_seconds', 'Tiempo de pared acumulado por etapa'),
+            ('stage_self_seconds', 'self_seconds', 'Tiempo de pared sin contar etapas anidadas'),
+            ('stage_cpu_seconds', 'cpu_seconds', 'Tiempo de CPU del proceso por etapa'),
+            ('stage_peak_python_bytes', 'peak_python_bytes', 'Pico de memoria Python (tracemalloc) por etapa'),
+            ('stage_max_rss_bytes', 'max_rss_bytes', 'RSS máximo del proceso al terminar la etapa'),
+        ]
+        stages = self.report()['stages']
+        lines = []
+        for metric, key, help_text in metrics:
+            name = "{}_{}".format(METRIC_PREFIX, metric)
+            lines.append("# HELP {} {}".format(name, help_text))
+            lines.append("# TYPE {} gauge".format(name))
+            for stage, rec in stages.items():
+                if rec[key] is not None:
+                    lines.append('{}{{stage="{}"}} {}'.format(name, stage, rec[key]))
+        name = "{}_stage_items".format(METRIC_PREFIX)
+        lines.append("# HELP {} Elementos procesados por etapa (páginas, oraciones, matches, spans)".format(name))
+        lines.append("# TYPE {} gauge".format(name))
+        for stage, rec in stages.items():
+            for item, value in rec['items'].items():
+                lines.append('{}{{stage="{}",item="{}"}} {}'.format(name, stage, item, value))
+        with open(path, 'w', encoding='utf-8') as fh:
+            fh.write("\n".join(lines) + "\n")
+
+    def write(self, path: str, fmt: str = None):
+        """Escribe el informe; el formato se deduce de la extensión (`.prom` = Prometheus) si no se da."""
+        fmt = fmt or ('prom' if path.endswith('.prom') else 'json')
+        if fmt == 'prom':
+            self.write_prometheus(path)
+        else:
+            self.write_json(path)
+
+
+_NULL_PROFILER = _NullProfiler()
+_active = _NULL_PROFILER
+
+
+def get_profiler():
+    """Profiler activo, o uno nulo que no mide nada."""
+    return _active
+
+
+@contextlib.contextmanager
+def profiling(profiler: Profiler):
+    """Activa `profiler` para todo el código que se ejecute dentro del bloque."""
+    global _active
+    previous = _active
+    _active = profiler.start()
+    try:
+        yield profiler
+    finally:
+        _active = previous
+        profiler.stop()
@@ -1,4 +1,6 @@
-from main import setup_causal_matcher, nlp, analyze_text
+from analyzer import analyze_text
+from spacy_utils import get_nlp
+
 
 def run_test():
     text = (
@@ -6,9 +8,9 @@ def run_test():
         "If you heat water, it boils. "
         "The storm led to power outages. Therefore, many flights were canceled."
     )
-    matcher = setup_causal_matcher(nlp)
-    highlights = analyze_text(text, matcher)
-    print('Highlights:', highlights)
+    highlights = analyze_text(text, get_nlp())
+    print('Highlights:', highlights.to_dicts())
+
 
 if __name__ == '__main__':
     run_test()
@@ -0,0 +1,55 @@
+"""Caché persistente de resultados de `analyzer.analyze_text`.
+
+La clave combina el hash del texto, el modelo spaCy (nombre, versión y
+componentes activos) y una huella del paquete de reglas y de
+`heuristics`; cualquier cambio en ellos invalida las entradas anteriores.
+"""
+import inspect
+import json
+import os
+
+import heuristics
+import rule_packs
+from cache_utils import DEFAULT_MAX_BYTES, SQLiteCache, default_cache_dir, sha256_hex
+
+# Súbase cuando cambie la forma de los resultados guardados o cómo los calcula `analyzer`.
+CACHE_FORMAT = "3"
+
+
+def rules_fingerprint() -> str:
+    """Huella del paquete de reglas (su hash) y de las heurísticas."""
+    return sha256_hex(rule_packs.load_rule_pack()['hash'], inspect.getsource(heuristics))
+
+
+def model_fingerprint(nlp) -> str:
+    meta = nlp.meta
+    return "{}_{}-{}|spacy{}|{}".format(
+        meta.get('lang'), meta.get('name'), meta.get('version'),
+        meta.get('spacy_version'), ",".join(nlp.pipe_names))
+
+
+def cache_key(text: str, nlp, **options) -> str:
+    """Clave de caché para analizar `text` con `nlp` y las opciones que cambian el resultado."""
+    opts = json.dumps(options, sort_keys=True)
+    return sha256_hex(CACHE_FORMAT, sha256_hex(text), model_fingerprint(nlp), rules_fingerprint(), opts)
+
+
+def open_result_cache(path: str = None, max_bytes: int = DEFAULT_MAX_BYTES) -> SQLiteCache:
+    return SQLiteCache(path or os.path.join(default_cache_dir(), 'results.sqlite'), max_bytes)
+
+
+def load_highlights(cache, key, text):
+    """Highlights guardados para `key` como `IntervalIndex` sobre `text` (None si no están)."""
+    from interval_index import IntervalIndex
+    data = cache.get(key)
+    if data is None:
+        return None
+    return IntervalIndex.from_columns(text, json.loads(data.decode('utf-8')))
+
+
+def store_highlights(cache, key, highlights):
+    """Guarda sólo las columnas de offsets y roles; el texto se recorta de nuevo al cargar."""
+    from span_store import SpanStore
+    if not isinstance(highlights, SpanStore):
+        highlights = SpanStore.from_spans(None, highlights)
+    cache.put(key, json.dumps(highlights.to_columns()).encode('utf-8'))
@@ -0,0 +1,215 @@
+"""Paquetes de reglas versionados (`rules/*.json` o `.yaml`) y su compilación cacheada.
+
+Un paquete reúne en un solo sitio los marcadores causales:
+
+- `phrases`: frases fijas que se buscan con un `PhraseMatcher` (atributo LOWER)
+  y que también usa `spacy_utils.add_entity_ruler`.
+- `token_patterns`: patrones de `Matcher` (p. ej. por LEMMA).
+- `lemma_forms`: formas flexionadas de cada lema, para el prefiltro por regex y
+  para pipelines sin lemmatizer (donde los patrones LEMMA pasan a LOWER IN).
+- `fallback_markers`: búsqueda textual cuando el matcher no encuentra nada.
+- `dependency_markers`: marcadores del motor `heuristics.extract_cause_effect_dep`
+  (`effect_first`, `causal_lemmas` y `conclusion`, por orden de prioridad).
+
+La compilación (patrones normalizados, frases ya tokenizadas en un `DocBin` y
+la expresión de marcadores del prefiltro) se guarda en disco con clave
+hash del paquete + vocabulario, así que los arranques siguientes sólo la leen.
+El hash del paquete es también la huella de reglas de `result_cache`.
+"""
+import functools
+import json
+import logging
+import os
+import re
+
+from cache_utils import default_cache_dir, sha256_hex
+
+logger = logging.getLogger(__name__)
+
+RULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules')
+DEFAULT_PACK = 'causal_en'
+MATCH_LABEL = "CAUSAL_MARKER"
+
+# Súbase cuando cambie el contenido del artefacto compilado.
+COMPILED_FORMAT = "1"
+
+
+def _pack_path(name: str) -> str:
+    if os.path.sep in name or os.path.splitext(name)[1]:
+        return name
+    for ext in ('.json', '.yaml', '.yml'):
+        path = os.path.join(RULES_DIR, name + ext)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError("No existe el paquete de reglas '{}' en {}".format(name, RULES_DIR))
+
+
+@functools.lru_cache(maxsize=None)
+def load_rule_pack(name: str = DEFAULT_PACK) -> dict:
+    """Lee un paquete (por nombre en `rules/` o por ruta) y le añade su `hash`.
+
+    Los `.yaml` requieren PyYAML. El hash se calcula sobre el contenido
+    normalizado, así que no cambia con el formato ni el orden de las claves.
+    """
+    path = _pack_path(name)
+    with open(path, encoding='utf-8') as fh:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml
+            pack = yaml.safe_load(fh)
+        else:
+            pack = json.load(fh)
+    for key in ('phrases', 'token_patterns', 'fallback_markers'):
+        pack.setdefault(key, [])
+    pack.setdefault('lemma_forms', {})
+    pack.setdefault('dependency_markers', {})
+    pack['hash'] = sha256_hex(json.dumps({k: v for k, v in pack.items() if k != 'hash'}, sort_keys=True))
+    return pack
+
+
+def lemma_forms(pack: dict, lemma: str):
+    lemma = lemma.lower()
+    return pack['lemma_forms'].get(lemma, [lemma, lemma + 's', lemma + 'ed', lemma + 'ing'])
+
+
+def phrase_patterns(pack: dict):
+    """Las frases del paquete como patrones de tokens LOWER (separando por espacios)."""
+    return [[{"LOWER": word} for word in phrase.lower().split()] for phrase in pack['phrases']]
+
+
+def token_patterns(pack: dict, lemmas: bool = True):
+    """Patrones de `Matcher`; con `lemmas=False` cada token LEMMA se cambia por LOWER IN sus formas."""
+    if lemmas:
+        return [list(p) for p in pack['token_patterns']]
+    patterns = []
+    for pattern in pack['token_patterns']:
+        converted = []
+        for token in pattern:
+            if 'LEMMA' in token and isinstance(token['LEMMA'], str):
+                token = dict(token)
+                token['LOWER'] = {"IN": lemma_forms(pack, token.pop('LEMMA'))}
+            converted.append(token)
+        patterns.append(converted)
+    return patterns
+
+
+def all_patterns(pack: dict):
+    """Frases y patrones de tokens juntos, tal como los vería un único `Matcher`."""
+    return phrase_patterns(pack) + token_patterns(pack)
+
+
+def _token_regex(pack, token):
+    if 'LEMMA' in token:
+        return "(?:{})".format("|".join(re.escape(f) for f in lemma_forms(pack, token['LEMMA'])))
+    value = token.get('LOWER', token.get('ORTH', token.get('TEXT')))
+    if isinstance(value, dict) and isinstance(value.get('IN'), list):
+        return "(?:{})".format("|".join(re.escape(v.lower()) for v in value['IN']))
+    if not isinstance(value, str):
+        return None
+    return re.escape(value.lower())
+
+
+def marker_regex_source(pack: dict, patterns=None, fallback_markers=None) -> str:
+    """Una única alternativa con límites de palabra para todos los marcadores del paquete.
+
+    Los patrones con atributos que no se pueden expresar como texto se omiten.
+    """
+    alternatives = set()
+    for pattern in all_patterns(pack) if patterns is None else patterns:
+        parts = [_token_regex(pack, tok) for tok in pattern]
+        if all(parts):
+            alternatives.add(r"\s+".join(parts))
+    for marker in pack['fallback_markers'] if fallback_markers is None else fallback_markers:
+        alternatives.add(r"\s+".join(re.escape(w) for w in marker.lower().split()))
+    # Las alternativas largas primero para que "due to" gane a "due".
+    ordered = sorted(alternatives, key=len, reverse=True)
+    return r"\b(?:{})\b".format("|".join(ordered))
+
+
+@functools.lru_cache(maxsize=None)
+def marker_regex(name: str = DEFAULT_PACK):
+    return re.compile(marker_regex_source(load_rule_pack(name)), re.IGNORECASE)
+
+
+def has_lemmas(nlp) -> bool:
+    """True si algún componente activo del pipeline asigna `token.lemma`."""
+    return any('token.lemma' in nlp.get_pipe_meta(name).assigns for name in nlp.pipe_names)
+
+
+def vocab_fingerprint(nlp) -> str:
+    """Lo que determina cómo se tokenizan las frases: idioma, modelo y versión de spaCy."""
+    import spacy
+    meta = nlp.meta
+    return "{}_{}-{}|spacy{}".format(meta.get('lang'), meta.get('name'), meta.get('version'), spacy.__version__)
+
+
+def compile_pack(nlp, pack: dict) -> dict:
+    """Artefacto compilado para `nlp`: patrones listos, frases tokenizadas y regex de marcadores."""
+    from spacy.tokens import DocBin
+    phrases = DocBin(attrs=[])
+    for phrase in pack['phrases']:
+        phrases.add(nlp.make_doc(phrase))
+    return {
+        'format': COMPILED_FORMAT,
+        'pack': pack['name'],
+        'version': pack.get('version'),
+        'hash': pack['hash'],
+        'token_patterns': token_patterns(pack, lemmas=has_lemmas(nlp)),
+        'phrases': phrases.to_bytes(),
+        'marker_regex': marker_regex_source(pack),
+    }
+
+
+def compiled_path(nlp, pack: dict, cache_dir: str = None) -> str:
+    key = sha256_hex(COMPILED_FORMAT, pack['hash'], vocab_fingerprint(nlp), str(has_lemmas(nlp)))
+    return os.path.join(cache_dir or os.path.join(default_cache_dir(), 'rules'),
+                        "{}-{}.msgpack".format(pack['name'], key[:16]))
+
+
+def load_compiled(nlp, pack: dict, cache_dir: str = None) -> dict:
+    """Lee el artefacto compilado de disco o, si no existe, lo compila y lo guarda."""
+    import srsly
+    path = compiled_path(nlp, pack, cache_dir)
+    try:
+        compiled = srsly.read_msgpack(path)
+        if compiled.get('hash') == pack['hash']:
+            return compiled
+    except (OSError, ValueError):
+        pass
+    compiled = compile_pack(nlp, pack)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = "{}.{}.tmp".format(path, os.getpid())
+        srsly.write_msgpack(tmp, compiled)
+        os.replace(tmp, path)
+        logger.info("Reglas '%s' compiladas en %s", pack['name'], path)
+    except OSError:
+        logger.warning("No se pudo guardar el paquete compilado en %s", path, exc_info=True)
+    return compiled
+
+
+class CausalMatcher:
+    """`Matcher` de patrones y `PhraseMatcher` de frases invocados como uno solo."""
+
+    def __init__(self, nlp, compiled: dict):
+        from spacy.matcher import Matcher, PhraseMatcher
+        from spacy.tokens import DocBin
+        self.pack_hash = compiled['hash']
+        self.matcher = Matcher(nlp.vocab)
+        if compiled['token_patterns']:
+            self.matcher.add(MATCH_LABEL, compiled['token_patterns'])
+        self.phrase_matcher = PhraseMatcher(nlp.vocab, attr='LOWER')
+        docs = list(DocBin().from_bytes(compiled['phrases']).get_docs(nlp.vocab))
+        if docs:
+            self.phrase_matcher.add(MATCH_LABEL, docs)
+
+    def __call__(self, doc):
+        matches = self.matcher(doc) + self.phrase_matcher(doc)
+        return sorted(set(matches), key=lambda m: (m[1], m[2]))
+
+    def __len__(self):
+        return len(self.matcher) + len(self.phrase_matcher)
+
+
+def build_matcher(nlp, name: str = DEFAULT_PACK, cache_dir: str = None) -> CausalMatcher:
+    """Matcher causal de `nlp` a partir del paquete `name`, usando el artefacto compilado en disco."""
+    return CausalMatcher(nlp, load_compiled(nlp, load_rule_pack(name), cache_dir))
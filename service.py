@@ -0,0 +1,280 @@
+"""Servicio HTTP local (asyncio) que mantiene el modelo caliente y agrupa peticiones.
+
+    python service.py --port 8765
+
+Rutas:
+
+- `POST /analyze`: el texto llega como JSON (`{"text": ...}`), como
+  `text/plain` o como archivo en `multipart/form-data` (los PDF pasan por
+  `pdf_utils.read_document`). Responde `{"highlights": [...]}` con la salida de
+  `normalize_and_merge_spans`.
+- `GET /metrics`: métricas en formato Prometheus (profundidad de cola, lotes...).
+- `GET /health`.
+
+Las peticiones concurrentes se agrupan en micro-lotes de `nlp.pipe`: el primer
+texto que llega espera como mucho `latency_ms` a que se sumen otros (hasta
+`max_batch`). Si la cola tiene `max_queue` textos pendientes se responde 503.
+"""
+import argparse
+import asyncio
+import email
+import email.policy
+import json
+import logging
+import os
+import tempfile
+import time
+
+from analyzer import analyze_batch
+from spacy_utils import DEFAULT_MODEL
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_LATENCY_MS = 20
+DEFAULT_MAX_BATCH = 16
+DEFAULT_MAX_QUEUE = 64
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class AnalysisService:
+    """Cola de textos pendientes y tarea que los analiza por micro-lotes con un modelo ya cargado."""
+
+    def __init__(self, nlp, latency_ms: float = DEFAULT_LATENCY_MS, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_queue: int = DEFAULT_MAX_QUEUE):
+        self.nlp = nlp
+        self.latency = latency_ms / 1000
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.queue = None
+        self.metrics = {'requests_total': 0, 'rejected_total': 0, 'errors_total': 0,
+                        'batches_total': 0, 'batched_texts_total': 0, 'analyze_seconds_total': 0.0}
+        self._batcher = None
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self._batcher = asyncio.ensure_future(self._run_batches())
+
+    async def stop(self):
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+
+    async def analyze(self, text: str):
+        """Encola `text` y espera sus highlights; `HTTPError(503)` si la cola está llena."""
+        if self.queue.qsize() >= self.max_queue:
+            self.metrics['rejected_total'] += 1
+            raise HTTPError(503, "cola llena, reintente más tarde")
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future))
+        return await future
+
+    async def _next_batch(self):
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.latency
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            texts = [text for text, _ in batch]
+            t0 = time.perf_counter()
+            try:
+                # El parseo corre en un hilo para que el bucle siga aceptando peticiones.
+                results = await loop.run_in_executor(None, analyze_batch, texts, self.nlp, self.max_batch)
+            except Exception as e:
+                logger.exception("Error analizando un lote de %d textos.", len(texts))
+                self.metrics['errors_total'] += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.metrics['analyze_seconds_total'] += time.perf_counter() - t0
+            self.metrics['batches_total'] += 1
+            self.metrics['batched_texts_total'] += len(batch)
+            for (_, future), highlights in zip(batch, results):
+                if not future.done():
+                    future.set_result(highlights)
+
+    def render_metrics(self) -> str:
+        lines = [
+            "# TYPE resaltado_queue_depth gauge",
+            "resaltado_queue_depth {}".format(self.queue.qsize() if self.queue is not None else 0),
+            "# TYPE resaltado_queue_capacity gauge",
+            "resaltado_queue_capacity {}".format(self.max_queue),
+        ]
+        for name, value in self.metrics.items():
+            lines.append("# TYPE resaltado_{} counter".format(name))
+            lines.append("resaltado_{} {}".format(name, value))
+        return "\n".join(lines) + "\n"
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, "línea de petición inválida")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = headers.get('content-length') or '0'
+        if not (length.isascii() and length.isdigit()):
+            raise HTTPError(400, "Content-Length inválido")
+        length = int(length)
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "cuerpo demasiado grande")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split('?', 1)[0], headers, body
+
+    async def _request_text(self, headers, body):
+        ctype = headers.get('content-type', '')
+        if ctype.startswith('application/json'):
+            try:
+                text = json.loads(body.decode('utf-8')).get('text')
+            except (ValueError, AttributeError):
+                raise HTTPError(400, "JSON inválido")
+            if not isinstance(text, str):
+                raise HTTPError(400, "falta el campo 'text'")
+            return text
+        if ctype.startswith('multipart/form-data'):
+            msg = email.message_from_bytes(
+                b"Content-Type: " + ctype.encode('latin-1') + b"\r\n\r\n" + body, policy=email.policy.HTTP)
+            for part in msg.iter_parts():
+                if part.get_filename() or part.get_param('name', header='content-disposition') in ('file', 'text'):
+                    return await self._part_text(part)
+            raise HTTPError(400, "no se envió ningún archivo")
+        try:
+            return body.decode('utf-8')
+        except UnicodeDecodeError:
+            raise HTTPError(400, "el texto debe estar en UTF-8")
+
+    async def _part_text(self, part):
+        data = part.get_payload(decode=True) or b""
+        filename = part.get_filename() or ""
+        if filename.lower().endswith('.pdf') or data.startswith(b'%PDF'):
+            from pdf_utils import read_document
+            fd, path = tempfile.mkstemp(suffix='.pdf')
+            try:
+                with os.fdopen(fd, 'wb') as fh:
+                    fh.write(data)
+                return await asyncio.get_running_loop().run_in_executor(None, read_document, path)
+            finally:
+                os.unlink(path)
+        try:
+            return data.decode('utf-8')
+        except UnicodeDecodeError:
+            raise HTTPError(400, "el archivo debe ser PDF o texto UTF-8")
+
+    async def _route(self, method, path, headers, body):
+        if path == '/analyze':
+            if method != 'POST':
+                raise HTTPError(405, "use POST")
+            self.metrics['requests_total'] += 1
+            highlights = await self.analyze(await self._request_text(headers, body))
+            return 200, 'application/json', json.dumps({'highlights': [dict(h) for h in highlights]}, ensure_ascii=False)
+        if path == '/metrics' and method == 'GET':
+            return 200, 'text/plain; version=0.0.4', self.render_metrics()
+        if path == '/health' and method == 'GET':
+            return 200, 'application/json', json.dumps({'status': 'ok'})
+        raise HTTPError(404, "ruta desconocida")
+
+    async def handle(self, reader, writer):
+        extra = {}
+        try:
+            request = await self._read_request(reader)
+            if request is None:
+                return
+            status, ctype, payload = await self._route(*request)
+        except HTTPError as e:
+            status, ctype, payload = e.status, 'application/json', json.dumps({'error': str(e)}, ensure_ascii=False)
+            if e.status == 503:
+                extra['Retry-After'] = '1'
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as e:
+            logger.exception("Error atendiendo la petición.")
+            status, ctype, payload = 500, 'application/json', json.dumps({'error': str(e)}, ensure_ascii=False)
+        data = payload.encode('utf-8')
+        head = ["HTTP/1.1 {} {}".format(status, _REASONS.get(status, '')),
+                "Content-Type: {}; charset=utf-8".format(ctype),
+                "Content-Length: {}".format(len(data)),
+                "Connection: close"]
+        head.extend("{}: {}".format(k, v) for k, v in extra.items())
+        try:
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + data)
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def start_service(nlp, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, **options):
+    """Arranca el servicio y devuelve `(service, server)`; con `port=0` se elige un puerto libre."""
+    service = AnalysisService(nlp, **options)
+    await service.start()
+    server = await asyncio.start_server(service.handle, host, port)
+    return service, server
+
+
+async def serve(nlp, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, **options):
+    service, server = await start_service(nlp, host, port, **options)
+    logger.info("Servicio escuchando en http://%s:%d", host, server.sockets[0].getsockname()[1])
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de resaltado de causas y efectos.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--latency-ms', type=float, default=DEFAULT_LATENCY_MS,
+                        help="espera máxima para completar un micro-lote")
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument('--max-queue', type=int, default=DEFAULT_MAX_QUEUE,
+                        help="textos pendientes a partir de los cuales se responde 503")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    from pipeline_planner import load_planned_pipeline
+    nlp, _ = load_planned_pipeline(args.model)
+    try:
+        asyncio.run(serve(nlp, args.host, args.port, latency_ms=args.latency_ms,
+                          max_batch=args.max_batch, max_queue=args.max_queue))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
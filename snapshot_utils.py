@@ -0,0 +1,183 @@
+"""Arranque rápido: instantánea local del pipeline recortado y del matcher compilado.
+
+`prepare_snapshot` (``python main.py --prepare``) guarda una sola vez el
+pipeline planificado —sólo los componentes activos— y el paquete de reglas
+compilado en un directorio propio. `load_pipeline` usa esa instantánea cuando
+sigue siendo válida (mismo modelo, misma versión de spaCy y mismas reglas) y,
+si no, vuelve a `pipeline_planner.load_planned_pipeline`.
+"""
+import datetime
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import rule_packs
+from cache_utils import default_cache_dir
+from spacy_utils import DEFAULT_MODEL
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "1"
+MANIFEST_NAME = 'snapshot.json'
+PIPELINE_DIR = 'pipeline'
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Programas que miden, en un intérprete nuevo, el arranque hasta el primer análisis
+# (`import_main` sólo importa el launcher, sin cargar el modelo).
+_COLD_START = {
+    'import_main': "import main",
+    'planned': ("from pipeline_planner import load_planned_pipeline\n"
+                "nlp, _ = load_planned_pipeline({model!r}, {engine!r})"),
+    'snapshot': ("from snapshot_utils import load_snapshot\n"
+                 "nlp = load_snapshot({snapshot_dir!r}, {model!r}, {engine!r})"),
+}
+_COLD_START_TAIL = ("\nfrom spacy_utils import get_matcher\n"
+                    "get_matcher(nlp)(nlp('Warm-up because the first call is slow.'))\n")
+
+
+def default_snapshot_dir() -> str:
+    return os.path.join(default_cache_dir(), 'snapshot')
+
+
+def _installed_version(package):
+    import spacy
+    try:
+        return spacy.util.get_package_version(package) if package else None
+    except Exception:
+        return None
+
+
+def read_manifest(snapshot_dir: str = None):
+    try:
+        with open(os.path.join(snapshot_dir or default_snapshot_dir(), MANIFEST_NAME), encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def snapshot_problem(manifest, preferred_model: str = DEFAULT_MODEL, engine: str = 'basic'):
+    """Motivo por el que la instantánea no sirve (None si es válida)."""
+    import spacy
+    if manifest is None:
+        return "no hay instantánea"
+    if manifest.get('format') != SNAPSHOT_FORMAT:
+        return "formato de instantánea distinto"
+    if manifest.get('requested_model') != preferred_model:
+        return "se preparó para {}".format(manifest.get('requested_model'))
+    if manifest.get('engine', 'basic') != engine:
+        return "se preparó para el motor {}".format(manifest.get('engine'))
+    if manifest.get('spacy_version') != spacy.__version__:
+        return "se preparó con spaCy {}".format(manifest.get('spacy_version'))
+    if manifest.get('pack_hash') != rule_packs.load_rule_pack(manifest.get('pack', rule_packs.DEFAULT_PACK))['hash']:
+        return "las reglas han cambiado"
+    if manifest.get('package') and _installed_version(manifest['package']) != manifest.get('package_version'):
+        return "el modelo instalado ha cambiado"
+    return None
+
+
+def prepare_snapshot(snapshot_dir: str = None, preferred_model: str = DEFAULT_MODEL, engine: str = 'basic',
+                     pack: str = rule_packs.DEFAULT_PACK, measure: bool = True) -> dict:
+    """Guarda el pipeline planificado (sin los componentes omitidos) y las reglas compiladas.
+
+    Devuelve el manifiesto escrito en `snapshot.json`; con `measure=True`
+    incluye el arranque en frío medido con y sin la instantánea y cuánto
+    tiempo de proceso ahorran los componentes omitidos sobre
+    `pipeline_planner.PROBE_TEXT` (`saved_seconds`, `saved_share`).
+    """
+    import spacy
+    from pipeline_planner import PROBE_TEXT, load_planned_pipeline, model_components
+
+    snapshot_dir = snapshot_dir or default_snapshot_dir()
+    t0 = time.perf_counter()
+    nlp, plan = load_planned_pipeline(preferred_model, engine, sample_text=PROBE_TEXT if measure else None)
+    package, _ = model_components(preferred_model)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Guardar y recargar excluyendo lo deshabilitado deja un pipeline sin esos componentes.
+        nlp.to_disk(tmp)
+        trimmed = spacy.load(tmp, exclude=list(nlp.disabled))
+        target = os.path.join(snapshot_dir, PIPELINE_DIR)
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        os.makedirs(snapshot_dir, exist_ok=True)
+        trimmed.to_disk(target)
+    compiled = rule_packs.load_compiled(trimmed, rule_packs.load_rule_pack(pack), snapshot_dir)
+
+    manifest = {
+        'format': SNAPSHOT_FORMAT,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'requested_model': preferred_model,
+        'package': package,
+        'package_version': _installed_version(package),
+        'spacy_version': spacy.__version__,
+        'engine': engine,
+        'pipeline': list(trimmed.pipe_names),
+        'skipped': plan.get('skipped', []),
+        'saved_seconds': plan.get('saved_seconds'),
+        'saved_share': plan.get('saved_share'),
+        'pack': pack,
+        'pack_hash': compiled['hash'],
+        'prepare_seconds': time.perf_counter() - t0,
+    }
+    _write_manifest(snapshot_dir, manifest)
+    if measure:
+        manifest['cold_start'] = measure_cold_start(snapshot_dir, preferred_model, engine=engine)
+        _write_manifest(snapshot_dir, manifest)
+    logger.info("Instantánea preparada en %s (%s)", snapshot_dir, ", ".join(manifest['pipeline']))
+    return manifest
+
+
+def _write_manifest(snapshot_dir, manifest):
+    with open(os.path.join(snapshot_dir, MANIFEST_NAME), 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2)
+
+
+def load_snapshot(snapshot_dir: str = None, preferred_model: str = DEFAULT_MODEL, engine: str = 'basic'):
+    """Carga la instantánea y registra su matcher compilado; None si falta o está desfasada."""
+    import spacy
+    from spacy_utils import register_matcher
+
+    snapshot_dir = snapshot_dir or default_snapshot_dir()
+    manifest = read_manifest(snapshot_dir)
+    problem = snapshot_problem(manifest, preferred_model, engine)
+    if problem:
+        logger.info("Instantánea no usada: %s.", problem)
+        return None
+    nlp = spacy.load(os.path.join(snapshot_dir, PIPELINE_DIR))
+    register_matcher(nlp, rule_packs.build_matcher(nlp, manifest['pack'], cache_dir=snapshot_dir))
+    return nlp
+
+
+def load_pipeline(preferred_model: str = DEFAULT_MODEL, snapshot_dir: str = None, engine: str = 'basic'):
+    """Pipeline para analizar con `engine`: la instantánea si es válida; si no, el pipeline planificado."""
+    nlp = load_snapshot(snapshot_dir, preferred_model, engine)
+    if nlp is not None:
+        return nlp
+    from pipeline_planner import load_planned_pipeline
+    return load_planned_pipeline(preferred_model, engine)[0]
+
+
+def measure_cold_start(snapshot_dir: str = None, preferred_model: str = DEFAULT_MODEL, repeat: int = 3,
+                       engine: str = 'basic') -> dict:
+    """Segundos (el mejor de `repeat`) desde lanzar un intérprete nuevo hasta el primer análisis."""
+    snapshot_dir = os.path.abspath(snapshot_dir or default_snapshot_dir())
+    results = {}
+    for name, program in _COLD_START.items():
+        code = program.format(model=preferred_model, snapshot_dir=snapshot_dir, engine=engine)
+        if 'nlp' in code:
+            code += _COLD_START_TAIL
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, '-c', code], cwd=_ROOT, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = best
+    results['speedup'] = results['planned'] / results['snapshot'] if results['snapshot'] else None
+    return results
@@ -1,37 +1,125 @@
-"""Funciones para cargar y configurar el modelo spaCy."""
+"""Funciones para cargar y configurar el modelo spaCy.
+
+spaCy se importa dentro de cada función: importar este módulo (y `main`) no
+cuesta nada hasta que una etapa necesita de verdad el modelo.
+"""
 import logging
-import spacy
-from spacy.pipeline import EntityRuler
+import threading
+import weakref
+from matcher_utils import setup_causal_matcher
+from rule_packs import load_rule_pack
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL = "en_core_web_lg"
+
+# Registro de proceso: modelos por (nombre, componentes deshabilitados) y un matcher por modelo.
+_registry_lock = threading.RLock()
+_models = {}
+_matchers = weakref.WeakKeyDictionary()
+
+
+def load_spacy_model(preferred_model: str = DEFAULT_MODEL, disable=(), enable=()):
+    """Carga el modelo preferido (o `en_core_web_sm`, o un pipeline en blanco).
 
-def load_spacy_model(preferred_model: str = "en_core_web_lg"):
+    `enable`, si se indica, carga sólo esos componentes: el resto se excluye
+    (ni siquiera se leen sus pesos) y los que el paquete trae deshabilitados,
+    como `senter`, se activan después. `disable` desactiva los dados. Un
+    modelo instalado que no se puede cargar es un error, no un modelo ausente.
+    """
+    import os
+    import spacy
     logger.info("Cargando modelo spaCy (preferido=%s)", preferred_model)
-    try:
-        return spacy.load(preferred_model)
-    except Exception:
-        logger.warning("No se encontró %s. Intentando en_core_web_sm...", preferred_model)
-    try:
-        return spacy.load("en_core_web_sm")
-    except Exception:
-        logger.warning("No hay modelos instalados. Creando pipeline en blanco con sentencizer.")
-        nlp = spacy.blank("en")
+    for name in dict.fromkeys((preferred_model, "en_core_web_sm")):
+        if spacy.util.is_package(name):
+            path = spacy.util.get_package_path(name)
+        elif os.path.isdir(name):
+            path = name
+        else:
+            logger.warning("No se encontró %s.", name)
+            continue
+        exclude = []
+        if enable:
+            components = spacy.util.get_model_meta(path).get('components', [])
+            exclude = [c for c in components if c not in enable]
         try:
-            nlp.add_pipe("sentencizer")
+            nlp = spacy.load(name, exclude=exclude, disable=list(disable))
         except Exception:
-            pass
+            logger.error("No se pudo cargar el modelo %s.", name)
+            raise
+        if enable:
+            set_active_pipes(nlp, enable)
+        return nlp
+    logger.warning("No hay modelos instalados. Creando pipeline en blanco con sentencizer.")
+    nlp = spacy.blank("en")
+    try:
+        nlp.add_pipe("sentencizer")
+    except Exception:
+        pass
+    return nlp
+
+
+def set_active_pipes(nlp, active):
+    """Deja activos exactamente los componentes de `active` (sin excluir ninguno del pipeline)."""
+    for name in nlp.component_names:
+        if name in active and name in nlp.disabled:
+            nlp.enable_pipe(name)
+        elif name not in active and name not in nlp.disabled:
+            nlp.disable_pipe(name)
+
+
+def get_nlp(preferred_model: str = DEFAULT_MODEL, disable=(), enable=()):
+    """Devuelve el modelo compartido del proceso, cargándolo sólo la primera vez.
+
+    La clave es el nombre del modelo y los componentes deshabilitados (o
+    habilitados), así que CLI, GUI y llamadas de librería reutilizan la misma
+    instancia.
+    """
+    key = (preferred_model, tuple(sorted(disable)), tuple(sorted(enable)))
+    with _registry_lock:
+        nlp = _models.get(key)
+        if nlp is None:
+            nlp = load_spacy_model(preferred_model, disable=disable, enable=enable)
+            _models[key] = nlp
         return nlp
 
 
+def get_matcher(nlp):
+    """Devuelve el Matcher causal asociado a `nlp`, construyéndolo una sola vez."""
+    with _registry_lock:
+        matcher = _matchers.get(nlp)
+        if matcher is None:
+            matcher = setup_causal_matcher(nlp)
+            _matchers[nlp] = matcher
+        return matcher
+
+
+def register_matcher(nlp, matcher):
+    """Asocia a `nlp` un matcher ya construido (p. ej. desde una instantánea) para `get_matcher`."""
+    with _registry_lock:
+        _matchers[nlp] = matcher
+
+
+def warm_up(preferred_model: str = DEFAULT_MODEL, disable=()):
+    """Carga el modelo y su matcher por adelantado y ejecuta un documento de prueba."""
+    nlp = get_nlp(preferred_model, disable=disable)
+    get_matcher(nlp)(nlp("Warm-up because the first call is slow."))
+    return nlp
+
+
+def clear_registry():
+    """Olvida los modelos y matchers cargados (útil en tests o para liberar memoria)."""
+    with _registry_lock:
+        _models.clear()
+        _matchers.clear()
+
+
 def add_entity_ruler(nlp):
     try:
+        from spacy.pipeline import EntityRuler
         ruler = EntityRuler(nlp)
-        ruler.add_patterns([
-            {"label": "CAUSAL_PHRASE", "pattern": "as a result of"},
-            {"label": "CAUSAL_PHRASE", "pattern": "due to"},
-            {"label": "CAUSAL_PHRASE", "pattern": "because"},
-        ])
+        ruler.add_patterns([{"label": "CAUSAL_PHRASE", "pattern": phrase}
+                            for phrase in load_rule_pack()['phrases']])
         try:
             nlp.add_pipe(ruler, before="ner")
         except Exception:
@@ -41,3 +129,40 @@ def add_entity_ruler(nlp):
                 pass
     except Exception:
         logger.debug("EntityRuler no añadido (incompatibilidad).")
+
+
+def pipeline_spec(nlp):
+    """Describe `nlp` de forma serializable para poder recrearlo en otro proceso.
+
+    Si el pipeline viene de un paquete instalado (mismo nombre y versión, y
+    todos sus componentes salen del paquete) se guarda sólo su nombre, los
+    componentes activos (`pipe_names`) y los cargados (cada proceso lo carga
+    desde disco); si no, se envían la configuración y los pesos serializados.
+    """
+    import spacy
+    package = "{}_{}".format(nlp.meta.get("lang"), nlp.meta.get("name"))
+    if spacy.util.is_package(package):
+        meta = spacy.util.get_model_meta(spacy.util.get_package_path(package))
+        if (meta.get("version") == nlp.meta.get("version")
+                and set(nlp.component_names) <= set(meta.get("components", []))):
+            return ("package", package, tuple(nlp.pipe_names), tuple(nlp.component_names))
+    return ("bytes", nlp.config.to_str(), nlp.to_bytes())
+
+
+def load_pipeline_spec(spec):
+    """Inversa de `pipeline_spec`: reconstruye el pipeline descrito."""
+    import spacy
+    kind = spec[0]
+    if kind == "package":
+        _, package, active, components = spec
+        meta = spacy.util.get_model_meta(spacy.util.get_package_path(package))
+        exclude = [c for c in meta.get("components", []) if c not in components]
+        nlp = spacy.load(package, exclude=exclude)
+        # Los componentes que el paquete trae deshabilitados (p. ej. `senter`) se activan como en el padre.
+        set_active_pipes(nlp, active)
+        return nlp
+    _, config, data = spec
+    from thinc.api import Config
+    nlp = spacy.util.load_model_from_config(Config().from_str(config), auto_fill=True)
+    nlp.from_bytes(data)
+    return nlp
@@ -0,0 +1,147 @@
+"""Contenedor compacto de highlights: arrays paralelos de inicio, fin y rol.
+
+`SpanStore` guarda los spans en arrays NumPy (NumPy ya es dependencia de
+spaCy) en lugar de un dict por highlight, y el texto de cada span sólo se
+recorta cuando alguien lo pide. Se comporta como una secuencia de dicts de
+sólo lectura (`{'role', 'start', 'end', 'text'}`), así que `html_utils`, la
+caché y los tests que comparan con listas de dicts siguen funcionando.
+"""
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+# Códigos de rol fijos; roles desconocidos se añaden al final de la tabla de cada store.
+ROLES = ('causal_sentence', 'cause', 'effect')
+
+# Al fusionar solapes gana el rol de mayor prioridad (los desconocidos valen 0).
+ROLE_PRIORITY = {'cause': 2, 'effect': 2, 'causal_sentence': 1}
+
+_KEYS = ('role', 'start', 'end', 'text')
+
+
+class SpanView(Mapping):
+    """Vista dict de un span de un `SpanStore`; `text` se recorta al pedirlo."""
+    __slots__ = ('_store', '_i')
+
+    def __init__(self, store, i):
+        self._store = store
+        self._i = i
+
+    def __getitem__(self, key):
+        store, i = self._store, self._i
+        if key == 'start':
+            return int(store.starts[i])
+        if key == 'end':
+            return int(store.ends[i])
+        if key == 'role':
+            return store.role_names[store.roles[i]]
+        if key == 'text':
+            return store.text[store.starts[i]:store.ends[i]]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(_KEYS)
+
+    def __len__(self):
+        return len(_KEYS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class SpanStore(Sequence):
+    """Spans de `text` como arrays `starts`/`ends` (int64) y `roles` (uint8, índices en `role_names`)."""
+
+    def __init__(self, text, starts=(), ends=(), roles=(), role_names=ROLES):
+        self.text = text
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+        self.roles = np.asarray(roles, dtype=np.uint8)
+        self.role_names = tuple(role_names)
+
+    @classmethod
+    def from_spans(cls, text, spans):
+        """Construye el store desde tuplas `(role, start, end)` o dicts con esas claves."""
+        role_names = list(ROLES)
+        codes = {name: i for i, name in enumerate(role_names)}
+        starts, ends, roles = [], [], []
+        for s in spans:
+            if isinstance(s, Mapping):
+                role, start, end = s.get('role'), s.get('start'), s.get('end')
+            else:
+                role, start, end = s
+            code = codes.get(role)
+            if code is None:
+                code = codes[role] = len(role_names)
+                role_names.append(role)
+            starts.append(start)
+            ends.append(end)
+            roles.append(code)
+        return cls(text, starts, ends, roles, role_names)
+
+    @classmethod
+    def from_columns(cls, text, columns):
+        """Inversa de `to_columns`."""
+        return cls(text, columns['starts'], columns['ends'], columns['roles'], columns['role_names'])
+
+    def to_columns(self) -> dict:
+        """Columnas serializables en JSON (sin el texto)."""
+        return {'starts': self.starts.tolist(), 'ends': self.ends.tolist(),
+                'roles': self.roles.tolist(), 'role_names': list(self.role_names)}
+
+    def to_dicts(self):
+        return [dict(h) for h in self]
+
+    def priorities(self):
+        table = np.array([ROLE_PRIORITY.get(name, 0) for name in self.role_names] or [0], dtype=np.int8)
+        return table[self.roles]
+
+    def merged(self):
+        """Ordena por inicio (y más largo primero) y fusiona los spans que se solapan o tocan.
+
+        Devuelve un `interval_index.IntervalIndex` (ver `IntervalIndex.merged`),
+        con el mismo resultado que el barrido de `analyzer.normalize_and_merge_spans`.
+        """
+        from interval_index import IntervalIndex
+        return IntervalIndex.build(self).merged()
+
+    def shifted(self, offset: int, text=None):
+        """Copia con los offsets desplazados `offset` caracteres (y, opcionalmente, otro texto)."""
+        return SpanStore(self.text if text is None else text, self.starts + offset, self.ends + offset,
+                         self.roles, self.role_names)
+
+    def sorted(self):
+        """El mismo store si ya está ordenado por inicio; si no, una copia ordenada (estable)."""
+        if np.all(self.starts[1:] >= self.starts[:-1]):
+            return self
+        order = np.argsort(self.starts, kind='stable')
+        return SpanStore(self.text, self.starts[order], self.ends[order], self.roles[order], self.role_names)
+
+    def iter_tuples(self):
+        """Genera `(role, start, end)` sin crear vistas ni recortar texto."""
+        names = self.role_names
+        for code, start, end in zip(self.roles.tolist(), self.starts.tolist(), self.ends.tolist()):
+            yield names[code], start, end
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return SpanStore(self.text, self.starts[i], self.ends[i], self.roles[i], self.role_names)
+        n = len(self.starts)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("índice de span fuera de rango")
+        return SpanView(self, i)
+
+    def __eq__(self, other):
+        if isinstance(other, (SpanStore, list, tuple)):
+            return len(self) == len(other) and all(dict(a) == dict(b) for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "SpanStore({} spans)".format(len(self))
@@ -0,0 +1,133 @@
+import json
+import os
+import sys
+import threading
+import time
+import types
+
+import pytest
+import spacy
+from spacy.language import Language
+from spacy.training import Example
+
+
+@Language.component("test_lower_lemmas", assigns=["token.lemma"])
+def _lower_lemmas(doc):
+    # Sustituto mínimo del lemmatizer para poder usar patrones LEMMA sin modelo.
+    for tok in doc:
+        tok.lemma_ = tok.lower_
+    return doc
+
+
+@pytest.fixture(autouse=True, scope="session")
+def isolated_cache_dir(tmp_path_factory):
+    # Las cachés por defecto (p. ej. las reglas compiladas) no salen del directorio temporal.
+    mp = pytest.MonkeyPatch()
+    mp.setenv('RESALTADO_CACHE_DIR', str(tmp_path_factory.mktemp('cache')))
+    yield
+    mp.undo()
+
+
+@pytest.fixture(scope="session")
+def blank_nlp():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    nlp.add_pipe("test_lower_lemmas")
+    return nlp
+
+
+@pytest.fixture(scope="session")
+def packaged_pipeline(tmp_path_factory):
+    """Instala (en un directorio del `sys.path`) un paquete `en_pipeline` como los en_core_web_*.
+
+    Igual que ellos trae `senter` deshabilitado en su configuración, así que
+    sirve para probar la carga real de paquetes sin descargar un modelo.
+    """
+    root = tmp_path_factory.mktemp("site")
+    nlp = spacy.blank("en")
+    for name in ("senter", "tagger", "ner"):
+        nlp.add_pipe(name)
+    examples = []
+    for text in ["It rained in Paris. We stayed home.", "Prices rose because of the drought."]:
+        doc = nlp.make_doc(text)
+        examples.append(Example.from_dict(doc, {
+            "tags": ["X"] * len(doc),
+            "sent_starts": [1] + [0] * (len(doc) - 1),
+            "entities": ["O"] * len(doc),
+        }))
+    nlp.initialize(lambda: examples)
+    nlp.disable_pipe("senter")
+    nlp.meta.update(name="pipeline", version="0.0.0")
+
+    package = root / "en_pipeline"
+    package.mkdir()
+    nlp.to_disk(package / "en_pipeline-0.0.0")
+    (package / "meta.json").write_text(json.dumps(nlp.meta), encoding="utf-8")
+    (package / "__init__.py").write_text(
+        "from spacy.util import load_model_from_init_py\n\n\n"
+        "def load(**overrides):\n"
+        "    return load_model_from_init_py(__file__, **overrides)\n", encoding="utf-8")
+    info = root / "en_pipeline-0.0.0.dist-info"
+    info.mkdir()
+    (info / "METADATA").write_text("Metadata-Version: 2.1\nName: en_pipeline\nVersion: 0.0.0\n",
+                                   encoding="utf-8")
+
+    mp = pytest.MonkeyPatch()
+    mp.syspath_prepend(str(root))
+    mp.setenv("PYTHONPATH", os.pathsep.join(filter(None, [str(root), os.environ.get("PYTHONPATH")])))
+    yield "en_pipeline"
+    mp.undo()
+
+
+class FakeImage:
+    """Imagen de página mínima que cuenta cuántas siguen vivas a la vez."""
+    alive = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, page):
+        self.page = page
+        self.size = (100, 10)
+        with FakeImage.lock:
+            FakeImage.alive += 1
+            FakeImage.peak = max(FakeImage.peak, FakeImage.alive)
+
+    def getbands(self):
+        return ("L",)
+
+    def __del__(self):
+        with FakeImage.lock:
+            FakeImage.alive -= 1
+
+
+class FakeOCR:
+    """Sustituye `pdf2image`/`pytesseract` por dobles que devuelven "page N" para la página N."""
+
+    def __init__(self, monkeypatch):
+        self.monkeypatch = monkeypatch
+
+    def install(self, n_pages):
+        FakeImage.peak = 0
+        pdf2image = types.ModuleType("pdf2image")
+        pdf2image.pdfinfo_from_path = lambda path: {"Pages": n_pages}
+        pdf2image.convert_from_path = lambda path, dpi, first_page, last_page: [
+            FakeImage(p) for p in range(first_page, last_page + 1)]
+        pytesseract = types.ModuleType("pytesseract")
+
+        def image_to_string(img):
+            time.sleep(0.002 * (img.page % 3))  # terminan desordenadas
+            return "page {}".format(img.page)
+
+        pytesseract.image_to_string = image_to_string
+        self.monkeypatch.setitem(sys.modules, "pdf2image", pdf2image)
+        self.monkeypatch.setitem(sys.modules, "pytesseract", pytesseract)
+
+    @property
+    def peak_images(self):
+        """Máximo de imágenes de página vivas a la vez desde `install`."""
+        return FakeImage.peak
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    return FakeOCR(monkeypatch)
@@ -0,0 +1,62 @@
+import json
+import os
+
+import pytest
+
+import batch_utils
+import main
+from batch_utils import expand_inputs, run_batch
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "sub").mkdir(parents=True)
+    (docs / "a.txt").write_text("The mission failed because the engine overheated.", encoding="utf-8")
+    (docs / "sub" / "a.txt").write_text("If you heat water, it boils.", encoding="utf-8")
+    (docs / "b.txt").write_text("Nothing to see here.", encoding="utf-8")
+    (docs / "broken.txt").write_bytes(b"\xff\xfe\xfa not utf-8")
+    (docs / "notes.md").write_text("ignored", encoding="utf-8")
+    return docs
+
+
+def test_expand_inputs_handles_dirs_and_globs(corpus):
+    by_dir = expand_inputs([str(corpus)])
+    assert len(by_dir) == 4
+    assert expand_inputs([str(corpus / "*.txt"), str(corpus / "a.txt")]) == sorted(
+        str(corpus / n) for n in ("a.txt", "b.txt", "broken.txt"))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_writes_reports_and_manifest(corpus, tmp_path, blank_nlp, monkeypatch, workers):
+    monkeypatch.setattr(batch_utils, "load_pipeline", lambda model, **kw: blank_nlp)
+    out = tmp_path / "out"
+    manifest = run_batch([str(corpus)], str(out), workers=workers, use_cache=False)
+
+    summary = manifest['summary']
+    assert (summary['documents'], summary['failed']) == (4, 1)
+    assert set(summary['stage_seconds']) == {'extract', 'analyze', 'html'}
+    reports = sorted(f for f in os.listdir(out) if f.endswith('.html'))
+    assert len(reports) == 3 and 'b.html' in reports  # los dos a.txt no se pisan
+    with open(out / "run_manifest.json", encoding="utf-8") as fh:
+        assert json.load(fh)['summary']['documents'] == 4
+
+
+def test_batch_passes_engine_snapshot_and_doc_cache(tmp_path, blank_nlp, monkeypatch):
+    calls = []
+
+    def fake_load_pipeline(model, **kwargs):
+        calls.append(kwargs)
+        return blank_nlp
+
+    monkeypatch.setattr(batch_utils, "load_pipeline", fake_load_pipeline)
+    stored = []
+    monkeypatch.setattr('analyzer.store_docs', lambda cache, key, docs: stored.append(key))
+    (tmp_path / "due.txt").write_text("Prices rose due to the drought.", encoding="utf-8")
+    out = tmp_path / "out"
+    main.main([str(tmp_path / "due.txt"), '--batch', '--out-dir', str(out), '--engine', 'dependency',
+               '--snapshot-dir', str(tmp_path / "snap"), '--doc-cache', '--export', 'jsonl'])
+    assert calls == [{'snapshot_dir': str(tmp_path / "snap"), 'engine': 'dependency'}]
+    assert len(stored) == 1
+    with open(out / "due.jsonl", encoding="utf-8") as fh:
+        assert [json.loads(line)['role'] for line in fh] == ['effect', 'cause']
@@ -0,0 +1,21 @@
+from benchmarks.corpus_gen import generate_corpus, parse_size
+from benchmarks.run_benchmarks import compare
+from prefilter import candidate_regions
+
+
+def test_corpus_size_and_density():
+    assert parse_size("10KB") == 10240 and parse_size("50MB") == 50 * 1024 ** 2
+    dense = generate_corpus("20KB", "dense", seed=1)
+    sparse = generate_corpus("20KB", "sparse", seed=1)
+    assert len(dense) == len(sparse) == 20480
+    assert generate_corpus("20KB", "dense", seed=1) == dense
+    assert len(candidate_regions(dense, context=0)) > 5 * len(candidate_regions(sparse, context=0))
+
+
+def test_compare_flags_only_real_regressions():
+    def report(**stages):
+        return {'results': [{'stage': s, 'corpus': 'dense-1MB', 'seconds': t} for s, t in stages.items()]}
+
+    baseline = report(parse=1.0, merge=0.001, html=0.5)
+    current = report(parse=1.5, merge=0.003, html=0.55)
+    assert [r['stage'] for r in compare(current, baseline, threshold=0.2)] == ['parse']
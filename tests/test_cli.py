@@ -0,0 +1,66 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import main
+import snapshot_utils
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_main_processes_a_file_after_import(tmp_path, monkeypatch):
+    path = tmp_path / "doc.txt"
+    path.write_text("A <b> tag because x < y.", encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    main.main([str(path), '--no-cache', '--export', 'jsonl'])
+    report = (tmp_path / "highlighted_report.html").read_text(encoding='utf-8')
+    assert "&lt;b&gt;" in report and "<b>" not in report
+    assert (tmp_path / "highlighted_report.jsonl").exists()
+
+
+def test_script_runs_only_the_argparse_entry_point(tmp_path):
+    env = dict(os.environ, RESALTADO_CACHE_DIR=str(tmp_path))
+    result = subprocess.run([sys.executable, os.path.join(ROOT, 'main.py'), '--clear-cache'],
+                            cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert not (tmp_path / "highlighted_report.html").exists()
+
+
+def test_snapshot_dir_reaches_load_pipeline(tmp_path, monkeypatch, blank_nlp):
+    calls = []
+
+    def fake_load_pipeline(**kwargs):
+        calls.append(kwargs)
+        return blank_nlp
+
+    path = tmp_path / "doc.txt"
+    path.write_text("It failed because it rained.", encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, 'load_pipeline', fake_load_pipeline)
+    main.main([str(path), '--no-cache', '--snapshot-dir', str(tmp_path / "snap")])
+    assert calls == [{'snapshot_dir': str(tmp_path / "snap"), 'engine': 'basic'}]
+
+
+def test_prepare_with_dependency_engine_measures_that_engine(tmp_path, monkeypatch, capsys):
+    measure = snapshot_utils.measure_cold_start
+    monkeypatch.setattr(snapshot_utils, 'measure_cold_start', lambda *args, **kw: measure(*args, repeat=1, **kw))
+    main.main(['--prepare', '--engine', 'dependency', '--snapshot-dir', str(tmp_path / "snap")])
+    assert snapshot_utils.read_manifest(str(tmp_path / "snap"))['engine'] == 'dependency'
+    assert "Arranque en frío" in capsys.readouterr().out
+
+
+def test_cprofile_stage_requires_profile(capsys):
+    with pytest.raises(SystemExit) as exc:
+        main.main(['--cprofile-stage', 'parse', 'doc.txt'])
+    assert exc.value.code == 2
+    assert "--profile" in capsys.readouterr().err
+
+
+def test_profile_is_written_when_the_run_fails(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(FileNotFoundError):
+        main.main([str(tmp_path / "missing.txt"), '--no-cache', '--profile', str(tmp_path / "profile.json")])
+    assert 'extract' in json.loads((tmp_path / "profile.json").read_text(encoding='utf-8'))['stages']
@@ -0,0 +1,43 @@
+import doc_cache
+import result_cache
+from analyzer import analyze_text
+
+TEXT = "\n\n".join([
+    "The mission failed because the engine overheated. The crew was safe.",
+    "If you heat water, it boils. Nothing else happened that day.",
+    "Prices rose due to the drought. Farmers sold their cattle.",
+] * 10)
+
+
+def test_rule_change_reuses_parsed_docs(tmp_path, blank_nlp, monkeypatch):
+    cache = result_cache.open_result_cache(str(tmp_path / "results.sqlite"))
+    docs = doc_cache.open_doc_cache(str(tmp_path / "docs.sqlite"))
+    first = analyze_text(TEXT, blank_nlp, cache=cache, doc_cache=docs)
+    assert first == analyze_text(TEXT, blank_nlp)
+
+    # Reglas nuevas: falla la caché de resultados, pero no se vuelve a parsear.
+    monkeypatch.setattr(result_cache, "rules_fingerprint", lambda: "otras-reglas")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("no debería volver a parsear")
+
+    monkeypatch.setattr(blank_nlp, "pipe", fail)
+    assert analyze_text(TEXT, blank_nlp, cache=cache, doc_cache=docs) == first
+    assert docs.hits >= 2
+
+
+def test_docs_are_sharded_and_roundtrip(tmp_path, blank_nlp, monkeypatch):
+    monkeypatch.setattr(doc_cache, "SHARD_DOCS", 2)
+    docs = doc_cache.open_doc_cache(str(tmp_path / "docs.sqlite"))
+    chunked = analyze_text(TEXT, blank_nlp, chunk_chars=300, doc_cache=docs)
+    assert docs.stats()['entries'] > 3
+
+    key = doc_cache.doc_key(TEXT, blank_nlp, 300)
+    loaded = doc_cache.load_docs(docs, key, blank_nlp)
+    assert "".join(doc.text for doc, _ in loaded) == TEXT
+    assert [t.lemma_ for t in loaded[0][0]][:2] == ["the", "mission"]
+    assert analyze_text(TEXT, blank_nlp, chunk_chars=300, doc_cache=docs) == chunked
+
+    # Si el LRU desaloja un fragmento, el documento entero cuenta como fallo.
+    docs._conn.execute("DELETE FROM entries WHERE key = ?", ("{}/1".format(key),))
+    assert doc_cache.load_docs(docs, key, blank_nlp) is None
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from analyzer import analyze_text
+from export_utils import JSONLSink, ParquetSink, SpanIndex, open_sinks
+from html_utils import generate_html_report
+from pdf_utils import join_pages
+
+PAGES = [
+    "The mission failed because the engine overheated. The crew was safe.",
+    "If you heat water, it boils. Nothing else happened that day.",
+    "Prices rose due to the drought. Farmers sold their cattle.",
+] * 5
+
+
+def test_jsonl_and_index_share_the_report_pass(blank_nlp, tmp_path):
+    text, offsets = join_pages(PAGES)
+    highlights = analyze_text(text, blank_nlp)
+    report = str(tmp_path / "report.html")
+    sinks = open_sinks(report, ['jsonl'], offsets)
+    with sinks[0]:
+        generate_html_report(text, highlights, report, sinks)
+
+    lines = (tmp_path / "report.jsonl").read_text(encoding='utf-8').splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [{k: r[k] for k in ('role', 'start', 'end', 'text')} for r in records] == highlights
+    assert all(text[r['start']:r['end']] == r['text'] for r in records)
+
+    index = SpanIndex(str(tmp_path / "report.spanidx"))
+    try:
+        assert len(index) == len(records)
+        page2 = index.records(index.in_pages(2))
+        assert page2 == [r for r in records if r['page'] == 2] and page2
+        a, b = offsets[3], offsets[5]
+        hits = index.records(index.overlapping(a, b, role='cause'))
+        assert hits == [r for r in records if r['start'] < b and r['end'] > a and r['role'] == 'cause']
+        assert list(index.overlapping(a, b, role='nope')) == []
+    finally:
+        index.close()
+
+
+def test_index_handles_nested_spans(tmp_path):
+    text = "x" * 100
+    with JSONLSink(str(tmp_path / "s.jsonl"), str(tmp_path / "s.spanidx")) as sink:
+        for role, a, b in [('causal_sentence', 0, 90), ('cause', 10, 20), ('effect', 50, 60)]:
+            sink.write(role, a, b, text)
+    index = SpanIndex(str(tmp_path / "s.spanidx"))
+    try:
+        assert list(index.overlapping(70, 80)) == [0]
+        assert list(index.overlapping(15, 55)) == [0, 1, 2]
+        assert list(index.overlapping(95, 99)) == []
+    finally:
+        index.close()
+
+
+def test_parquet_export_roundtrip(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    text = "Prices rose because demand grew."
+    with ParquetSink(str(tmp_path / "s.parquet")) as sink:
+        sink.write('cause', 20, 31, text)
+    table = pq.read_table(str(tmp_path / "s.parquet")).to_pylist()
+    assert table == [{'role': 'cause', 'start': 20, 'end': 31, 'page': 1, 'text': 'demand grew'}]
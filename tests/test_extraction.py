@@ -1,26 +1,28 @@
 import pytest
-from main import setup_causal_matcher, nlp, analyze_text
 
+from analyzer import analyze_text
+from spacy_utils import get_nlp
 
-def run_and_collect(text):
-    matcher = setup_causal_matcher(nlp)
-    return analyze_text(text, matcher)
+CAUSAL_ROLES = {'cause', 'effect', 'causal_sentence'}
 
 
-def test_because_pattern():
-    text = "The mission failed because the engine overheated."
-    highlights = run_and_collect(text)
-    # should detect a cause and an effect (or at least a causal_sentence)
-    assert any(h[0] in ('cause','effect','causal_sentence') for h in highlights)
+@pytest.fixture(scope="module")
+def nlp():
+    return get_nlp()
 
 
-def test_if_then_pattern():
-    text = "If you heat water, it boils."
-    highlights = run_and_collect(text)
-    assert any(h[0] in ('cause','effect','causal_sentence') for h in highlights)
+def roles(text, nlp):
+    return {h['role'] for h in analyze_text(text, nlp)}
 
 
-def test_leads_to_pattern():
-    text = "The storm led to power outages."
-    highlights = run_and_collect(text)
-    assert any(h[0] in ('cause','effect','causal_sentence') for h in highlights)
+def test_because_pattern(nlp):
+    # debe detectar causa y efecto (o al menos una oración causal)
+    assert roles("The mission failed because the engine overheated.", nlp) & CAUSAL_ROLES
+
+
+def test_if_then_pattern(nlp):
+    assert roles("If you heat water, it boils.", nlp) & CAUSAL_ROLES
+
+
+def test_leads_to_pattern(nlp):
+    assert roles("The storm led to power outages.", nlp) & CAUSAL_ROLES
@@ -0,0 +1,62 @@
+import threading
+
+from analyzer import analyze_text
+from gui import analyze_document
+
+PARAGRAPHS = [
+    "The mission failed because the engine overheated. The crew was safe.",
+    "If you heat water, it boils. Nothing else happened that day.",
+]
+TEXT = "\n\n".join(PARAGRAPHS * 30)
+
+
+def test_analyze_document_reports_progress_and_partial(blank_nlp, tmp_path):
+    src = tmp_path / "book.txt"
+    src.write_text(TEXT, encoding='utf-8')
+    out = tmp_path / "report.html"
+    progress, partial = [], []
+    original = blank_nlp.max_length
+    blank_nlp.max_length = 1000
+    try:
+        summary = analyze_document(str(src), blank_nlp, str(out),
+                                   progress=lambda message, fraction: progress.append(fraction),
+                                   on_partial=partial.append)
+    finally:
+        blank_nlp.max_length = original
+    assert summary['status'] == 'done'
+    assert summary['analyzed_chars'] == len(TEXT)
+    assert summary['highlights'] == len(analyze_text(TEXT, blank_nlp))
+    assert partial == [str(out)]
+    assert len(progress) > 1 and progress == sorted(progress) and progress[-1] == 1.0
+
+
+def test_cancel_keeps_analysed_prefix(blank_nlp, tmp_path):
+    src = tmp_path / "book.txt"
+    src.write_text(TEXT, encoding='utf-8')
+    out = tmp_path / "report.html"
+    cancel = threading.Event()
+    cancel.set()
+    original = blank_nlp.max_length
+    blank_nlp.max_length = 1000
+    try:
+        summary = analyze_document(str(src), blank_nlp, str(out), cancel=cancel)
+    finally:
+        blank_nlp.max_length = original
+    assert summary['status'] == 'cancelled'
+    assert 0 < summary['analyzed_chars'] <= 1000
+    assert out.exists()
+
+
+def test_worker_loads_pipeline_from_snapshot_dir(blank_nlp, tmp_path, monkeypatch):
+    import queue
+
+    import snapshot_utils
+    from gui import _worker
+
+    calls = []
+    monkeypatch.setattr(snapshot_utils, 'load_pipeline', lambda **kwargs: calls.append(kwargs) or blank_nlp)
+    jobs, messages = queue.Queue(), queue.Queue()
+    jobs.put(None)
+    _worker(jobs, messages, threading.Event(), snapshot_dir=str(tmp_path))
+    assert calls == [{'snapshot_dir': str(tmp_path)}]
+    assert messages.get_nowait() == ('ready', None)
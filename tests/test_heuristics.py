@@ -0,0 +1,76 @@
+from collections import namedtuple
+
+import spacy
+from spacy.tokens import Doc
+
+from heuristics import extract_cause_effect_basic, extract_cause_effect_dep
+
+Sent = namedtuple('Sent', 'text start_char')
+
+
+def spans_text(sent, spans):
+    return [(role, sent.text[a - sent.start_char:b - sent.start_char]) for role, a, b in spans]
+
+
+def test_because_offsets_come_from_the_match_not_find():
+    sent = Sent("We won because we won.", 100)
+    spans = extract_cause_effect_basic(sent)
+    assert spans == [('effect', 100, 106), ('cause', 115, 121)]
+
+
+def test_if_then_and_leads_to():
+    sent = Sent("If you heat water, then it boils.", 0)
+    assert spans_text(sent, extract_cause_effect_basic(sent)) == [
+        ('cause', 'you heat water'), ('effect', 'it boils.')]
+    sent = Sent("Smoking  Leads to disease", 7)
+    assert spans_text(sent, extract_cause_effect_basic(sent)) == [
+        ('cause', 'Smoking'), ('effect', 'disease')]
+
+
+def test_if_without_comma_falls_through_to_later_if():
+    sent = Sent("Ask if needed\nIf it rains, we stay.", 0)
+    assert spans_text(sent, extract_cause_effect_basic(sent)) == [
+        ('cause', 'it rains'), ('effect', 'we stay.')]
+
+
+def test_no_marker():
+    assert extract_cause_effect_basic(Sent("Nothing happened.", 0)) == []
+
+
+def test_dep_engine_uses_subtree_edges_with_absolute_offsets():
+    nlp = spacy.blank("en")
+    doc = Doc(nlp.vocab, words=["It", "rained", ".", "Thick", "smoke", "causes", "bad", "coughing", "."],
+              heads=[1, 1, 1, 4, 5, 5, 7, 5, 5],
+              deps=["nsubj", "ROOT", "punct", "amod", "nsubj", "ROOT", "amod", "dobj", "punct"],
+              lemmas=["it", "rain", ".", "thick", "smoke", "cause", "bad", "coughing", "."])
+    sent = list(doc.sents)[1]
+    assert [(role, doc.text[a:b]) for role, a, b in extract_cause_effect_dep(sent)] == [
+        ('cause', 'Thick smoke'), ('effect', 'bad coughing')]
+
+
+def test_dep_engine_markers_are_tokens():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    doc = nlp("It rained. He also left, so we stayed home due to the rain.")
+    first, second = doc.sents
+    assert extract_cause_effect_dep(first) == []
+    assert [(role, doc.text[a:b]) for role, a, b in extract_cause_effect_dep(second)] == [
+        ('effect', 'He also left, so we stayed home'), ('cause', 'the rain.')]
+    doc = nlp("Later, if it rains then we stay.")
+    assert [(role, doc.text[a:b]) for role, a, b in extract_cause_effect_dep(doc[:])] == [
+        ('cause', 'it rains'), ('effect', 'we stay.')]
+
+
+def test_dependency_engine_through_analyzer():
+    from analyzer import analyze_text
+    from heuristics import get_engine
+    import pytest
+
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    text = "Prices rose due to the drought."
+    assert [h['role'] for h in analyze_text(text, nlp)] == ['causal_sentence']
+    assert [(h['role'], h['text']) for h in analyze_text(text, nlp, engine='dependency')] == [
+        ('effect', 'Prices rose'), ('cause', 'the drought.')]
+    with pytest.raises(ValueError):
+        get_engine('nope')
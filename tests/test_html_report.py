@@ -0,0 +1,52 @@
+import html
+
+import html_utils
+from html_utils import generate_html_report
+
+TEMPLATE = """
+    <html>
+    <head><meta charset='utf-8'><style>{}</style></head>
+    <body>
+    <h1>Causal Analysis Report</h1>
+    <div class='legend'><span class='cause'>Cause</span> <span class='effect'>Effect</span> <span class='causal_sentence'>Causal sentence</span></div>
+    <div class='content'>
+    {}
+    </div>
+    </body>
+    </html>
+    """
+
+
+def reference_report(text, highlights):
+    # Maquetación anterior (todo en memoria) con el texto escapado.
+    pieces = []
+    last = 0
+    for h in sorted(highlights, key=lambda h: h['start']):
+        if h['start'] > last:
+            pieces.append(html.escape(text[last:h['start']], quote=False))
+        pieces.append("<span class='{}'>{}</span>".format(
+            h['role'], html.escape(text[h['start']:h['end']], quote=False)))
+        last = h['end']
+    if last < len(text):
+        pieces.append(html.escape(text[last:], quote=False))
+    return TEMPLATE.format(html_utils.CSS, ''.join(pieces))
+
+
+def test_streamed_report_matches_escaped_layout(tmp_path, monkeypatch):
+    monkeypatch.setattr(html_utils, "WRITE_CHUNK_CHARS", 7)
+    text = "if a < b & c > d, then <script>x</script> runs.\n" * 5
+    highlights = [
+        {'role': 'effect', 'start': 56, 'end': 80},
+        {'role': 'cause', 'start': 3, 'end': 16},
+        {'role': 'causal_sentence', 'start': 100, 'end': 140},
+    ]
+    out = tmp_path / "report.html"
+    generate_html_report(text, highlights, str(out))
+    assert out.read_bytes() == reference_report(text, highlights).encode('utf-8')
+    assert "<script>" not in out.read_text(encoding='utf-8')
+
+
+def test_report_without_highlights(tmp_path):
+    out = tmp_path / "report.html"
+    generate_html_report("plain <text>", [], str(out))
+    assert out.read_text(encoding='utf-8') == reference_report("plain <text>", [])
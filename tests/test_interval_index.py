@@ -0,0 +1,64 @@
+import io
+import random
+
+from analyzer import normalize_and_merge_spans
+from html_utils import write_html_report
+from interval_index import IntervalIndex
+
+ROLES = ['cause', 'effect', 'causal_sentence']
+
+
+def random_spans(rng, n, size=1000):
+    spans = []
+    for _ in range(n):
+        a = rng.randint(0, size - 1)
+        spans.append((rng.choice(ROLES), a, a + rng.randint(0, 60)))
+    return spans
+
+
+def brute(spans, keep, role):
+    return sorted((s, e, r) for r, s, e in spans if keep(s, e) and (role is None or r == role))
+
+
+def found(index, positions):
+    return sorted((int(index.starts[i]), int(index.ends[i]), index.role_names[index.roles[i]]) for i in positions)
+
+
+def test_range_queries_match_brute_force():
+    rng = random.Random(3)
+    for _ in range(50):
+        spans = random_spans(rng, rng.randint(0, 80))
+        index = IntervalIndex.build(spans)
+        for _ in range(20):
+            a = rng.randint(0, 1000)
+            b = a + rng.randint(0, 120)
+            role = rng.choice(ROLES + [None, 'nope'])
+            assert found(index, index.overlapping(a, b, role)) == brute(spans, lambda s, e: s < b and e > a, role)
+            assert found(index, index.within(a, b, role)) == brute(spans, lambda s, e: s >= a and e <= b, role)
+            assert found(index, index.containing(a, b, role)) == brute(spans, lambda s, e: s <= a and e >= b, role)
+
+
+def test_page_queries_and_merge():
+    text = "".join("page {} text. ".format(i).ljust(100, ".") for i in range(10))
+    offsets = list(range(0, 1000, 100))
+    spans = [('cause', 105, 120), ('effect', 190, 230), ('causal_sentence', 100, 250), ('cause', 950, 990)]
+    index = IntervalIndex.build(spans, text, offsets)
+    assert index.page_range(2, 3) == (100, 300)
+    assert index.page_range(10) == (900, 1000)
+    assert found(index, index.in_pages(2, role='cause')) == [(105, 120, 'cause')]
+    assert found(index, index.in_pages(3)) == [(100, 250, 'causal_sentence'), (190, 230, 'effect')]
+    assert found(index, index.in_pages(2, contained=True)) == [(105, 120, 'cause')]
+    assert [index.page_of(i) for i in range(len(index))] == [2, 2, 2, 10]
+
+    merged = normalize_and_merge_spans(text, spans)
+    assert isinstance(merged, IntervalIndex)
+    assert [(h['role'], h['start'], h['end']) for h in merged] == [('cause', 105, 250), ('cause', 950, 990)]
+    assert found(merged, merged.overlapping(240, 960)) == [(105, 250, 'cause'), (950, 990, 'cause')]
+
+
+def test_report_does_not_repeat_overlapping_text():
+    text = "Prices rose because demand grew."
+    fh = io.StringIO()
+    write_html_report(text, [{'role': 'causal_sentence', 'start': 0, 'end': 32},
+                             {'role': 'cause', 'start': 20, 'end': 31}], fh)
+    assert fh.getvalue().count("demand") == 1
@@ -0,0 +1,77 @@
+import pytest
+
+from analyzer import analyze_mapped, analyze_text, iter_overlapping_chunks
+from mapped_text import MappedText, should_map
+
+PARAGRAPHS = [
+    "The mission failed because the engine overheated. The crew was safe.",
+    "Über alles: prices rose due to the drought — farmers sold their cattle.",
+    "If you heat water, it boils. Nothing else happened that day.",
+]
+TEXT = "\n\n".join(PARAGRAPHS * 30)
+
+
+@pytest.fixture
+def mapped(tmp_path):
+    path = tmp_path / "big.txt"
+    path.write_bytes(TEXT.encode('utf-8'))
+    # Bloques diminutos para partir caracteres multibyte entre bloques.
+    with MappedText(str(path), block_bytes=7) as text:
+        yield text
+
+
+def test_slices_use_global_char_offsets(mapped):
+    assert len(mapped) == len(TEXT)
+    for a, b in [(0, 10), (75, 140), (len(TEXT) - 5, len(TEXT)), (3, 3)]:
+        assert mapped[a:b] == TEXT[a:b]
+    assert mapped[-1] == TEXT[-1]
+    i = TEXT.index("—")
+    assert mapped.byte_offset(i) == len(TEXT[:i].encode('utf-8'))
+
+
+def test_overlapping_chunks_are_sentence_aligned(mapped):
+    chunks = list(iter_overlapping_chunks(mapped, 400, 120))
+    assert len(chunks) > 1
+    pos = 0
+    for chunk, offset, overlap in chunks:
+        assert chunk == TEXT[offset:offset + len(chunk)]
+        assert offset + overlap == pos
+        pos += len(chunk) - overlap
+    assert pos == len(TEXT)
+    assert any(overlap for _, _, overlap in chunks[1:])
+
+
+def test_mapped_analysis_matches_full_analysis(blank_nlp, mapped):
+    streamed = list(analyze_mapped(mapped, blank_nlp, chunk_chars=400, overlap_chars=120))
+    assert streamed == analyze_text(TEXT, blank_nlp)
+    assert all(mapped[h['start']:h['end']] == h['text'] for h in streamed)
+
+
+def test_mapped_fallback_only_when_no_chunk_matched(blank_nlp, tmp_path):
+    # Los trozos del final no tienen marcadores del matcher, sólo del fallback ('then').
+    unmatched = "\n\n".join(["Then we went home. It was late."] * 20)
+    for text in ("\n\n".join(PARAGRAPHS) + "\n\n" + unmatched, unmatched):
+        path = tmp_path / "mixed.txt"
+        path.write_text(text, encoding='utf-8')
+        with MappedText(str(path)) as mapped:
+            streamed = list(analyze_mapped(mapped, blank_nlp, chunk_chars=200, overlap_chars=60))
+        assert streamed == analyze_text(text, blank_nlp)
+        assert streamed
+
+
+def test_should_map_only_large_text_files(tmp_path):
+    small = tmp_path / "a.txt"
+    small.write_text("x" * 10, encoding='utf-8')
+    assert should_map(str(small), min_bytes=5)
+    assert not should_map(str(small))
+    assert not should_map(str(tmp_path / "a.pdf"), min_bytes=0)
+
+
+def test_mapped_merges_spans_that_touch_across_chunks(blank_nlp, tmp_path):
+    text = "\n\n".join(["Prices rose due to the long drought."] * 40)
+    path = tmp_path / "touching.txt"
+    path.write_bytes(text.encode('utf-8'))
+    with MappedText(str(path)) as mapped:
+        streamed = list(analyze_mapped(mapped, blank_nlp, chunk_chars=200, overlap_chars=60))
+    assert streamed == analyze_text(text, blank_nlp)
+    assert len(streamed) == 1
@@ -0,0 +1,54 @@
+from benchmarks.corpus_gen import write_text_pdf
+from pdf_utils import extract_pages_hybrid, is_garbage_text, iter_ocr_pages
+
+
+def test_pages_come_back_in_order_with_bounded_images(fake_ocr):
+    fake_ocr.install(40)
+    # cada imagen ocupa 1000 bytes: como mucho 4 pendientes más la ventana en curso
+    out = list(iter_ocr_pages("book.pdf", workers=4, window=2, max_inflight_bytes=4000))
+    assert out == [(i, "page {}".format(i + 1)) for i in range(40)]
+    assert fake_ocr.peak_images <= 6
+
+
+def test_only_requested_pages_are_rasterized(fake_ocr):
+    fake_ocr.install(10)
+    out = list(iter_ocr_pages("book.pdf", workers=2, pages=[7, 2, 3]))
+    assert out == [(2, "page 3"), (3, "page 4"), (7, "page 8")]
+
+
+def test_garbage_text_detection():
+    assert is_garbage_text("")
+    assert is_garbage_text("  12 ")
+    assert is_garbage_text("(cid:3)(cid:4)(cid:5)(cid:9) ab")
+    assert is_garbage_text("\x01\x02\x03 \x04\x05\x06\x07\x08")
+    assert not is_garbage_text("Chapter 1. The storm led to outages.")
+
+
+def test_hybrid_ocr_only_touches_pages_without_text(fake_ocr, tmp_path):
+    pdf = write_text_pdf(tmp_path / "mixed.pdf", ["Real text on page one.", "", "Real text on page three."])
+    fake_ocr.install(3)
+    assert extract_pages_hybrid(pdf) == ["Real text on page one.", "page 2", "Real text on page three."]
+
+
+def test_hybrid_ocrs_the_whole_document_when_no_page_can_be_read(fake_ocr, tmp_path):
+    bad = tmp_path / "scanned.pdf"
+    bad.write_bytes(b"not a pdf")
+    fake_ocr.install(3)
+    assert extract_pages_hybrid(str(bad)) == ["page 1", "page 2", "page 3"]
+
+
+def test_hybrid_honours_the_worker_count(fake_ocr, monkeypatch, tmp_path):
+    import pdf_utils
+    pdf = write_text_pdf(tmp_path / "scan.pdf", ["", ""])
+    fake_ocr.install(2)
+    seen = []
+    ocr = pdf_utils.iter_ocr_pages
+    monkeypatch.setattr(pdf_utils, 'iter_ocr_pages', lambda *a, **kw: seen.append(kw['workers']) or ocr(*a, **kw))
+    assert extract_pages_hybrid(pdf, workers=1) == ["page 1", "page 2"]
+    assert seen == [1]
+
+
+def test_scanned_pdf_ocr_with_dependencies_available(fake_ocr):
+    from pdf_utils import extract_text_from_scanned_pdf
+    fake_ocr.install(2)
+    assert extract_text_from_scanned_pdf("scan.pdf", workers=1) == "page 1\npage 2"
@@ -0,0 +1,40 @@
+import pytest
+
+from analyzer import analyze_stream, analyze_text
+
+
+PARAGRAPHS = [
+    "The mission failed because the engine overheated. The crew was safe.",
+    "Nothing happened on Tuesday. The rain stopped early.",
+    "If you heat water, it boils. Prices rose due to the drought.",
+    "The bridge closed as a result of the flood. Traffic was slow.",
+]
+TEXT = "\n\n".join(PARAGRAPHS * 25)
+
+
+@pytest.mark.parametrize("workers", [2, 4])
+def test_parallel_output_matches_serial(blank_nlp, workers):
+    serial = analyze_text(TEXT, blank_nlp)
+    parallel = analyze_text(TEXT, blank_nlp, workers=workers, chunk_chars=400)
+    assert parallel == serial
+    assert len(serial) > 50
+
+
+def test_parallel_fallback_is_decided_globally(blank_nlp):
+    # Sin coincidencias del matcher: el fallback debe ser el mismo que en serie.
+    text = "\n\n".join(["Then we went home. It was late.", "The sun set over the hill."] * 30)
+    serial = analyze_text(text, blank_nlp)
+    assert serial
+    assert analyze_text(text, blank_nlp, workers=2, chunk_chars=200) == serial
+
+
+def test_parallel_workers_rebuild_a_packaged_pipeline(packaged_pipeline):
+    # El paquete trae `senter` deshabilitado; los procesos deben activarlo como el padre.
+    # (Su `senter` no está entrenado, así que se compara con los mismos trozos en serie.)
+    from pipeline_planner import load_planned_pipeline
+    nlp, _ = load_planned_pipeline(packaged_pipeline)
+    assert 'senter' in nlp.pipe_names
+    text = "\n\n".join(PARAGRAPHS * 5)
+    parallel = analyze_text(text, nlp, workers=2, chunk_chars=400)
+    assert list(parallel) == list(analyze_stream(text, nlp, chunk_chars=400))
+    assert parallel
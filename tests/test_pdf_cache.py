@@ -0,0 +1,58 @@
+from benchmarks.corpus_gen import write_text_pdf
+from pdf_utils import extract_text_from_pdf, open_page_cache
+
+
+def test_only_changed_pages_are_extracted_again(tmp_path):
+    cache = open_page_cache(str(tmp_path / "pages.sqlite"))
+    v1 = write_text_pdf(tmp_path / "v1.pdf", ["First page.", "It failed because it rained.", "Last page."])
+    text = extract_text_from_pdf(v1, cache=cache)
+    assert text == "First page.\nIt failed because it rained.\nLast page."
+    assert (cache.hits, cache.misses) == (0, 3)
+
+    assert extract_text_from_pdf(v1, cache=cache) == text
+    assert (cache.hits, cache.misses) == (3, 3)
+
+    v2 = write_text_pdf(tmp_path / "v2.pdf", ["First page.", "It failed because it snowed.", "Last page."])
+    assert "snowed" in extract_text_from_pdf(v2, cache=cache)
+    assert (cache.hits, cache.misses) == (5, 4)
+
+
+def _write_xobject_pdf(path, texts):
+    """PDF cuyas páginas tienen el mismo content stream (`/X1 Do`) y cada una un XObject con su texto."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    content = b"q /X1 Do Q"
+    kids = []
+    for text in texts:
+        form = "BT /F1 10 Tf 72 740 Td ({}) Tj ET".format(text).encode("latin-1")
+        objects.append(b"<< /Type /XObject /Subtype /Form /BBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Length %d >>\nstream\n%s\nendstream"
+                       % (len(form), form))
+        form_id = len(objects)
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        content_id = len(objects)
+        objects.append(("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                        "/Resources << /XObject << /X1 {} 0 R >> >> /Contents {} 0 R >>"
+                        .format(form_id, content_id)).encode())
+        kids.append("{} 0 R".format(len(objects)))
+    objects[1] = "<< /Type /Pages /Kids [{}] /Count {} >>".format(" ".join(kids), len(kids)).encode()
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+    return str(path)
+
+
+def test_pages_drawing_through_different_xobjects_do_not_share_a_key(tmp_path):
+    cache = open_page_cache(str(tmp_path / "pages.sqlite"))
+    pdf = _write_xobject_pdf(tmp_path / "forms.pdf", ["Page one text.", "Page two text."])
+    assert extract_text_from_pdf(pdf, cache=cache) == "Page one text.\nPage two text."
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert extract_text_from_pdf(pdf, cache=cache) == "Page one text.\nPage two text."
+    assert (cache.hits, cache.misses) == (2, 2)
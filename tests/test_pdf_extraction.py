@@ -0,0 +1,31 @@
+from benchmarks.corpus_gen import write_text_pdf
+from pdf_utils import extract_pages_from_pdf, extract_text_with_page_offsets, open_page_cache, page_at
+
+PAGES = ["Page {} text.".format(i) if i % 4 else "" for i in range(1, 11)]
+
+
+def test_parallel_extraction_keeps_page_order(tmp_path):
+    pdf = write_text_pdf(tmp_path / "book.pdf", PAGES)
+    assert extract_pages_from_pdf(pdf) == PAGES
+    cache = open_page_cache(str(tmp_path / "pages.sqlite"))
+    assert extract_pages_from_pdf(pdf, cache=cache, workers=3) == PAGES
+    assert cache.hits + cache.misses == len(PAGES)
+    misses = cache.misses
+    assert extract_pages_from_pdf(pdf, cache=cache, workers=3) == PAGES
+    assert cache.misses == misses
+
+
+def test_page_offset_table(tmp_path):
+    pdf = write_text_pdf(tmp_path / "book.pdf", PAGES)
+    text, offsets = extract_text_with_page_offsets(pdf, workers=2)
+    assert len(offsets) == len(PAGES)
+    for i, page in enumerate(PAGES):
+        assert text[offsets[i]:offsets[i] + len(page)] == page
+    pos = text.index("Page 6")
+    assert page_at(offsets, pos) == 5
+
+
+def test_unreadable_pdf_returns_no_pages(tmp_path):
+    bad = tmp_path / "bad.pdf"
+    bad.write_bytes(b"not a pdf")
+    assert extract_pages_from_pdf(str(bad), workers=2) == []
@@ -0,0 +1,40 @@
+from pipeline_planner import load_planned_pipeline, plan_pipeline
+
+CORE_WEB = ['tok2vec', 'tagger', 'parser', 'senter', 'attribute_ruler', 'lemmatizer', 'ner']
+
+
+def test_basic_engine_uses_senter_and_skips_parser_and_ner():
+    plan = plan_pipeline(CORE_WEB, engine='basic')
+    assert plan['sentences'] == 'senter'
+    assert plan['keep'] == ['tok2vec', 'tagger', 'senter', 'attribute_ruler', 'lemmatizer']
+    assert plan['skip'] == ['parser', 'ner']
+
+
+def test_dependency_engine_keeps_parser():
+    plan = plan_pipeline(CORE_WEB, engine='dependency')
+    assert plan['sentences'] == 'parser'
+    assert plan['skip'] == ['senter', 'ner']
+
+
+def test_lowercase_only_rules_need_just_sentences():
+    plan = plan_pipeline(CORE_WEB, patterns=[[{"LOWER": "because"}]])
+    assert plan['keep'] == ['senter']
+
+
+def test_planned_pipeline_report(monkeypatch, blank_nlp):
+    monkeypatch.setattr('pipeline_planner.model_components', lambda name: (None, blank_nlp.component_names))
+    monkeypatch.setattr('pipeline_planner.get_nlp', lambda name, **kw: blank_nlp)
+    nlp, report = load_planned_pipeline(sample_text="It failed because it rained.")
+    assert nlp is blank_nlp
+    assert report['skipped'] == []
+    assert report['saved_seconds'] == 0.0
+
+
+def test_planned_pipeline_loads_a_real_package(packaged_pipeline):
+    # El paquete trae `senter` deshabilitado en su configuración, como los en_core_web_*.
+    nlp, report = load_planned_pipeline(packaged_pipeline)
+    assert report['model'] == packaged_pipeline
+    assert nlp.pipe_names == ['senter', 'tagger']
+    assert nlp.component_names == ['senter', 'tagger']  # `ner` ni se carga
+    assert report['skipped'] == ['ner']
+    assert len(list(nlp("It rained. We stayed home.").sents)) >= 1
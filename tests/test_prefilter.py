@@ -0,0 +1,39 @@
+from analyzer import analyze_text, compare_prefilter
+from prefilter import candidate_regions, marker_regex
+
+
+FILLER = "The committee met on Tuesday. Minutes were taken by the clerk. Lunch was served at noon."
+TEXT = "\n\n".join([FILLER] * 10 + [
+    "The mission failed because the engine overheated. The crew was safe.",
+] + [FILLER] * 10 + [
+    "Prices rose due to the drought. If you heat water, it boils.",
+] + [FILLER] * 10)
+
+
+def test_marker_regex_covers_patterns_and_fallback_markers():
+    rx = marker_regex()
+    for phrase in ["because", "Due  to", "caused", "led to", "as a result of", "then"]:
+        assert rx.search("x {} y".format(phrase)), phrase
+    assert not rx.search("different strengthened")
+
+
+def test_regions_are_small_and_sentence_aligned():
+    regions = candidate_regions(TEXT)
+    assert len(regions) == 2
+    assert sum(b - a for a, b in regions) < len(TEXT) / 5
+    assert TEXT[regions[0][0]:regions[0][1]].lstrip().startswith("Lunch was served")
+
+
+def test_prefilter_matches_full_parse(blank_nlp):
+    assert analyze_text(TEXT, blank_nlp, prefilter=True) == analyze_text(TEXT, blank_nlp)
+    report = compare_prefilter(TEXT, blank_nlp)
+    assert report['missing'] == [] and report['extra'] == []
+    assert report['parsed_share'] < 0.2
+
+
+def test_fallback_markers_are_whole_words_in_both_stages(blank_nlp):
+    # 'if' dentro de 'different' no es un marcador ni para el prefiltro ni para el fallback.
+    text = "The results were different this year."
+    assert analyze_text(text, blank_nlp) == []
+    report = compare_prefilter(text, blank_nlp)
+    assert report['missing'] == [] and report['extra'] == []
@@ -0,0 +1,45 @@
+import json
+import os
+
+from analyzer import analyze_text
+from profiling import Profiler, get_profiler, profiling
+
+
+def test_nested_stages_are_aggregated(tmp_path):
+    profiler = Profiler(cprofile_stage='inner', cprofile_path=str(tmp_path / 'inner.prof'))
+    with profiling(profiler):
+        for _ in range(2):
+            with get_profiler().stage('outer') as outer:
+                outer.count(pages=3)
+                with get_profiler().stage('inner') as inner:
+                    data = [0] * 100_000
+                    inner.count(spans=len(data) // 1000)
+    assert not get_profiler().enabled
+    stages = profiler.report()['stages']
+    assert list(stages) == ['inner', 'outer']
+    assert stages['outer']['calls'] == 2
+    assert stages['outer']['items'] == {'pages': 6}
+    assert stages['inner']['items'] == {'spans': 200}
+    assert stages['outer']['self_seconds'] <= stages['outer']['wall_seconds']
+    assert stages['inner']['peak_python_bytes'] >= 800_000
+    assert stages['outer']['peak_python_bytes'] >= stages['inner']['peak_python_bytes']
+    assert os.path.exists(tmp_path / 'inner.prof')
+
+
+def test_analyze_text_reports_json_and_prometheus(blank_nlp, tmp_path):
+    text = "Prices rose because demand grew. The sky is blue."
+    profiler = Profiler()
+    with profiling(profiler):
+        highlights = analyze_text(text, blank_nlp)
+    stages = profiler.report()['stages']
+    assert {'parse', 'match', 'heuristics', 'merge'} <= set(stages)
+    assert stages['parse']['items'] == {'chunks': 1, 'chars': len(text), 'sentences': 2}
+    assert stages['match']['items']['matches'] >= 1
+    assert stages['merge']['items'] == {'spans': len(highlights)}
+
+    profiler.write(str(tmp_path / 'report.json'))
+    assert json.loads((tmp_path / 'report.json').read_text())['stages']['merge']['calls'] == 1
+    profiler.write(str(tmp_path / 'report.prom'))
+    prom = (tmp_path / 'report.prom').read_text()
+    assert '# TYPE resaltado_stage_wall_seconds gauge' in prom
+    assert 'resaltado_stage_items{stage="parse",item="sentences"} 2' in prom
@@ -0,0 +1,20 @@
+import spacy_utils
+
+
+def test_model_and_matcher_are_loaded_once(monkeypatch, blank_nlp):
+    calls = []
+
+    def fake_load(preferred_model="en_core_web_lg", disable=(), enable=()):
+        calls.append((preferred_model, tuple(disable)))
+        return blank_nlp
+
+    spacy_utils.clear_registry()
+    monkeypatch.setattr(spacy_utils, "load_spacy_model", fake_load)
+    try:
+        nlp = spacy_utils.warm_up("fake_model")
+        assert spacy_utils.get_nlp("fake_model") is nlp
+        assert spacy_utils.get_matcher(nlp) is spacy_utils.get_matcher(nlp)
+        spacy_utils.get_nlp("fake_model", disable=["ner"])
+        assert calls == [("fake_model", ()), ("fake_model", ("ner",))]
+    finally:
+        spacy_utils.clear_registry()
@@ -0,0 +1,40 @@
+import result_cache
+from analyzer import analyze_text
+from cache_utils import SQLiteCache
+
+TEXT = "The mission failed because the engine overheated. If you heat water, it boils."
+
+
+def test_lru_eviction_keeps_total_size_bounded(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "c.sqlite"), max_bytes=25)
+    cache.put("a", b"x" * 10)
+    cache.put("b", b"x" * 10)
+    assert cache.get("a") is not None  # 'a' pasa a ser la más reciente
+    cache.put("c", b"x" * 10)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()['bytes'] <= 25
+    cache.clear()
+    assert cache.stats()['entries'] == 0
+
+
+def test_analyze_text_uses_cache_and_rules_invalidate_it(tmp_path, blank_nlp, monkeypatch):
+    cache = result_cache.open_result_cache(str(tmp_path / "results.sqlite"))
+    first = analyze_text(TEXT, blank_nlp, cache=cache)
+    assert analyze_text(TEXT, blank_nlp, cache=cache) == first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    monkeypatch.setattr(result_cache, "rules_fingerprint", lambda: "otras-reglas")
+    assert analyze_text(TEXT, blank_nlp, cache=cache) == first
+    assert cache.misses == 2
+
+
+def test_chunk_size_is_part_of_the_key(tmp_path, blank_nlp):
+    cache = result_cache.open_result_cache(str(tmp_path / "results.sqlite"))
+    text = "\n\n".join([TEXT] * 10)
+    analyze_text(text, blank_nlp, cache=cache)
+    assert analyze_text(text, blank_nlp, cache=cache, chunk_chars=200) == analyze_text(text, blank_nlp, chunk_chars=200)
+    assert cache.misses == 2
+    # Mismo tamaño efectivo de trozo: misma entrada.
+    analyze_text(text, blank_nlp, cache=cache, chunk_chars=200, workers=2)
+    assert (cache.hits, cache.misses) == (1, 2)
@@ -0,0 +1,71 @@
+import json
+import os
+
+import pytest
+import spacy
+from spacy.matcher import Matcher
+
+import rule_packs
+from matcher_utils import CAUSAL_PATTERNS, setup_causal_matcher
+
+TEXT = ("The mission failed because the engine overheated. The storm led to outages. "
+        "Prices rose due to the drought. Smoke caused coughing. As a result of that, we left.")
+
+
+def test_pack_matcher_equals_single_token_matcher(blank_nlp, tmp_path):
+    doc = blank_nlp(TEXT)
+    reference = Matcher(blank_nlp.vocab)
+    reference.add(rule_packs.MATCH_LABEL, CAUSAL_PATTERNS)
+    matcher = rule_packs.build_matcher(blank_nlp, cache_dir=str(tmp_path))
+    assert [m[1:] for m in matcher(doc)] == sorted(m[1:] for m in reference(doc))
+
+
+def test_compiled_pack_is_reused_from_disk(blank_nlp, tmp_path, monkeypatch):
+    pack = rule_packs.load_rule_pack()
+    first = rule_packs.load_compiled(blank_nlp, pack, str(tmp_path))
+    assert os.listdir(tmp_path) == [os.path.basename(rule_packs.compiled_path(blank_nlp, pack, str(tmp_path)))]
+
+    def fail(*args):
+        raise AssertionError("no debería recompilar")
+
+    monkeypatch.setattr(rule_packs, "compile_pack", fail)
+    assert rule_packs.load_compiled(blank_nlp, pack, str(tmp_path)) == first
+
+
+def test_lemma_patterns_fall_back_to_inflections_without_lemmatizer(tmp_path):
+    nlp = spacy.blank("en")
+    matcher = rule_packs.build_matcher(nlp, cache_dir=str(tmp_path))
+    doc = nlp(TEXT)
+    found = {doc[s:e].text.lower() for _, s, e in matcher(doc)}
+    assert {"because", "led to", "due to", "caused", "as a result of"} <= found
+
+
+def test_pack_hash_drives_rules_fingerprint(tmp_path, blank_nlp, monkeypatch):
+    import result_cache
+    pack = dict(rule_packs.load_rule_pack())
+    pack.pop('hash')
+    pack['phrases'] = pack['phrases'] + ['owing to']
+    path = tmp_path / "custom.json"
+    path.write_text(json.dumps(pack), encoding='utf-8')
+    custom = rule_packs.load_rule_pack(str(path))
+    assert custom['hash'] != rule_packs.load_rule_pack()['hash']
+
+    before = result_cache.rules_fingerprint()
+    monkeypatch.setattr(rule_packs, "load_rule_pack", lambda name=rule_packs.DEFAULT_PACK: custom)
+    assert result_cache.rules_fingerprint() != before
+    matcher = setup_causal_matcher(blank_nlp)
+    doc = blank_nlp("Delays happened owing to rain.")
+    assert [doc[s:e].text for _, s, e in matcher(doc)] == ["owing to"]
+
+
+def test_unknown_pack_name():
+    with pytest.raises(FileNotFoundError):
+        rule_packs.load_rule_pack("no_such_pack")
+
+
+def test_dependency_engine_markers_come_from_the_pack():
+    import heuristics
+    markers = rule_packs.load_rule_pack()['dependency_markers']
+    assert heuristics._EFFECT_FIRST_MARKERS == tuple(markers['effect_first'])
+    assert heuristics._CAUSAL_LEMMAS == tuple(markers['causal_lemmas'])
+    assert heuristics._CONCLUSION_MARKERS == tuple(markers['conclusion'])
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+from analyzer import analyze_text
+from service import start_service
+
+
+async def request(port, method, path, body=b"", content_type=None, content_length=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    length = len(body) if content_length is None else content_length
+    head = ["{} {} HTTP/1.1".format(method, path), "Host: localhost", "Content-Length: {}".format(length)]
+    if content_type:
+        head.append("Content-Type: " + content_type)
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    return int(head.split()[1]), payload.decode('utf-8')
+
+
+TEXTS = [
+    "Prices rose because demand grew.",
+    "If it rains, then the game stops. Nothing else happened.",
+    "The sky is blue.",
+]
+
+
+def test_micro_batched_requests_match_analyze_text(blank_nlp):
+    async def scenario():
+        service, server = await start_service(blank_nlp, port=0, latency_ms=200, max_batch=8)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            responses = await asyncio.gather(*[
+                request(port, 'POST', '/analyze', json.dumps({'text': t}).encode(), 'application/json')
+                for t in TEXTS])
+            plain = await request(port, 'POST', '/analyze', TEXTS[0].encode(), 'text/plain')
+            boundary = 'xyz'
+            form = ("--{b}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.txt\"\r\n"
+                    "Content-Type: text/plain\r\n\r\n{t}\r\n--{b}--\r\n").format(b=boundary, t=TEXTS[1])
+            upload = await request(port, 'POST', '/analyze', form.encode(),
+                                   'multipart/form-data; boundary=' + boundary)
+            metrics = await request(port, 'GET', '/metrics')
+            missing = await request(port, 'GET', '/nope')
+        finally:
+            server.close()
+            await server.wait_closed()
+            await service.stop()
+        return service, responses, plain, upload, metrics, missing
+
+    service, responses, plain, upload, metrics, missing = asyncio.run(scenario())
+    for text, (status, payload) in zip(TEXTS, responses):
+        assert status == 200
+        assert json.loads(payload)['highlights'] == analyze_text(text, blank_nlp)
+    assert json.loads(plain[1])['highlights'] == analyze_text(TEXTS[0], blank_nlp)
+    assert json.loads(upload[1])['highlights'] == analyze_text(TEXTS[1], blank_nlp)
+    # Las tres peticiones concurrentes caben en el mismo micro-lote.
+    assert service.metrics['batches_total'] == 3
+    assert service.metrics['batched_texts_total'] == 5
+    assert metrics[0] == 200 and 'resaltado_queue_depth 0' in metrics[1]
+    assert missing[0] == 404
+
+
+def test_full_queue_is_rejected_with_503(blank_nlp):
+    async def scenario():
+        service, server = await start_service(blank_nlp, port=0, max_queue=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return service, await request(port, 'POST', '/analyze', b"a because b", 'text/plain')
+        finally:
+            server.close()
+            await server.wait_closed()
+            await service.stop()
+
+    service, (status, payload) = asyncio.run(scenario())
+    assert status == 503
+    assert service.metrics['rejected_total'] == 1
+
+
+def test_malformed_content_length_is_rejected_with_400(blank_nlp):
+    async def scenario():
+        service, server = await start_service(blank_nlp, port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return [await request(port, 'POST', '/analyze', b"a because b", 'text/plain', content_length=value)
+                    for value in ("abc", "-5", "1e3")]
+        finally:
+            server.close()
+            await server.wait_closed()
+            await service.stop()
+
+    assert [status for status, _ in asyncio.run(scenario())] == [400, 400, 400]
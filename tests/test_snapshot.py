@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+
+import snapshot_utils
+from spacy_utils import get_matcher
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_main_does_not_load_spacy():
+    code = "import sys, main; print('spacy' in sys.modules, 'numpy' in sys.modules)"
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                         capture_output=True, text=True).stdout
+    assert out.strip() == "False False"
+
+
+def test_snapshot_roundtrip(tmp_path):
+    manifest = snapshot_utils.prepare_snapshot(str(tmp_path), measure=False)
+    assert os.path.exists(tmp_path / snapshot_utils.MANIFEST_NAME)
+    assert any(name.endswith('.msgpack') for name in os.listdir(tmp_path))
+
+    nlp = snapshot_utils.load_snapshot(str(tmp_path))
+    assert nlp is not None
+    assert list(nlp.pipe_names) == manifest['pipeline']
+    doc = nlp("Prices rose due to the drought.")
+    assert [doc[s:e].text for _, s, e in get_matcher(nlp)(doc)] == ["due to"]
+
+
+def test_stale_snapshot_falls_back(tmp_path):
+    snapshot_utils.prepare_snapshot(str(tmp_path), measure=False)
+    path = tmp_path / snapshot_utils.MANIFEST_NAME
+    manifest = json.loads(path.read_text(encoding='utf-8'))
+    manifest['pack_hash'] = "0" * 64
+    path.write_text(json.dumps(manifest), encoding='utf-8')
+    assert snapshot_utils.load_snapshot(str(tmp_path)) is None
+    assert snapshot_utils.load_pipeline(snapshot_dir=str(tmp_path)) is not None
+
+
+def test_prepare_reports_time_saved_by_skipped_components(tmp_path, monkeypatch, packaged_pipeline):
+    monkeypatch.setattr(snapshot_utils, 'measure_cold_start', lambda *args, **kw: {})
+    manifest = snapshot_utils.prepare_snapshot(str(tmp_path), packaged_pipeline)
+    assert manifest['skipped'] == ['ner'] and manifest['pipeline'] == ['senter', 'tagger']
+    assert manifest['saved_seconds'] > 0 and 0 < manifest['saved_share'] < 1
@@ -0,0 +1,52 @@
+import json
+import random
+
+from analyzer import normalize_and_merge_spans
+from html_utils import write_html_report
+from span_store import SpanStore
+
+
+def reference_merge(text, spans):
+    # Barrido anterior de `normalize_and_merge_spans`, con un dict por highlight.
+    normalized = sorted(spans, key=lambda x: (x[1], -(x[2] - x[1])))
+    priority = {'cause': 2, 'effect': 2, 'causal_sentence': 1}
+    merged = []
+    for role, start, end in normalized:
+        if merged and start <= merged[-1][2]:
+            last_role, _, last_e = merged[-1]
+            if priority.get(role, 0) > priority.get(last_role, 0):
+                merged[-1] = [role, start, max(end, last_e)]
+            else:
+                merged[-1][2] = max(last_e, end)
+        else:
+            merged.append([role, start, end])
+    return [{'role': r, 'start': a, 'end': b, 'text': text[a:b]} for r, a, b in merged]
+
+
+def test_vectorized_merge_matches_sweep():
+    rng = random.Random(7)
+    text = "".join(rng.choice("abc .") for _ in range(500))
+    roles = ['cause', 'effect', 'causal_sentence', 'other']
+    for _ in range(200):
+        spans = []
+        for _ in range(rng.randint(0, 30)):
+            a = rng.randint(0, 480)
+            spans.append((rng.choice(roles), a, a + rng.randint(0, 20)))
+        assert normalize_and_merge_spans(text, spans) == reference_merge(text, spans)
+
+
+def test_store_behaves_like_list_of_dicts(tmp_path):
+    text = "Prices rose because demand grew."
+    store = normalize_and_merge_spans(text, [{'role': 'effect', 'start': 0, 'end': 11},
+                                             ('cause', 20, 31), ('causal_sentence', 0, 32)])
+    assert isinstance(store, SpanStore)
+    assert [h['role'] for h in store] == ['effect']
+    assert store[0]['text'] == text[0:32] and store[-1] == store[0]
+    assert json.loads(json.dumps(store.to_dicts())) == store
+    assert SpanStore.from_columns(text, json.loads(json.dumps(store.to_columns()))) == store
+
+    unsorted = SpanStore.from_spans(text, [('cause', 20, 31), ('effect', 0, 11)])
+    with open(tmp_path / "a.html", 'w') as a, open(tmp_path / "b.html", 'w') as b:
+        write_html_report(text, unsorted, a)
+        write_html_report(text, unsorted.to_dicts(), b)
+    assert (tmp_path / "a.html").read_text() == (tmp_path / "b.html").read_text()
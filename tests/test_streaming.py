@@ -0,0 +1,65 @@
+from analyzer import analyze_stream, analyze_text, iter_text_chunks
+
+
+PARAGRAPHS = [
+    "The mission failed because the engine overheated. The crew was safe.",
+    "If you heat water, it boils. Nothing else happened that day.",
+    "Prices rose due to the drought. Farmers sold their cattle.",
+]
+TEXT = "\n\n".join(PARAGRAPHS * 20)
+
+
+def test_chunks_cover_text_and_respect_limit():
+    chunks = list(iter_text_chunks(TEXT, 300))
+    assert "".join(chunks) == TEXT
+    assert all(len(c) <= 300 for c in chunks)
+    # los cortes caen entre párrafos
+    assert all(c.startswith("\n\n") for c in chunks[1:])
+
+
+def test_stream_matches_full_analysis_with_absolute_offsets(blank_nlp):
+    streamed = list(analyze_stream(TEXT, blank_nlp, chunk_chars=500))
+    assert streamed == analyze_text(TEXT, blank_nlp)
+    assert all(TEXT[h['start']:h['end']] == h['text'] for h in streamed)
+
+
+def test_stream_handles_text_longer_than_max_length(blank_nlp):
+    original = blank_nlp.max_length
+    blank_nlp.max_length = 1000
+    try:
+        streamed = list(analyze_stream(TEXT, blank_nlp))
+    finally:
+        blank_nlp.max_length = original
+    assert len(TEXT) > 1000
+    assert sum(h['role'] == 'cause' for h in streamed) == 20
+
+
+def test_analyze_text_handles_text_longer_than_max_length(blank_nlp):
+    expected = analyze_text(TEXT, blank_nlp)
+    original = blank_nlp.max_length
+    blank_nlp.max_length = 1000
+    try:
+        highlights = analyze_text(TEXT, blank_nlp)
+    finally:
+        blank_nlp.max_length = original
+    assert highlights == expected
+
+
+def test_stream_fallback_is_decided_for_the_whole_input(blank_nlp):
+    # Un trozo sin coincidencias del matcher no debe aportar fallback si otro sí las tuvo.
+    text = "\n\n".join(["Then we went home. It was late."] * 10 + PARAGRAPHS)
+    streamed = list(analyze_stream(text, blank_nlp, chunk_chars=200))
+    assert streamed == analyze_text(text, blank_nlp)
+    assert not any(h['text'].startswith('Then') for h in streamed)
+
+    text = "\n\n".join(["Then we went home. It was late.", "The sun set over the hill."] * 10)
+    streamed = list(analyze_stream(text, blank_nlp, chunk_chars=200))
+    assert streamed and streamed == analyze_text(text, blank_nlp)
+
+
+def test_stream_merges_spans_that_touch_across_chunks(blank_nlp):
+    # Sólo highlights causal_sentence, que se tocan entre párrafos y en cada corte.
+    text = "\n\n".join(["Prices rose due to the long drought."] * 40)
+    expected = analyze_text(text, blank_nlp)
+    assert [(h['start'], h['end']) for h in expected] == [(0, len(text))]
+    assert list(analyze_stream(text, blank_nlp, chunk_chars=200)) == expected